@@ -1,6 +1,7 @@
 import streamlit as st 
 import chat
 import json
+import metrics_server
 import mcp_config 
 import logging
 import sys
@@ -8,6 +9,8 @@ import asyncio
 import uuid
 import translator
 
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
 logging.basicConfig(
     level=logging.INFO,  # Default to INFO level
     format='%(filename)s:%(lineno)d | %(message)s',
@@ -17,6 +20,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger("streamlit")
 
+# Streamlit session id, used as the key of this user's translator session
+session_id = get_script_run_ctx().session_id
+
+# Prometheus endpoint of this process (only the first run starts it)
+metrics_server.server.start()
+
 username = "sonic"
 
 # title
@@ -150,9 +159,10 @@ with st.sidebar:
                 "English",
             ), index=0
         )
-        language = selectLanguage if selectLanguage else "Japanese"
-        logger.info(f"language: {language}")
-        translator.is_active = False
+        # Kept per browser session; chat receives it with every call
+        st.session_state.language = selectLanguage if selectLanguage else "Japanese"
+        logger.info(f"language: {st.session_state.language}")
+    language = st.session_state.get("language", "Japanese")
 
     # model selection box
     modelName = st.selectbox(
@@ -189,6 +199,10 @@ with st.sidebar:
 
     chat.update(modelName, debugMode, language, translationMode)    
 
+    if debugMode == 'Enable' and mode.startswith('Translator'):
+        with st.expander("Translator metrics", expanded=False):
+            st.json(chat.translator_metrics())
+
     st.success(f"Connected to {modelName}", icon="💚")
     clear_button = st.button("대화 초기화", key="clear")
     # logger.info(f"clear_button: {clear_button}")
@@ -200,13 +214,31 @@ if clear_button==True:
     chat.checkpointers = dict() 
     chat.memorystores = dict() 
     chat.initiate()
-    session_id = uuid.uuid4().hex
+    chat.close_translator_session(session_id)
 
 # Initialize chat history
 if "messages" not in st.session_state:
     st.session_state.messages = []
     st.session_state.greetings = False
 
+def audio_player_html(src, autoplay=False):
+    """HTML audio element for an audio URL (stream, stored clip or data URL)."""
+    return f"""
+                <audio controls {'autoplay ' if autoplay else ''}style="width: 100%;">
+                    <source src="{src}">
+                    Your browser does not support the audio element.
+                </audio>
+                """
+
+def show_pronunciation(pronunciation):
+    """Show the pronunciation sentence by sentence as it arrives; returns the whole text."""
+    container = st.empty()
+    text = ""
+    for part in pronunciation:
+        text += part
+        container.info(text)
+    return text
+
 # Display chat messages from history on app rerun
 def display_chat_messages() -> None:
     """logger.info message history
@@ -223,16 +255,10 @@ def display_chat_messages() -> None:
                         st.image(url, caption=file_name, use_container_width=True)
             
             # Display audio if available
-            if "audio" in message and message["audio"]:
-                audio_base64 = message["audio"]
-                audio_data_url = f"data:audio/wav;base64,{audio_base64}"
-                audio_html = f"""
-                <audio controls style="width: 100%;">
-                    <source src="{audio_data_url}" type="audio/wav">
-                    Your browser does not support the audio element.
-                </audio>
-                """
-                st.markdown(audio_html, unsafe_allow_html=True)
+            if message.get("audio_id"):
+                audio_src = chat.audio_clip_src(message["audio_id"])
+                if audio_src:
+                    st.markdown(audio_player_html(audio_src), unsafe_allow_html=True)
             
             # Display response (translated text) if available
             if "response" in message and message["response"]:
@@ -324,44 +350,49 @@ if prompt := st.chat_input("메시지를 입력하세요."):
 
         elif mode == 'Translator (Text2Speech)':
             audio_container = st.empty()
-            response = chat.run_text2speech(prompt)
-            logger.info(f"response: {response}")
+            cached = chat.lookup_translation(prompt, language)
+            if cached:
+                # Repeated phrase: no Nova Sonic turn and no LLM call
+                response = cached["translation"]
+                audio_id = cached["audio_id"]
+                pronunciate_to_korean = cached["pronunciation"]
+                if audio_id:
+                    audio_container.markdown(audio_player_html(chat.audio_clip_src(audio_id), autoplay=True), unsafe_allow_html=True)
+                st.info(pronunciate_to_korean)
+            else:
+                # Play the translated speech while it is generated
+                stream_id, stream_url = chat.open_audio_stream()
+                if stream_url:
+                    audio_container.markdown(audio_player_html(stream_url, autoplay=True), unsafe_allow_html=True)
+                # Pronounce each translated sentence while the rest is still being synthesized
+                pronunciation = chat.PronunciationStream(language)
+                future = chat.start_text2speech(prompt, session_id, language, stream_id, on_text=pronunciation.feed)
+                future.add_done_callback(lambda _: pronunciation.close())
+                pronunciate_to_korean = show_pronunciation(pronunciation)
+                # The audio is kept compressed in the audio store; the history only holds its id
+                response, completed, audio_id = future.result(timeout=35)
+                logger.info(f"response: {response}")
 
-            # Get and display audio if available
-            audio_wav_bytes = translator.get_audio_wav_bytes()
-            audio_base64 = None
-            if audio_wav_bytes:
-                logger.info(f"Displaying audio in Streamlit: {len(audio_wav_bytes)} bytes")
-                
-                # Encode audio to base64 for HTML embedding
-                import base64
-                audio_base64 = base64.b64encode(audio_wav_bytes).decode('utf-8')
-                audio_data_url = f"data:audio/wav;base64,{audio_base64}"
-                
-                # Create HTML audio element
-                audio_html = f"""
-                <audio controls style="width: 100%;">
-                    <source src="{audio_data_url}" type="audio/wav">
-                    Your browser does not support the audio element.
-                </audio>
-                """
-                audio_container.markdown(audio_html, unsafe_allow_html=True)
-                
-                # Clear audio chunks after displaying
-                translator.clear_audio_chunks()
+                if audio_id and not stream_url:
+                    # Without the audio stream server, play the whole utterance once it is complete
+                    audio_container.markdown(audio_player_html(chat.audio_clip_src(audio_id)), unsafe_allow_html=True)
 
-            # translate
-            pronunciate_to_korean = chat.pronunciate_to_korean(response, language)
-            logger.info(f"pronunciate_to_korean: {pronunciate_to_korean}")
-            st.info(pronunciate_to_korean)
+                if not pronunciate_to_korean and response:
+                    pronunciate_to_korean = chat.pronunciate_to_korean(response, language)
+                    st.info(pronunciate_to_korean)
+                logger.info(f"pronunciate_to_korean: {pronunciate_to_korean}")
+
+                if completed:
+                    # Timed-out, interrupted or failed turns are shown but not cached
+                    chat.cache_translation(prompt, language, response, pronunciate_to_korean, audio_id)
 
             # Add message with audio and response
             message_data = {
                 "role": "assistant", 
                 "content": pronunciate_to_korean
             }
-            if audio_base64:
-                message_data["audio"] = audio_base64
+            if audio_id:
+                message_data["audio_id"] = audio_id
             if response:
                 message_data["response"] = response
             
@@ -369,44 +400,36 @@ if prompt := st.chat_input("메시지를 입력하세요."):
 
         elif mode == 'Translator (Speech2Text)':
             audio_container = st.empty()
-            response = chat.run_speech2text(prompt)
+            # Play the translated speech while it is generated
+            stream_id, stream_url = chat.open_audio_stream()
+            if stream_url:
+                audio_container.markdown(audio_player_html(stream_url, autoplay=True), unsafe_allow_html=True)
+            # Pronounce each translated sentence while the rest is still being synthesized
+            pronunciation = chat.PronunciationStream(language)
+            future = chat.start_speech2text(session_id, language, stream_id, on_text=pronunciation.feed)
+            future.add_done_callback(lambda _: pronunciation.close())
+            pronunciate_to_korean = show_pronunciation(pronunciation)
+            response = future.result(timeout=35)
             logger.info(f"response: {response}")
 
-            # Get and display audio if available
-            audio_wav_bytes = translator.get_audio_wav_bytes()
-            audio_base64 = None
-            if audio_wav_bytes:
-                logger.info(f"Displaying audio in Streamlit: {len(audio_wav_bytes)} bytes")
-                
-                # Encode audio to base64 for HTML embedding
-                import base64
-                audio_base64 = base64.b64encode(audio_wav_bytes).decode('utf-8')
-                audio_data_url = f"data:audio/wav;base64,{audio_base64}"
-                
-                # Create HTML audio element
-                audio_html = f"""
-                <audio controls style="width: 100%;">
-                    <source src="{audio_data_url}" type="audio/wav">
-                    Your browser does not support the audio element.
-                </audio>
-                """
-                audio_container.markdown(audio_html, unsafe_allow_html=True)
-                
-                # Clear audio chunks after displaying
-                translator.clear_audio_chunks()
+            # Keep the audio compressed in the audio store; the history only holds its id
+            audio_id = chat.save_translation_audio(session_id, stream_id)
+            if audio_id and not stream_url:
+                # Without the audio stream server, play the whole utterance once it is complete
+                audio_container.markdown(audio_player_html(chat.audio_clip_src(audio_id)), unsafe_allow_html=True)
 
-            # translate
-            pronunciate_to_korean = chat.pronunciate_to_korean(response, language)
+            if not pronunciate_to_korean and response:
+                pronunciate_to_korean = chat.pronunciate_to_korean(response, language)
+                st.info(pronunciate_to_korean)
             logger.info(f"pronunciate_to_korean: {pronunciate_to_korean}")
-            st.info(pronunciate_to_korean)
 
             # Add message with audio and response
             message_data = {
                 "role": "assistant", 
                 "content": pronunciate_to_korean
             }
-            if audio_base64:
-                message_data["audio"] = audio_base64
+            if audio_id:
+                message_data["audio_id"] = audio_id
             if response:
                 message_data["response"] = response
             
@@ -0,0 +1,183 @@
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+import uuid
+import wave
+
+from collections import OrderedDict
+
+import numpy as np
+
+import g711
+
+try:
+    import soundfile
+except ImportError:  # optional: without it clips are stored as mu-law
+    soundfile = None
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("audio_store")
+
+# Compressed audio of translator turns, referenced from the chat history by a short id
+AUDIO_STORE_MEMORY_BYTES = int(os.environ.get("AUDIO_STORE_MEMORY_BYTES", 32 * 1024 * 1024))  # recent clips kept in memory
+AUDIO_STORE_DISK_BYTES = int(os.environ.get("AUDIO_STORE_DISK_BYTES", 512 * 1024 * 1024))  # older clips spilled to disk; the oldest are deleted
+AUDIO_STORE_DIR = os.environ.get("AUDIO_STORE_DIR")  # spill directory, a temporary directory by default
+
+class AudioStore:
+    """
+    Stores 16-bit mono PCM clips compressed: Ogg/Opus when soundfile (libsndfile with Opus) is available,
+    otherwise G.711 mu-law served back as 16-bit WAV. The most recently used clips stay in an in-memory
+    LRU bounded to memory_bytes; older ones are spilled to files in spill_dir, which is bounded to
+    disk_bytes by deleting the oldest spilled clips. put() and get() may be called from any thread.
+    """
+
+    def __init__(self, sample_rate=24000, memory_bytes=AUDIO_STORE_MEMORY_BYTES, disk_bytes=AUDIO_STORE_DISK_BYTES, spill_dir=AUDIO_STORE_DIR):
+        self.sample_rate = sample_rate
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.spill_dir = spill_dir
+        self.use_opus = soundfile is not None
+        self.lock = threading.Lock()
+
+        self.memory = OrderedDict()  # clip_id -> (format, data), least recently used first
+        self.memory_used = 0
+        self.disk = OrderedDict()  # clip_id -> (format, path, size), oldest first
+        self.disk_used = 0
+
+        # Counters
+        self.pcm_bytes_in = 0
+        self.stored_bytes_in = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.evictions = 0
+
+    def put(self, pcm):
+        """Compress a PCM clip and return its id."""
+        fmt, data = self._encode(pcm)
+        with self.lock:
+            self.pcm_bytes_in += len(pcm)
+        return self.put_encoded(fmt, data)
+
+    def put_encoded(self, fmt, data):
+        """Add a clip that is already compressed (as returned by get_encoded()) and return its id."""
+        clip_id = uuid.uuid4().hex[:12]
+        with self.lock:
+            self.stored_bytes_in += len(data)
+            self.memory[clip_id] = (fmt, data)
+            self.memory_used += len(data)
+            self._spill()
+        return clip_id
+
+    def has(self, clip_id):
+        """True if the clip is still stored, in memory or spilled."""
+        with self.lock:
+            return clip_id in self.memory or clip_id in self.disk
+
+    def get(self, clip_id):
+        """Return (content, content_type) of a clip ready to serve, or None if it is unknown or was evicted."""
+        entry = self.get_encoded(clip_id)
+        return self._decode(*entry) if entry else None
+
+    def get_encoded(self, clip_id):
+        """Return (format, compressed data) of a clip, or None."""
+        with self.lock:
+            entry = self.memory.get(clip_id)
+            if entry:
+                self.memory.move_to_end(clip_id)
+                self.memory_hits += 1
+            else:
+                spilled = self.disk.get(clip_id)
+                if spilled is None:
+                    self.misses += 1
+                    return None
+                self.disk_hits += 1
+                fmt, path, _ = spilled
+                try:
+                    with open(path, 'rb') as f:
+                        entry = (fmt, f.read())
+                except OSError as e:
+                    logger.info(f"Error reading spilled clip {clip_id}: {e}")
+                    return None
+        return entry
+
+    def _encode(self, pcm):
+        if self.use_opus:
+            try:
+                buffer = io.BytesIO()
+                samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // 2)
+                soundfile.write(buffer, samples, self.sample_rate, format='OGG', subtype='OPUS')
+                return 'opus', buffer.getvalue()
+            except Exception as e:
+                # libsndfile builds before 1.0.29 have no Opus
+                logger.info(f"Opus encoding is not available, storing mu-law: {e}")
+                self.use_opus = False
+        return 'mulaw', g711.pcm16_to_mulaw(pcm)
+
+    def _decode(self, fmt, data):
+        if fmt == 'opus':
+            return data, 'audio/ogg'
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(g711.mulaw_to_pcm16(data))
+        return buffer.getvalue(), 'audio/wav'
+
+    def _spill(self):
+        """Move least recently used clips to disk until the memory budget holds (called with lock held)."""
+        while self.memory_used > self.memory_bytes and len(self.memory) > 1:
+            clip_id, (fmt, data) = self.memory.popitem(last=False)
+            self.memory_used -= len(data)
+            try:
+                if self.spill_dir is None:
+                    self.spill_dir = tempfile.mkdtemp(prefix="audio-store-")
+                path = os.path.join(self.spill_dir, f"{clip_id}.{fmt}")
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except OSError as e:
+                logger.info(f"Error spilling clip {clip_id}: {e}")
+                self.evictions += 1
+                continue
+            self.disk[clip_id] = (fmt, path, len(data))
+            self.disk_used += len(data)
+            self.spills += 1
+
+        while self.disk_used > self.disk_bytes and self.disk:
+            clip_id, (_, path, size) = self.disk.popitem(last=False)
+            self.disk_used -= size
+            self.evictions += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            return {
+                "format": "opus" if self.use_opus else "mulaw",
+                "memory_clips": len(self.memory),
+                "memory_bytes": self.memory_used,
+                "disk_clips": len(self.disk),
+                "disk_bytes": self.disk_used,
+                "compression": round(self.pcm_bytes_in / self.stored_bytes_in, 2) if self.stored_bytes_in else None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "spills": self.spills,
+                "evictions": self.evictions,
+            }
+
+store = AudioStore()
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import struct
+import sys
+import time
+import uuid
+
+import audio_store
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("audio_stream")
+
+# Sidecar HTTP server that streams translator audio to the browser while it is generated.
+# The page gets an <audio> element whose src is this server; the response is an open-ended
+# WAV (16-bit mono PCM) sent with chunked transfer encoding, so playback starts on the first chunk.
+# Loopback unless the port must be reachable from outside (the container image sets 0.0.0.0)
+AUDIO_STREAM_HOST = os.environ.get("AUDIO_STREAM_HOST", "127.0.0.1")
+AUDIO_STREAM_PORT = int(os.environ.get("AUDIO_STREAM_PORT", "8502"))
+# Base URL of the stream as seen by the browser, e.g. "/audio" behind an ingress routing /audio to the sidecar
+AUDIO_STREAM_URL = os.environ.get("AUDIO_STREAM_URL", f"http://localhost:{AUDIO_STREAM_PORT}/audio")
+AUDIO_STREAM_LINGER = 30.0  # seconds a finished channel stays readable for a player that connects late; replays use the stored clip
+AUDIO_STREAM_TTL = 300.0  # seconds an unfinished channel may go without audio before it is dropped
+
+def wav_stream_header(sample_rate, channels=1, sample_width=2):
+    """WAV header for a stream of unknown length (sizes set to the maximum, as browsers accept)."""
+    byte_rate = sample_rate * channels * sample_width
+    return (
+        b'RIFF' + struct.pack('<I', 0xFFFFFFFF) + b'WAVE' +
+        b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8) +
+        b'data' + struct.pack('<I', 0xFFFFFFFF - 36)
+    )
+
+class AudioChannel:
+    """
+    PCM audio of one response. Any number of HTTP clients can read it, from the start, while it is written.
+
+    The chunks are kept until the server prunes the channel, AUDIO_STREAM_LINGER after close() once no
+    client is reading it.
+    """
+
+    def __init__(self, stream_id, on_close=None):
+        self.stream_id = stream_id
+        self.chunks = []
+        self.closed = False
+        self.updated = asyncio.Event()
+        self.updated_at = time.monotonic()
+        self.closed_at = None
+        self.readers = 0  # HTTP clients streaming the channel
+        self.on_close = on_close
+
+    def write(self, pcm):
+        if self.closed or not pcm:
+            return
+        self.chunks.append(pcm)
+        self.updated_at = time.monotonic()
+        self._notify()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.closed_at = time.monotonic()
+            self._notify()
+            if self.on_close:
+                self.on_close(self)
+
+    def pcm(self):
+        """All audio written so far."""
+        return b''.join(self.chunks)
+
+    def _notify(self):
+        # Wake the current readers; later waits use a fresh event
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+    async def read(self, index):
+        """Return the chunks from index on, waiting for new audio; an empty list once the channel is closed."""
+        while index >= len(self.chunks) and not self.closed:
+            await self.updated.wait()
+        return self.chunks[index:]
+
+class AudioStreamServer:
+    """Chunked HTTP server for AudioChannels (/audio/<id>) and stored clips (/audio/clip/<id>), running on the translator event loop."""
+
+    def __init__(self, host=AUDIO_STREAM_HOST, port=AUDIO_STREAM_PORT, base_url=AUDIO_STREAM_URL, sample_rate=24000, clip_store=None):
+        self.clip_store = clip_store
+        self.host = host
+        self.port = port
+        self.base_url = base_url.rstrip('/')
+        self.header = wav_stream_header(sample_rate)
+        self.channels = dict()
+        self.server = None
+        self.prune_task = None
+
+    async def start(self):
+        if self.server is None:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.prune_task = asyncio.create_task(self._prune_periodically())
+            logger.info(f"Audio stream server listening on {self.host}:{self.port}")
+
+    async def close(self):
+        if self.prune_task:
+            self.prune_task.cancel()
+            self.prune_task = None
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def open_channel(self):
+        """Register a new channel and return it."""
+        channel = AudioChannel(uuid.uuid4().hex, on_close=self._closed)
+        self.channels[channel.stream_id] = channel
+        return channel
+
+    def _closed(self, channel):
+        asyncio.get_running_loop().call_later(AUDIO_STREAM_LINGER, self.prune)
+
+    def prune(self):
+        """Drop the channels finished AUDIO_STREAM_LINGER ago that nobody reads, and those left without audio for AUDIO_STREAM_TTL."""
+        now = time.monotonic()
+        for stream_id, channel in list(self.channels.items()):
+            if channel.closed:
+                if channel.readers or now - channel.closed_at < AUDIO_STREAM_LINGER:
+                    continue
+            elif now - channel.updated_at < AUDIO_STREAM_TTL:
+                continue
+            del self.channels[stream_id]
+            channel.close()
+            channel.chunks = []
+
+    async def _prune_periodically(self):
+        while True:
+            await asyncio.sleep(AUDIO_STREAM_LINGER)
+            self.prune()
+
+    def url(self, stream_id):
+        return f"{self.base_url}/{stream_id}"
+
+    def clip_url(self, clip_id):
+        return f"{self.base_url}/clip/{clip_id}"
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10.0)
+            # Skip the request headers
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10.0)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            channel = None
+            if len(parts) >= 2 and parts[0] in ('GET', 'HEAD'):
+                path = parts[1].split('?', 1)[0].rstrip('/').split('/')
+                if len(path) >= 2 and path[-2] == 'clip':
+                    await self._send_clip(writer, parts[0], path[-1])
+                    return
+                channel = self.channels.get(path[-1])
+            if channel is None:
+                writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                return
+
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: audio/wav\r\n'
+                b'Transfer-Encoding: chunked\r\n'
+                b'Cache-Control: no-store\r\n'
+                b'Connection: close\r\n\r\n'
+            )
+            if parts[0] == 'HEAD':
+                await writer.drain()
+                return
+
+            channel.readers += 1
+            try:
+                self._write_chunk(writer, self.header)
+                index = 0
+                while True:
+                    chunks = await channel.read(index)
+                    if not chunks:
+                        break
+                    index += len(chunks)
+                    for chunk in chunks:
+                        self._write_chunk(writer, chunk)
+                    await writer.drain()
+                writer.write(b'0\r\n\r\n')
+                await writer.drain()
+            finally:
+                channel.readers -= 1
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            logger.debug(f"Audio stream client disconnected: {e}")
+        except Exception as e:
+            logger.info(f"Error streaming audio: {e}")
+        finally:
+            writer.close()
+
+    async def _send_clip(self, writer, method, clip_id):
+        clip = await asyncio.get_running_loop().run_in_executor(None, self.clip_store.get, clip_id) if self.clip_store else None
+        if clip is None:
+            writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+        else:
+            content, content_type = clip
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: %s\r\n'
+                b'Content-Length: %d\r\n'
+                b'Cache-Control: private, max-age=86400\r\n'
+                b'Connection: close\r\n\r\n' % (content_type.encode(), len(content))
+            )
+            if method == 'GET':
+                writer.write(content)
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer, data):
+        writer.write(b'%x\r\n' % len(data))
+        writer.write(data)
+        writer.write(b'\r\n')
+
+server = AudioStreamServer(clip_store=audio_store.store)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Pre-render translated speech for a JSONL file of phrases (signage, menus, IVR prompts).
+
+Each input line is a JSON object with an id ("id" or "request_id"), the Korean "text" and optionally
+the target "language" (--language otherwise), e.g.
+
+    {"id": "menu-001", "text": "오늘의 추천 메뉴입니다.", "language": "Japanese"}
+
+Every phrase is translated by text2speech on one of --concurrency translator sessions, its audio is
+written to <out>/<id>.wav (24 kHz mono 16-bit) and a line is appended to <out>/results.jsonl:
+
+    {"id": "menu-001", "language": "Japanese", "status": "ok", "translation": "...", "audio": "menu-001.wav",
+     "audio_seconds": 1.92, "seconds": 2.41}
+
+Ids that already have an "ok" result and their audio file are skipped, so an interrupted run
+continues where it stopped when it is started again with the same --out.
+
+Usage: python application/batch_translate.py phrases.jsonl --out rendered/ [--concurrency 8] [--language Japanese]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+import wave
+
+import translator
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("batch_translate")
+
+RESULTS_FILE = "results.jsonl"
+SAFE_NAME = re.compile(r'[^\w.-]+')
+
+def load_items(path, default_language):
+    """Read the phrases of a JSONL file as dicts with id, text and language."""
+    items = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+            item_id = str(entry.get("id") or entry.get("request_id") or line_number)
+            text = entry.get("text") or entry.get("body")
+            language = entry.get("language") or default_language
+            if not text or not language:
+                raise ValueError(f"{path}:{line_number}: text and language are required")
+            if audio_name(item_id) in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate id {item_id} (or one with the same file name)")
+            seen.add(audio_name(item_id))
+            items.append({"id": item_id, "text": text, "language": language})
+    return items
+
+def load_done(out_dir):
+    """Ids with an ok result whose audio file exists; a partly written last line is ignored."""
+    done = set()
+    path = os.path.join(out_dir, RESULTS_FILE)
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if result.get("status") == "ok" and os.path.exists(os.path.join(out_dir, result["audio"])):
+                done.add(result["id"])
+    return done
+
+def audio_name(item_id):
+    return SAFE_NAME.sub("_", item_id) + ".wav"
+
+def take(pending, language):
+    """Remove and return the next phrase in language, or the next phrase when none is left in it."""
+    for i, item in enumerate(pending):
+        if item["language"] == language:
+            return pending.pop(i)
+    return pending.pop(0)
+
+def write_wav(path, pcm):
+    """Write the audio through a temporary file so a crash never leaves a truncated clip behind."""
+    tmp_path = path + ".tmp"
+    with wave.open(tmp_path, 'wb') as wav_file:
+        wav_file.setnchannels(translator.CHANNELS)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(translator.OUTPUT_SAMPLE_RATE)
+        wav_file.writeframes(pcm)
+    os.replace(tmp_path, path)
+
+class BatchTranslator:
+    """Runs a list of phrases through a bounded number of text2speech sessions."""
+
+    def __init__(self, out_dir, concurrency=4, timeout=30.0, retries=1):
+        self.out_dir = out_dir
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.results = None
+        self.total = 0
+        self.finished = 0
+        self.failed = 0
+
+    async def _start(self, worker, session, language):
+        """Return a running text2speech session for language, replacing session if needed."""
+        if session and session.is_active and session.language == language and not session.task.done():
+            return session
+        if session:
+            await session.stop()
+            translator.remove_session(session.session_id)
+        session = translator.get_session(f"batch-{worker}")
+        session.use_streamlit_audio = True
+        session.collect_audio = False  # request.result() returns the audio of each phrase
+        session.task = asyncio.create_task(session.text2speech(language))
+        ready_task = asyncio.create_task(session.ready.wait())
+        await asyncio.wait([ready_task, session.task], timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not ready_task.done():
+            ready_task.cancel()
+            raise RuntimeError(f"Translator session {session.session_id} failed to start")
+        return session
+
+    async def _translate(self, session, item):
+        request = await session.send_text_input(item["text"])
+        translation, audio = await request.result(timeout=self.timeout)
+        if not translation or not audio:
+            raise RuntimeError("no translation" if not translation else "no audio")
+        return translation, audio
+
+    def _record(self, result):
+        self.results.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.results.flush()
+        self.finished += 1
+        if result["status"] != "ok":
+            self.failed += 1
+        logger.info(f"[{self.finished}/{self.total}] {result['id']}: {result['status']} {result.get('error') or result['translation']}")
+
+    async def _worker(self, worker, pending):
+        loop = asyncio.get_running_loop()
+        session = None
+        try:
+            while pending:
+                item = take(pending, session.language if session else None)
+                started_at = time.monotonic()
+                result = {"id": item["id"], "language": item["language"]}
+                for attempt in range(self.retries + 1):
+                    try:
+                        session = await self._start(worker, session, item["language"])
+                        translation, audio = await self._translate(session, item)
+                        name = audio_name(item["id"])
+                        await loop.run_in_executor(None, write_wav, os.path.join(self.out_dir, name), audio)
+                        result.pop("error", None)
+                        result.update(
+                            status="ok", translation=translation, audio=name,
+                            audio_seconds=round(len(audio) / (2 * translator.OUTPUT_SAMPLE_RATE), 3)
+                        )
+                        break
+                    except Exception as e:
+                        logger.info(f"[batch-{worker}] {item['id']} failed (attempt {attempt + 1}): {e}")
+                        result.update(status="error", error=str(e))
+                        if isinstance(e, translator.TurnIncompleteError) and session:
+                            # The rest of the unfinished turn would be read as the answer to the retry
+                            await session.stop()
+                result["seconds"] = round(time.monotonic() - started_at, 3)
+                self._record(result)
+        finally:
+            if session:
+                await session.stop()
+                translator.remove_session(session.session_id)
+
+    async def run(self, items):
+        """Translate the items that have no result yet; returns the number of failed items."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        done = load_done(self.out_dir)
+        pending = [item for item in items if item["id"] not in done]
+        self.total = len(pending)
+        logger.info(f"{len(items)} phrases, {len(items) - len(pending)} already rendered, {len(pending)} to go")
+        if not pending:
+            return 0
+
+        # Workers share the list and prefer phrases of their session's language
+        pending.sort(key=lambda item: item["language"])
+        workers = min(self.concurrency, len(pending))
+
+        started_at = time.monotonic()
+        with open(os.path.join(self.out_dir, RESULTS_FILE), "a", encoding="utf-8") as self.results:
+            await asyncio.gather(*(self._worker(w, pending) for w in range(workers)))
+        elapsed = time.monotonic() - started_at
+        logger.info(f"Rendered {self.finished - self.failed}/{self.total} phrases in {elapsed:.1f}s "
+                    f"({self.finished / elapsed:.2f} phrases/s, {workers} sessions), {self.failed} failed")
+        return self.failed
+
+def main():
+    parser = argparse.ArgumentParser(description='translate a JSONL file of phrases into speech')
+    parser.add_argument('input', help='JSONL file with id, text and language per line')
+    parser.add_argument('--out', required=True, help='directory of the audio files and results.jsonl')
+    parser.add_argument('--language', help='target language of lines without one')
+    parser.add_argument('--concurrency', type=int, default=4, help='translator sessions running at once')
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for a session or a translation')
+    parser.add_argument('--retries', type=int, default=1, help='retries of a failed phrase')
+    args = parser.parse_args()
+
+    items = load_items(args.input, args.language)
+    batch = BatchTranslator(args.out, concurrency=max(1, args.concurrency), timeout=args.timeout, retries=args.retries)
+    failed = asyncio.run(batch.run(items))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import asyncio
+import collections
+import logging
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("bounded_queue")
+
+# What a full queue does with a new item:
+#   block         put() waits for space (backpressure on the producer)
+#   drop_oldest   the oldest item is discarded to make room
+#   drop_silence  the new item is discarded if is_silent(item) is true, otherwise the oldest item is
+POLICIES = ("block", "drop_oldest", "drop_silence")
+
+class BoundedQueue(asyncio.Queue):
+    """asyncio.Queue with a size limit, an overflow policy and counters (high-water mark, drops, blocked puts)."""
+
+    def __init__(self, name, maxsize=0, policy="block", is_silent=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        if policy == "drop_silence" and is_silent is None:
+            raise ValueError("drop_silence needs an is_silent function")
+        super().__init__(maxsize)
+        self.name = name
+        self.policy = policy
+        self.is_silent = is_silent
+        self.returned = collections.deque()  # items put back by unget(), taken before the queued ones
+
+        # Counters
+        self.puts = 0
+        self.high_water = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.full_logged = False
+
+    async def put(self, item):
+        if self.full():
+            if self._overflow(item):
+                return
+            if self.full():
+                self.blocked += 1
+        await super().put(item)
+
+    def put_nowait(self, item):
+        """Add an item without waiting; raises asyncio.QueueFull when a full queue's policy does not drop."""
+        if self.full() and self._overflow(item):
+            return
+        super().put_nowait(item)
+
+    async def get(self):
+        if self.returned:
+            return self.returned.popleft()
+        return await super().get()
+
+    def get_nowait(self):
+        if self.returned:
+            return self.returned.popleft()
+        return super().get_nowait()
+
+    def unget(self, item):
+        """
+        Put an item taken by get() back at the front, even when the queue is full.
+
+        The item is returned by the next get(), so only the consumer that took it should put it back
+        (a get() already waiting is not woken). It stays counted as unfinished until its task_done().
+        """
+        self.returned.appendleft(item)
+        self.high_water = max(self.high_water, self.qsize())
+
+    def qsize(self):
+        return len(self.returned) + super().qsize()
+
+    def empty(self):
+        return not self.returned and super().empty()
+
+    def _put(self, item):
+        super()._put(item)
+        self.puts += 1
+        if self.qsize() > self.high_water:
+            self.high_water = self.qsize()
+
+    def _overflow(self, item):
+        """Apply the policy to a full queue; returns True if the new item was dropped."""
+        if not self.full_logged:
+            self.full_logged = True
+            logger.info(f"Queue {self.name} reached its limit of {self.maxsize} items (policy: {self.policy})")
+
+        if self.policy == "drop_silence" and self.is_silent(item):
+            self.dropped += 1
+            return True
+        if self.policy in ("drop_oldest", "drop_silence"):
+            self.get_nowait()
+            self.task_done()
+            self.dropped += 1
+        return False
+
+    def drain(self):
+        """Remove and return every waiting item without blocking."""
+        items = []
+        while not self.empty():
+            items.append(self.get_nowait())
+        return items
+
+    def stats(self):
+        return {
+            "size": self.qsize(),
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "high_water": self.high_water,
+            "puts": self.puts,
+            "dropped": self.dropped,
+            "blocked": self.blocked,
+        }
@@ -7,9 +7,17 @@ import time
 import info 
 import utils
 import translator
+import audio_stream
+import audio_store
+import translation_cache
+import metrics
+import base64
 import asyncio
+import threading
+import queue
 
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from langchain_aws import ChatBedrock
 from botocore.config import Config
@@ -91,12 +99,9 @@ agent_type = 'langgraph'
 enable_memory = 'Disable'
 user_id = agent_type # for testing
 
-language = "Japanese"
-traslation_mode = "text2speech"
-
 def update(modelName, debugMode, langMode, traslationMode):    
     global model_name, model_id, model_type, debug_mode
-    global models, user_id, agent_type, language, traslation_mode
+    global models, user_id, agent_type
 
     # load mcp.env    
     # mcp_env = utils.load_mcp_env()
@@ -117,13 +122,9 @@ def update(modelName, debugMode, langMode, traslationMode):
     # utils.save_mcp_env(mcp_env)
     # logger.info(f"mcp.env updated: {mcp_env}")
 
-    if language != langMode:
-        language = langMode
-        logger.info(f"language: {language}")
-
-    if traslation_mode != traslationMode:
-        traslation_mode = traslationMode
-        logger.info(f"traslation_mode: {traslation_mode}")
+    # The language and translation mode belong to the caller's Streamlit session, so they are not kept here
+    if traslationMode in ("text2speech", "speech2text"):
+        prewarm_translator(langMode, traslationMode)
 
 def update_mcp_env():
     mcp_env = utils.load_mcp_env()
@@ -1065,220 +1066,332 @@ def get_tool_info(tool_name, tool_content):
     return content, urls, tool_references
 
 
-# Global variables to track event loop and background task
+# Event loop shared by every translator session
 _translator_loop = None
-_background_task = None
+_translator_loop_lock = threading.Lock()
+
+# Translator request metrics, exported with the rest of the registry on /metrics (metrics_server, started by app.py)
+REQUESTS = metrics.registry.counter("translator_requests_total", "Translator requests by mode and result (ok, empty, cached, error)")
+REQUEST_LATENCY = metrics.registry.histogram("translator_request_seconds", "End-to-end time of translator requests by mode")
+LOOP_LAG = metrics.registry.gauge("translator_event_loop_lag_seconds", "How late the translator event loop runs a scheduled wakeup")
+CACHE_HIT_RATIO = metrics.registry.gauge("cache_hit_ratio", "Hit ratio of the translation cache and the audio store")
+CACHE_LOOKUPS = metrics.registry.counter("cache_lookups_total", "Lookups of the translation cache and the audio store by result")
+CACHE_BYTES = metrics.registry.gauge("cache_bytes", "Bytes held by the translation cache and the audio store by tier")
+LOOP_LAG_INTERVAL = 0.5  # seconds between event loop lag probes
+
+_loop_tick = None  # time.monotonic() when the lag probe last ran
+_loop_lag = 0.0
+
+async def _probe_loop_lag():
+    """Measure how late the loop wakes up from a sleep of LOOP_LAG_INTERVAL."""
+    global _loop_tick, _loop_lag
+    loop = asyncio.get_running_loop()
+    while True:
+        _loop_tick = time.monotonic()
+        expected = loop.time() + LOOP_LAG_INTERVAL
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        _loop_lag = max(0.0, loop.time() - expected)
+
+def _collect_loop_lag():
+    if _loop_tick is None:
+        return
+    # A loop that is stuck right now has not run the probe since its last tick
+    LOOP_LAG.set(round(max(_loop_lag, time.monotonic() - _loop_tick - LOOP_LAG_INTERVAL, 0.0), 4))
+
+_cache_lookups_seen = dict()  # (cache, result) -> lookups already added to CACHE_LOOKUPS
+
+def _collect_caches():
+    for name, stats in (("translation", translation_cache.cache.stats()), ("audio", audio_store.store.stats())):
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        if lookups:
+            CACHE_HIT_RATIO.set(round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4), cache=name)
+        for result in ("memory_hits", "disk_hits", "misses"):
+            # The caches keep running totals; the counter gets what was added since the last scrape
+            seen = _cache_lookups_seen.get((name, result), 0)
+            if stats[result] > seen:
+                CACHE_LOOKUPS.inc(stats[result] - seen, cache=name, result=result)
+                _cache_lookups_seen[(name, result)] = stats[result]
+        CACHE_BYTES.set(stats["memory_bytes"], cache=name, tier="memory")
+    CACHE_BYTES.set(audio_store.store.stats()["disk_bytes"], cache="audio", tier="disk")
+
+metrics.registry.add_collector(_collect_loop_lag)
+metrics.registry.add_collector(_collect_caches)
 
 def get_or_create_loop():
     """Get existing event loop or create a new one."""
     global _translator_loop
     
-    if _translator_loop is None or _translator_loop.is_closed():
-        # Create new event loop
-        _translator_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_translator_loop)
-        logger.info(f"Created new event loop: {_translator_loop}")
-        # Start loop in background thread
-        import threading
-        def run_loop():
-            _translator_loop.run_forever()
-        thread = threading.Thread(target=run_loop, daemon=True)
-        thread.start()
-        logger.info("Started event loop in background thread")
-    else:
-        logger.info(f"Using existing event loop: {_translator_loop}")
+    with _translator_loop_lock:
+        if _translator_loop is None or _translator_loop.is_closed():
+            # Create new event loop
+            _translator_loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(_translator_loop)
+            logger.info(f"Created new event loop: {_translator_loop}")
+            # Start loop in background thread
+            def run_loop():
+                _translator_loop.run_forever()
+            thread = threading.Thread(target=run_loop, daemon=True)
+            thread.start()
+            logger.info("Started event loop in background thread")
+            asyncio.run_coroutine_threadsafe(_probe_loop_lag(), _translator_loop)
+        else:
+            logger.info(f"Using existing event loop: {_translator_loop}")
     
     return _translator_loop
 
-async def _run_text2speech_async(text, language):
-    """Async implementation of run_translator."""
-    global _background_task
-    
+async def _start_translator_session(session_id, language, translation_mode):
+    """Return the translator session of session_id, (re)starting it for language and translation_mode."""
+    session = translator.get_session(session_id)
+
     # Enable Streamlit audio mode for Docker/Streamlit environment
-    translator.use_streamlit_audio = True
-    
-    logger.info(f"is_active: {translator.is_active}")    
-    if not translator.is_active:        
+    session.use_streamlit_audio = True
+
+    # The system prompt is fixed per session, so a new language or mode needs a new session
+    if session.is_active and (session.language != language or session.translation_mode != translation_mode):
+        logger.info(f"[{session_id}] Translation settings changed. Stopping current session...")
+        await session.stop()
+
+    logger.info(f"[{session_id}] is_active: {session.is_active}")
+    if not session.is_active:        
         logger.info(f"Starting translator as background task...")
         # Use the persistent loop created by run_translator
         loop = get_or_create_loop()
-        _background_task = loop.create_task(translator.text2speech(language))
-        logger.info(f"Created translate task: {_background_task}")
+        if translation_mode == "text2speech":
+            session.task = loop.create_task(session.text2speech(language))
+        else:
+            session.task = loop.create_task(session.speech2text(language))
+        logger.info(f"Created translate task: {session.task}")
 
-        await asyncio.sleep(0.5)
-    
-    if _background_task and not _background_task.done():
-        await asyncio.sleep(0.1)
+    # Wait until the session accepts input (immediate when a pre-warmed stream was available)
+    ready_task = asyncio.create_task(session.ready.wait())
+    done, pending = await asyncio.wait([ready_task, session.task], timeout=10.0, return_when=asyncio.FIRST_COMPLETED)
+    if ready_task not in done:
+        ready_task.cancel()
+        raise RuntimeError(f"Translator session {session_id} failed to start")
 
-    # Send text using send_text_input with provided text
-    logger.info(f"Sending text: {text}")
-    await translator.send_text_input(text=text)
+    return session
 
+def prewarm_translator(language, translation_mode):
+    """Start pre-warming Nova Sonic streams for language and translation_mode."""
+    loop = get_or_create_loop()
+    loop.call_soon_threadsafe(translator.pool.prewarm, language, translation_mode)
+
+async def _wait_audio_collected(session, timeout):
+    """The end of a turn follows its audio on audio_queue; wait until play_audio has taken all of it."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(timeout, 0)
+    while not session.audio_queue.empty() and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+
+async def _collect_translation(session, timeout=30.0, on_text=None):
+    """Read translated text chunks from the output queue of a session until the assistant turn ends."""
     # Wait for response from output_queue
     logger.info(f"Waiting for response from output_queue")
-    translated_text = ""
+    response_chunks = []
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
     try:
-        # Wait for response with timeout (30 seconds)
-        response_chunks = []
-        timeout = 30.0  # seconds
-        start_time = time.time()
-        
-        consecutive_timeouts = 0
-        max_consecutive_timeouts = 3  # Wait for 3 consecutive timeouts before giving up
-        
         while True:
-            try:
-                # Wait for chunk with timeout
-                remaining_time = timeout - (time.time() - start_time)
-                if remaining_time <= 0:
-                    logger.info("Timeout waiting for translation response")
-                    break
-                    
-                chunk = await asyncio.wait_for(
-                    translator.output_queue.get(),
-                    timeout=min(remaining_time, 1.5)  # Check every 1.5 seconds
-                )
-                
-                # Reset timeout counter when we receive a chunk
-                consecutive_timeouts = 0
-                
-                response_chunks.append(chunk)
-                logger.info(f"Received translation chunk: {chunk}")
-                        
-            except asyncio.TimeoutError:
-                consecutive_timeouts += 1
-                logger.debug(f"Timeout waiting for chunk (consecutive: {consecutive_timeouts})")
-                
-                # Check if there are any chunks in the queue that arrived during the timeout
-                while not translator.output_queue.empty():
-                    try:
-                        chunk = translator.output_queue.get_nowait()
-                        consecutive_timeouts = 0  # Reset counter if we get a chunk
-                        response_chunks.append(chunk)
-                        logger.info(f"Received translation chunk after timeout check: {chunk}")
-                    except asyncio.QueueEmpty:
-                        break
-                
-                # If we have chunks and had multiple consecutive timeouts, assume response is complete
-                if response_chunks and consecutive_timeouts >= max_consecutive_timeouts:
-                    logger.info(f"Received {consecutive_timeouts} consecutive timeouts, assuming translation complete")
-                    break
-                
-                # If no chunks yet, continue waiting
-                if not response_chunks:
-                    remaining_time = timeout - (time.time() - start_time)
-                    if remaining_time <= 0:
-                        logger.info("Overall timeout waiting for translation response")
-                        break
-                    continue
-        
-        translated_text = "".join(response_chunks) if response_chunks else text
-        logger.info(f"Final translated text: {translated_text}")
-        
-        # Wait a bit more for audio to be collected
-        await asyncio.sleep(1.0)
-        
+            remaining_time = deadline - loop.time()
+            if remaining_time <= 0:
+                logger.info("Timeout waiting for translation response")
+                break
+
+            chunk = await asyncio.wait_for(session.output_queue.get(), timeout=remaining_time)
+            if chunk == translator.END_OF_TURN:
+                break
+
+            response_chunks.append(chunk)
+            logger.info(f"Received translation chunk: {chunk}")
+            if on_text:
+                on_text(chunk)
+
+        await _wait_audio_collected(session, deadline - loop.time())
+
+    except asyncio.TimeoutError:
+        logger.info("Timeout waiting for translation response")
     except Exception as e:
         error_msg = str(e) if e else "Unknown error"
         logger.info(f"Error reading from output_queue: {error_msg}")
         if hasattr(e, '__traceback__'):
-            import traceback
             logger.debug(f"Traceback: {traceback.format_exc()}")
-    
+
+    translated_text = "".join(response_chunks)
+    logger.info(f"Final translated text: {translated_text}")
     return translated_text
 
-async def _run_speech2text_async(language):
-    """Async implementation of run_speech2text."""
-    global _background_task
-    
-    # Enable Streamlit audio mode for Docker/Streamlit environment
-    translator.use_streamlit_audio = True
-    
-    logger.info(f"is_active: {translator.is_active}")    
-    if not translator.is_active:        
-        logger.info(f"Starting translator as background task...")
-        # Use the persistent loop created by run_translator
-        loop = get_or_create_loop()
-        _background_task = loop.create_task(translator.speech2text(language))
-        logger.info(f"Created translate task: {_background_task}")
+def _record_request(mode, started_at, translated_text=None, error=None):
+    result = "error" if error else ("ok" if translated_text else "empty")
+    REQUESTS.inc(mode=mode, result=result)
+    REQUEST_LATENCY.observe(time.monotonic() - started_at, mode=mode)
+
+async def _run_text2speech_async(session_id, text, language, stream_id=None, on_text=None):
+    """
+    Async implementation of run_text2speech; returns (translated text, True if the turn ended with END_TURN, clip id).
+
+    The clip is this request's own audio (from its stream channel, if any) in the audio store.
+    """
+    channel = audio_stream.server.channels.get(stream_id) if stream_id else None
+    started_at = time.monotonic()
+    translated_text = None
+    completed = False
+    error = None
+    try:
+        session = await _start_translator_session(session_id, language, "text2speech")
+        # The audio of the request is read from the request, not from the session's shared audio_chunks
+        session.collect_audio = False
 
-        await asyncio.sleep(0.5)
-    
-    if _background_task and not _background_task.done():
-        await asyncio.sleep(0.1)
+        # Send text using send_text_input with provided text; only this request's answer is read back
+        logger.info(f"Sending text: {text}")
+        request = await session.send_text_input(text=text)
 
-    # Wait for response from output_queue
-    logger.info(f"Waiting for response from output_queue")
-    translated_text = ""
-    try:
-        # Wait for response with timeout (30 seconds)
-        response_chunks = []
-        timeout = 30.0  # seconds
-        start_time = time.time()
-        
-        consecutive_timeouts = 0
-        max_consecutive_timeouts = 3  # Wait for 3 consecutive timeouts before giving up
-        
-        while True:
-            try:
-                # Wait for chunk with timeout
-                remaining_time = timeout - (time.time() - start_time)
-                if remaining_time <= 0:
-                    logger.info("Timeout waiting for translation response")
-                    break
-                    
-                chunk = await asyncio.wait_for(
-                    translator.output_queue.get(),
-                    timeout=min(remaining_time, 1.5)  # Check every 1.5 seconds
-                )
-                
-                # Reset timeout counter when we receive a chunk
-                consecutive_timeouts = 0
-                
-                response_chunks.append(chunk)
-                logger.info(f"Received translation chunk: {chunk}")
-                        
-            except asyncio.TimeoutError:
-                consecutive_timeouts += 1
-                logger.debug(f"Timeout waiting for chunk (consecutive: {consecutive_timeouts})")
-                
-                # Check if there are any chunks in the queue that arrived during the timeout
-                while not translator.output_queue.empty():
-                    try:
-                        chunk = translator.output_queue.get_nowait()
-                        consecutive_timeouts = 0  # Reset counter if we get a chunk
-                        response_chunks.append(chunk)
-                        logger.info(f"Received translation chunk after timeout check: {chunk}")
-                    except asyncio.QueueEmpty:
-                        break
-                
-                # If we have chunks and had multiple consecutive timeouts, assume response is complete
-                if response_chunks and consecutive_timeouts >= max_consecutive_timeouts:
-                    logger.info(f"Received {consecutive_timeouts} consecutive timeouts, assuming translation complete")
-                    break
-                
-                # If no chunks yet, continue waiting
-                if not response_chunks:
-                    remaining_time = timeout - (time.time() - start_time)
-                    if remaining_time <= 0:
-                        logger.info("Overall timeout waiting for translation response")
-                        break
-                    continue
-        
-        translated_text = "".join(response_chunks) if response_chunks else text
+        # Audio goes out to the browser as soon as it arrives; with a channel it is kept there only
+        try:
+            translated_text, audio = await request.result(timeout=30.0, on_audio=channel.write if channel else None, on_text=on_text, keep_audio=channel is None)
+            completed = bool(translated_text)
+        except translator.TurnIncompleteError as e:
+            # Shown to the user but never cached
+            logger.info(f"Incomplete translation ({e.reason})")
+            translated_text, audio = e.text, e.audio
         logger.info(f"Final translated text: {translated_text}")
-        
-        # Wait a bit more for audio to be collected
-        await asyncio.sleep(1.0)
-        
+        pcm = channel.pcm() if channel else audio
+        audio_id = await asyncio.get_running_loop().run_in_executor(None, _store_audio, pcm) if pcm else None
+        return translated_text, completed, audio_id
     except Exception as e:
-        error_msg = str(e) if e else "Unknown error"
-        logger.info(f"Error reading from output_queue: {error_msg}")
-        if hasattr(e, '__traceback__'):
-            import traceback
-            logger.debug(f"Traceback: {traceback.format_exc()}")
-    
-    return translated_text
+        error = e
+        raise
+    finally:
+        _record_request("text2speech", started_at, translated_text, error)
+        if channel:
+            channel.close()
+
+async def _run_speech2text_async(session_id, language, stream_id=None, on_text=None):
+    """Async implementation of run_speech2text."""
+    channel = audio_stream.server.channels.get(stream_id) if stream_id else None
+    started_at = time.monotonic()
+    translated_text = None
+    error = None
+    session = None
+    try:
+        session = await _start_translator_session(session_id, language, "speech2text")
+        session.collect_audio = channel is None
+        # Only the audio of this turn goes into its clip
+        session.clear_audio_chunks()
+        session.audio_channel = channel
+        translated_text = await _collect_translation(session, on_text=on_text)
+        return translated_text
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _record_request("speech2text", started_at, translated_text, error)
+        if session:
+            session.audio_channel = None
+        if channel:
+            channel.close()
+
+async def _open_audio_stream():
+    await audio_stream.server.start()
+    channel = audio_stream.server.open_channel()
+    return channel.stream_id, audio_stream.server.url(channel.stream_id)
+
+def open_audio_stream():
+    """Start the audio stream server if needed and return (stream_id, url) of a new audio channel, or (None, None)."""
+    loop = get_or_create_loop()
+    try:
+        future = asyncio.run_coroutine_threadsafe(_open_audio_stream(), loop)
+        return future.result(timeout=10.0)
+    except Exception as e:
+        logger.info(f"Audio streaming is not available: {e}")
+        return None, None
+
+async def _close_translator_session(session_id):
+    session = translator.remove_session(session_id)
+    if session:
+        await session.stop()
+
+def _store_audio(pcm):
+    audio_id = audio_store.store.put(pcm)
+    logger.info(f"Stored audio {audio_id}: {len(pcm)} bytes PCM, {audio_store.store.stats()}")
+    return audio_id
+
+def save_translation_audio(session_id, stream_id=None):
+    """Move the audio of the last speech2text translation of a session (streamed to stream_id, if given) into the audio store; returns its clip id."""
+    channel = audio_stream.server.channels.get(stream_id) if stream_id else None
+    if channel:
+        pcm = channel.pcm()
+    else:
+        session = translator.sessions.get(session_id)
+        if not session:
+            return None
+        pcm = b''.join(session.audio_chunks)
+        session.clear_audio_chunks()
+    if not pcm:
+        return None
+    return _store_audio(pcm)
+
+def audio_clip_src(audio_id):
+    """URL of a stored clip; a data URL when the audio stream server is not running."""
+    if audio_stream.server.server is not None:
+        return audio_stream.server.clip_url(audio_id)
+    clip = audio_store.store.get(audio_id)
+    if clip is None:
+        return None
+    content, content_type = clip
+    return f"data:{content_type};base64,{base64.b64encode(content).decode('utf-8')}"
+
+# Audio store clip of each cached translation (cache key -> clip id), so repeated hits share one clip
+cached_audio_ids = dict()
+
+def _remember_audio_id(key, audio_id):
+    cached_audio_ids.pop(key, None)
+    cached_audio_ids[key] = audio_id
+    if len(cached_audio_ids) > translation_cache.TRANSLATION_CACHE_MAX_ROWS:
+        cached_audio_ids.pop(next(iter(cached_audio_ids)), None)
+
+def lookup_translation(text, language, mode="text2speech"):
+    """
+    Return the cached translation of text as {"translation", "pronunciation", "audio_id"}, or None.
+
+    The cached audio is registered in the audio store once per cache key, so the history can reference
+    it like new audio; it is registered again only after the store evicted it.
+    """
+    entry = translation_cache.cache.get(text, language, mode, translator.VOICE_ID)
+    if entry is None:
+        return None
+    REQUESTS.inc(mode=mode, result="cached")
+    audio_id = None
+    if entry["audio"]:
+        key = translation_cache.cache_key(text, language, mode, translator.VOICE_ID)
+        audio_id = cached_audio_ids.get(key)
+        if audio_id is None or not audio_store.store.has(audio_id):
+            audio_id = audio_store.store.put_encoded(entry["audio_format"], entry["audio"])
+            _remember_audio_id(key, audio_id)
+    logger.info(f"Translation cache hit: {translation_cache.cache.stats()}")
+    return {"translation": entry["translation"], "pronunciation": entry["pronunciation"], "audio_id": audio_id}
+
+def cache_translation(text, language, translation, pronunciation, audio_id, mode="text2speech"):
+    """Cache a translation whose turn completed with END_TURN, together with its stored audio and pronunciation."""
+    encoded = audio_store.store.get_encoded(audio_id) if audio_id else None
+    if not translation or encoded is None:
+        return  # no translation or no audio
+    translation_cache.cache.put(
+        text, language, mode, translator.VOICE_ID, translation,
+        pronunciation=pronunciation, audio_format=encoded[0], audio=encoded[1]
+    )
+    _remember_audio_id(translation_cache.cache_key(text, language, mode, translator.VOICE_ID), audio_id)
+
+def close_translator_session(session_id):
+    """Stop the translator session of session_id and drop it from the registry."""
+    if session_id not in translator.sessions:
+        return
+    loop = get_or_create_loop()
+    future = asyncio.run_coroutine_threadsafe(_close_translator_session(session_id), loop)
+    future.result(timeout=10.0)
+
+def translator_metrics():
+    """Snapshot of the in-process metrics (turn latencies, session setup, restarts)."""
+    return metrics.registry.snapshot()
 
 def pronunciate_to_korean(context, language):
     system = (
@@ -1310,7 +1423,75 @@ def pronunciate_to_korean(context, language):
 
     return msg[msg.find('<result>')+8:len(msg)-9] # remove <result> tag
 
-def run_text2speech(text):
+# A sentence ends at terminal punctuation (Latin or CJK), including closing quotes/brackets after it
+SENTENCE_END = re.compile(r'[.!?。！？…]+[\"\'」』”’)\]]*')
+
+def split_sentences(text):
+    """Split text into its complete sentences and the unfinished remainder."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, text[start:]
+
+pronunciation_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pronunciation")
+
+class PronunciationStream:
+    """
+    Pronunciation of a translation that is still being generated.
+
+    feed() receives translated text as it comes off the output stream (on the translator loop).
+    Each complete sentence is sent to the LLM right away, so pronunciation runs alongside the audio
+    synthesis instead of after it. Iterating the stream (on the Streamlit thread) yields the
+    pronunciation of each sentence in order as soon as it is ready; close() ends it.
+    """
+
+    def __init__(self, language):
+        self.language = language
+        self.pending = ""
+        self.parts = queue.Queue()  # Future per sentence, None after the last one
+
+    def feed(self, text):
+        self.pending += text
+        sentences, self.pending = split_sentences(self.pending)
+        for sentence in sentences:
+            logger.info(f"Pronouncing: {sentence}")
+            self.parts.put(pronunciation_executor.submit(pronunciate_to_korean, sentence, self.language))
+
+    def close(self):
+        if self.pending.strip():
+            self.parts.put(pronunciation_executor.submit(pronunciate_to_korean, self.pending.strip(), self.language))
+        self.pending = ""
+        self.parts.put(None)
+
+    def __iter__(self):
+        first = True
+        while True:
+            part = self.parts.get()
+            if part is None:
+                return
+            try:
+                text = part.result()
+            except Exception as e:
+                logger.info(f"Error pronouncing a sentence: {e}")
+                continue
+            yield text if first else " " + text
+            first = False
+
+def start_text2speech(text, session_id, language, stream_id=None, on_text=None):
+    """Start run_text2speech on the translator loop and return its concurrent.futures.Future of (translated text, completed, clip id)."""
+    loop = get_or_create_loop()
+    return asyncio.run_coroutine_threadsafe(_run_text2speech_async(session_id, text, language, stream_id, on_text), loop)
+
+def start_speech2text(session_id, language, stream_id=None, on_text=None):
+    """Start run_speech2text on the translator loop and return its concurrent.futures.Future."""
+    loop = get_or_create_loop()
+    return asyncio.run_coroutine_threadsafe(_run_speech2text_async(session_id, language, stream_id, on_text), loop)
+
+def run_text2speech(text, session_id, language, stream_id=None):
     """Synchronous wrapper for run_text2speech that uses persistent event loop."""
     # Get or create persistent event loop
     loop = get_or_create_loop()
@@ -1318,13 +1499,13 @@ def run_text2speech(text):
     # Run the async function in the persistent loop
     if loop.is_running():
         # If loop is already running, schedule the coroutine
-        future = asyncio.run_coroutine_threadsafe(_run_text2speech_async(text, language), loop)
-        return future.result(timeout=35.0)  # Wait up to 35 seconds
+        future = asyncio.run_coroutine_threadsafe(_run_text2speech_async(session_id, text, language, stream_id), loop)
+        return future.result(timeout=35.0)[0]  # Wait up to 35 seconds
     else:
         # If loop is not running, run it
-        return loop.run_until_complete(_run_text2speech_async(text, language))
+        return loop.run_until_complete(_run_text2speech_async(session_id, text, language, stream_id))[0]
 
-def run_speech2text(st):
+def run_speech2text(session_id, language, stream_id=None):
     """Synchronous wrapper for run_speech2text that uses persistent event loop."""
     # Get or create persistent event loop
     loop = get_or_create_loop()
@@ -1332,9 +1513,8 @@ def run_speech2text(st):
     # Run the async function in the persistent loop
     if loop.is_running():
         # If loop is already running, schedule the coroutine
-        future = asyncio.run_coroutine_threadsafe(_run_speech2text_async(language), loop)
+        future = asyncio.run_coroutine_threadsafe(_run_speech2text_async(session_id, language, stream_id), loop)
         return future.result(timeout=35.0)  # Wait up to 35 seconds
     else:
         # If loop is not running, run it
-        return loop.run_until_complete(_run_speech2text_async(language))
-
+        return loop.run_until_complete(_run_speech2text_async(session_id, language, stream_id))
@@ -0,0 +1,87 @@
+import atexit
+import binascii
+import json
+import os
+import re
+
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library parser is used without it
+    orjson = None
+
+# Decoder for the events received on a bidirectional stream. The event type is read from the raw
+# bytes, so the caller can dispatch without walking the parsed document. audioOutput events are the
+# bulk of the bytes: their base64 content is cut out of the raw event and decoded straight to PCM,
+# and only the few remaining fields are parsed as JSON. orjson is used when it is installed.
+
+EVENT_TYPE = re.compile(rb'\s*\{\s*"event"\s*:\s*\{\s*"(\w+)"')
+AUDIO_CONTENT = re.compile(rb'"content"\s*:\s*"')
+
+loads = orjson.loads if orjson else json.loads
+
+# Append every received event to this file, one per line, to replay it in benchmark/bench_event_decoder.py
+EVENT_RECORDING = os.environ.get("SONIC_EVENT_RECORDING")
+_recording = None
+
+def record(raw):
+    """Append a raw event to EVENT_RECORDING."""
+    global _recording
+    if _recording is None:
+        _recording = open(EVENT_RECORDING, 'ab')
+        atexit.register(_recording.close)
+    # Newlines can only be whitespace between JSON tokens
+    _recording.write(raw.replace(b'\n', b' ') + b'\n')
+
+def decode_event(raw):
+    """
+    Return (event_type, body) of a raw event (UTF-8 bytes), e.g. ("textOutput", {"content": ..., ...}).
+
+    For audioOutput the body's "content" is the decoded audio (bytes), not the base64 text.
+    Payloads that are not stream events are returned as (None, parsed JSON).
+    Raises ValueError (json.JSONDecodeError or orjson.JSONDecodeError) on malformed JSON.
+    """
+    match = EVENT_TYPE.match(raw)
+    if match is None:
+        return _decode_slow(raw)
+    event_type = match.group(1).decode('ascii')
+
+    if event_type == 'audioOutput':
+        content = AUDIO_CONTENT.search(raw, match.end())
+        if content:
+            start = content.end()
+            end = raw.index(b'"', start)
+            # a2b_base64 skips the backslashes of escaped slashes ("\/")
+            audio = binascii.a2b_base64(memoryview(raw)[start:end])
+            body = loads(b''.join((raw[:start], raw[end:])))['event'][event_type]
+            body['content'] = audio
+            return event_type, body
+
+    document = loads(raw)
+    return event_type, document['event'][event_type]
+
+def _decode_slow(raw):
+    document = loads(raw)
+    event = document.get('event') if isinstance(document, dict) else None
+    if not isinstance(event, dict) or not event:
+        return None, document
+    event_type = next(iter(event))
+    body = event[event_type]
+    if event_type == 'audioOutput' and isinstance(body.get('content'), str):
+        body['content'] = binascii.a2b_base64(body['content'])
+    return event_type, body
+
+@lru_cache(maxsize=64)
+def _model_fields(additional_model_fields):
+    return json.loads(additional_model_fields)
+
+def generation_stage(content_start):
+    """generationStage ("SPECULATIVE", "FINAL") of a contentStart, or None; the few distinct field strings are parsed once."""
+    fields = content_start.get('additionalModelFields')
+    if not fields:
+        return None
+    try:
+        return _model_fields(fields).get('generationStage')
+    except ValueError:
+        return None
@@ -0,0 +1,142 @@
+import binascii
+import json
+
+from functools import lru_cache
+
+# Compact byte templates for the events sent on every chunk or turn of a bidirectional stream.
+# Names are JSON-escaped once when a template is compiled, so encoding a chunk only base64-encodes
+# the audio and joins it between the precompiled prefix and suffix. Events are returned as UTF-8
+# bytes that can be passed to BidirectionalInputPayloadPart without another encode.
+# The join is the only allocation per chunk. Events are not built in a reused buffer: they wait in
+# the SDK's send queue after send_event() returns, so a shared buffer would be overwritten before
+# they are sent, and base64 has no encode-into-buffer API to fill one without a copy anyway.
+# The events sent once per session or turn are compact JSON built by _event().
+
+def _json_bytes(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8', errors='replace')
+
+def _event(name, body):
+    return json.dumps({"event": {name: body}}, ensure_ascii=False, separators=(',', ':')).encode('utf-8', errors='replace')
+
+def session_start(max_tokens=1024, top_p=0.9, temperature=0.1):
+    """Encode a sessionStart event."""
+    return _event("sessionStart", {
+        "inferenceConfiguration": {"maxTokens": max_tokens, "topP": top_p, "temperature": temperature}
+    })
+
+def prompt_start(prompt_name, voice_id, sample_rate=24000):
+    """Encode a promptStart event asking for text and 16-bit mono base64 speech output."""
+    return _event("promptStart", {
+        "promptName": prompt_name,
+        "textOutputConfiguration": {"mediaType": "text/plain"},
+        "audioOutputConfiguration": {
+            "mediaType": "audio/lpcm",
+            "sampleRateHertz": sample_rate,
+            "sampleSizeBits": 16,
+            "channelCount": 1,
+            "voiceId": voice_id,
+            "encoding": "base64",
+            "audioType": "SPEECH",
+        },
+    })
+
+def text_content_start(prompt_name, content_name, role="USER", interactive=True):
+    """Encode the contentStart event of a text content (role SYSTEM for the system prompt)."""
+    return _event("contentStart", {
+        "promptName": prompt_name,
+        "contentName": content_name,
+        "type": "TEXT",
+        "interactive": interactive,
+        "role": role,
+        "textInputConfiguration": {"mediaType": "text/plain"},
+    })
+
+def audio_content_start(prompt_name, content_name, max_length_ms, sample_rate=16000):
+    """Encode the contentStart event of the user's 16-bit mono base64 audio input."""
+    return _event("contentStart", {
+        "promptName": prompt_name,
+        "contentName": content_name,
+        "type": "AUDIO",
+        "interactive": True,
+        "role": "USER",
+        "audioInputConfiguration": {
+            "mediaType": "audio/lpcm",
+            "sampleRateHertz": sample_rate,
+            "sampleSizeBits": 16,
+            "channelCount": 1,
+            "audioType": "SPEECH",
+            "encoding": "base64",
+            "maxLengthMilliseconds": max_length_ms,
+        },
+    })
+
+def prompt_end(prompt_name):
+    """Encode a promptEnd event."""
+    return _event("promptEnd", {"promptName": prompt_name})
+
+def session_end():
+    """Encode a sessionEnd event."""
+    return _event("sessionEnd", {})
+
+def base64_audio(audio_bytes):
+    """Base64 content of a chunk of raw audio, shareable by the events of several streams."""
+    return binascii.b2a_base64(audio_bytes, newline=False)
+
+class AudioEventEncoder:
+    """Precompiled audioInput event for one (prompt_name, content_name)."""
+
+    def __init__(self, prompt_name, content_name):
+        self.prefix = (
+            b'{"event":{"audioInput":{"promptName":' + _json_bytes(prompt_name) +
+            b',"contentName":' + _json_bytes(content_name) + b',"content":"'
+        )
+        self.suffix = b'"}}}'
+        self.silent_events = dict()
+
+    def encode(self, audio_bytes):
+        """Return the audioInput event for a chunk of raw audio (bytes, bytearray or memoryview)."""
+        return self.wrap(base64_audio(audio_bytes))
+
+    def wrap(self, content):
+        """Return the audioInput event for audio already encoded by base64_audio()."""
+        return b''.join((self.prefix, content, self.suffix))
+
+    def silence(self, num_bytes):
+        """Return the audioInput event for num_bytes of silence, encoded once per size."""
+        event = self.silent_events.get(num_bytes)
+        if event is None:
+            event = self.silent_events[num_bytes] = self.encode(bytes(num_bytes))
+        return event
+
+@lru_cache(maxsize=1024)
+def get_audio_encoder(prompt_name, content_name):
+    """Return the cached audio event encoder of a (prompt_name, content_name)."""
+    return AudioEventEncoder(prompt_name, content_name)
+
+def audio_input(prompt_name, content_name, audio_bytes):
+    """Encode an audioInput event."""
+    return get_audio_encoder(prompt_name, content_name).encode(audio_bytes)
+
+def encoded_audio_input(prompt_name, content_name, content):
+    """Encode an audioInput event around the output of base64_audio()."""
+    return get_audio_encoder(prompt_name, content_name).wrap(content)
+
+def silent_audio_input(prompt_name, content_name, num_bytes):
+    """Encode an audioInput event of num_bytes of silence, reusing the cached event."""
+    return get_audio_encoder(prompt_name, content_name).silence(num_bytes)
+
+@lru_cache(maxsize=1024)
+def content_end(prompt_name, content_name):
+    """Encode a contentEnd event."""
+    return (
+        b'{"event":{"contentEnd":{"promptName":' + _json_bytes(prompt_name) +
+        b',"contentName":' + _json_bytes(content_name) + b'}}}'
+    )
+
+def text_input(prompt_name, content_name, text):
+    """Encode a textInput event; text may contain any Unicode characters."""
+    return (
+        b'{"event":{"textInput":{"promptName":' + _json_bytes(prompt_name) +
+        b',"contentName":' + _json_bytes(content_name) +
+        b',"content":' + _json_bytes(text) + b'}}}'
+    )
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Interpret one Korean speaker into several languages at once.
+
+The microphone (or a recording, with --input) is captured, conditioned to 16 kHz mono and run through
+voice activity detection once, and every frame is fanned out to an interpret session per target
+language. Each session keeps its own output: the transcript of the speech is logged once and the
+translated text of every turn with its language, and the speech of one language can be played with --play.
+
+Usage: python application/fanout.py --languages Japanese English Chinese [--input talk.wav] [--play English]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+import event_encoder
+import pacing
+import translator
+from bounded_queue import BoundedQueue
+from resampler import AudioConditioner
+from vad import VoiceActivityDetector
+from wav_reader import WavReader
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("fanout")
+
+OUTBOX_SIZE = 80  # frames (about 5 s) a stalled stream may fall behind before its oldest audio is dropped
+READY_TIMEOUT = 30.0  # seconds to wait for the sessions to accept audio
+TRAILING_SILENCE_SECONDS = 2.0  # silence sent after a recording so its last utterance ends
+IDLE_SECONDS = 3.0  # a recording is done once no session produced output for this long
+
+class FanoutTranslator:
+    """
+    One speaker interpreted into several languages: a single capture feeding an interpret session per language.
+
+    Captured batches are cut into CHUNK_SIZE frames that are memoryviews of the batch, shared by all
+    sessions. A voiced frame is base64-encoded once and the same content is wrapped in the audioInput
+    event of each stream; frames without speech use the pre-encoded silent event of each stream.
+    Each session takes its frames from its own outbox, so a stalled stream drops its oldest audio
+    instead of holding up the others, and has its own output_queue and audio_channel.
+    """
+
+    def __init__(self, languages, session_id="fanout"):
+        self.languages = list(dict.fromkeys(languages))
+        self.sessions = {language: translator.get_session(f"{session_id}-{language}") for language in self.languages}
+        self.outboxes = dict()  # language -> BoundedQueue of (frame, base64 content or None for silence)
+        # Capture settings, configurable before start()
+        self.use_vad = translator.USE_VAD
+        self.vad_config = dict(translator.VAD_CONFIG)
+        self.capture_sample_rate = translator.CAPTURE_SAMPLE_RATE
+        self.capture_channels = translator.CAPTURE_CHANNELS
+        self.vad = None
+        self.is_active = False
+        self.capture_task = None
+
+        # Counters
+        self.frames = 0
+        self.frames_voiced = 0
+        self.encoded_bytes = 0
+
+    async def start(self, audio_input=None):
+        """Start a session per language and the capture; audio_input(send) feeds the audio instead of the microphone."""
+        for language, session in self.sessions.items():
+            outbox = self.outboxes[language] = BoundedQueue(f"fanout-{language}", OUTBOX_SIZE, "drop_oldest")
+            session.task = asyncio.create_task(session.interpret(language, lambda session=session, outbox=outbox: self._feed(session, outbox)))
+        try:
+            await asyncio.wait_for(asyncio.gather(*(session.ready.wait() for session in self.sessions.values())), timeout=READY_TIMEOUT)
+        except Exception:
+            await self.stop()
+            raise
+
+        self.vad = VoiceActivityDetector(frame_size=translator.CHUNK_SIZE, sample_rate=translator.INPUT_SAMPLE_RATE, **self.vad_config) if self.use_vad else None
+        self.is_active = True
+        self.capture_task = asyncio.create_task(audio_input(self.send) if audio_input else self._capture())
+        logger.info(f"Interpreting into {', '.join(self.languages)}")
+
+    async def _capture(self):
+        try:
+            await translator.capture_microphone(self.capture_sample_rate, self.capture_channels, self.send, lambda: self.is_active)
+        except Exception as e:
+            logger.info(f"Error capturing audio: {e}")
+
+    async def send(self, audio_data):
+        """Fan a batch of 16 kHz mono 16-bit PCM out to every session."""
+        view = memoryview(audio_data)
+        if self.vad:
+            frames = self.vad.process(view)
+            translator.count_vad_frames(frames)
+        else:
+            step = translator.CHUNK_SIZE * 2
+            frames = [(view[i:i + step], True) for i in range(0, len(view), step)]
+        self._fan_out(frames)
+
+    def _fan_out(self, frames):
+        for frame, voiced in frames:
+            content = None
+            self.frames += 1
+            if voiced:
+                content = event_encoder.base64_audio(frame)
+                self.frames_voiced += 1
+                self.encoded_bytes += len(content)
+            for outbox in self.outboxes.values():
+                outbox.put_nowait((frame, content))
+
+    async def _feed(self, session, outbox):
+        # audio_input() of each session
+        while session.is_active:
+            item = await outbox.get()
+            if item is None:
+                break
+            frame, content = item
+            if content is None:
+                await session.send_silence(len(frame))
+            else:
+                await session.send_audio_chunk(frame, content)
+
+    async def stop(self):
+        """Stop the capture and end every session."""
+        self.is_active = False
+        if self.capture_task and not self.capture_task.done():
+            self.capture_task.cancel()
+            await asyncio.gather(self.capture_task, return_exceptions=True)
+        if self.vad:
+            # Frames still held for pre-roll and hangover
+            frames = self.vad.flush()
+            translator.count_vad_frames(frames)
+            self._fan_out(frames)
+        for outbox in self.outboxes.values():
+            outbox.put_nowait(None)
+        await asyncio.gather(*(session.stop() for session in self.sessions.values()))
+        for session in self.sessions.values():
+            translator.remove_session(session.session_id)
+        logger.info(f"Fan-out stopped: {self.stats()}")
+
+    def stats(self):
+        return {
+            "languages": self.languages,
+            "frames": self.frames,
+            "frames_voiced": self.frames_voiced,
+            "encoded_bytes": self.encoded_bytes,
+            "vad": self.vad.stats() if self.vad else None,
+            "outboxes": {language: outbox.stats() for language, outbox in self.outboxes.items()},
+        }
+
+def recording_input(path):
+    """audio_input() that sends a recording at real time, followed by TRAILING_SILENCE_SECONDS of silence."""
+    async def feed(send):
+        chunk_seconds = translator.CHUNK_SIZE / translator.INPUT_SAMPLE_RATE
+        ticks = pacing.paced(chunk_seconds)
+        with WavReader(path, sample_rate=translator.INPUT_SAMPLE_RATE) as reader:
+            # The conditioner copies the frames out of the mapping, so queued frames outlive the reader
+            conditioner = AudioConditioner(reader.sample_rate, reader.channels, reader.sample_width, out_rate=translator.INPUT_SAMPLE_RATE)
+            for _, view in reader.chunks(translator.CHUNK_SIZE * reader.sample_rate // translator.INPUT_SAMPLE_RATE):
+                await anext(ticks)
+                audio = conditioner.process(view)
+                view.release()
+                if audio:
+                    await send(audio)
+        silence = bytes(translator.CHUNK_SIZE * 2)
+        for _ in range(int(TRAILING_SILENCE_SECONDS / chunk_seconds)):
+            await anext(ticks)
+            await send(silence)
+    return feed
+
+async def log_turns(language, session, log_source=False):
+    """Log the translated text of each turn of a session, after the transcript of its speech when log_source is set."""
+    text = ""
+    while True:
+        item = await session.output_queue.get()
+        if item == translator.END_OF_TURN:
+            # Every session transcribes the same speech; one of them logs it
+            source = "".join(session.transcript_queue.drain())
+            if log_source and source:
+                logger.info(f"[source] {source}")
+            if text:
+                logger.info(f"[{language}] {text}")
+            text = ""
+        else:
+            text += item
+
+async def run(args):
+    fanout = FanoutTranslator(args.languages)
+    for language, session in fanout.sessions.items():
+        session.use_streamlit_audio = language != args.play  # only the played language uses pyaudio
+        session.collect_audio = False
+    await fanout.start(recording_input(args.input) if args.input else None)
+    loggers = [asyncio.create_task(log_turns(language, session, log_source=i == 0)) for i, (language, session) in enumerate(fanout.sessions.items())]
+    try:
+        if args.input:
+            await fanout.capture_task
+            # Wait for the answers to the last utterances
+            while any(session.sonic.is_active and time.monotonic() - session.sonic.last_output_at < IDLE_SECONDS
+                      for session in fanout.sessions.values()):
+                await asyncio.sleep(0.5)
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
+    finally:
+        await fanout.stop()
+        for task in loggers:
+            task.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description='interpret one Korean speaker into several languages at once')
+    parser.add_argument('--languages', nargs='+', required=True, help='target languages, one session each')
+    parser.add_argument('--input', help='WAV/PCM recording to interpret instead of the microphone')
+    parser.add_argument('--play', help='language whose speech is played on the local speaker')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
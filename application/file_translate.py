@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Translate recorded speech (PCM WAV files of any rate and channel count, or headerless 16 kHz mono
+16-bit .pcm files) into timestamped text.
+
+Each file is streamed from a memory map into its own speech2text session, converted to 16 kHz mono
+when needed and paced at --speed times real time instead of being played back, and the translated
+turns are written to <out>/<name>.jsonl with the span of the recording they answer and the transcript
+of the speech they translate:
+
+    {"start": 12.48, "end": 15.04, "source": "...", "text": "..."}
+
+A directory is processed with --concurrency sessions running at once.
+
+Usage: python application/file_translate.py recordings/ --language Japanese --out transcripts/ [--speed 2] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import pacing
+import translator
+from resampler import AudioConditioner
+from wav_reader import WavReader
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("file_translate")
+
+AUDIO_EXTENSIONS = (".wav", ".pcm", ".raw")
+# Nova Sonic is a real-time model that finds the end of speech in the silence it receives, so audio
+# is sent at most this many times faster than real time
+MAX_SPEED = 4.0
+# Silence in the recording that ends an utterance. Speeding up the pause would make the next utterance
+# barge in on the answer, so from there silence is sent at real time until the turn is answered.
+END_OF_SPEECH_SECONDS = 0.8
+ANSWER_TIMEOUT = 10.0  # seconds to wait for the answer to an utterance before sending the rest
+IDLE_SECONDS = 3.0  # a file whose last speech got no answer is done after this long without output
+
+def list_files(path):
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(AUDIO_EXTENSIONS))
+    return [path]
+
+def timestamp(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes):02d}:{seconds:05.2f}"
+
+class FileTranscript:
+    """Position of the audio sent from a file and the span of speech the next turn answers."""
+
+    def __init__(self, chunk_seconds):
+        self.chunk_seconds = chunk_seconds
+        self.position = 0.0  # seconds of the file sent
+        self.speech_start = None  # first voiced chunk not answered yet
+        self.speech_end = None  # end of the last voiced chunk
+        self.answered = asyncio.Event()  # set at the end of each turn, cleared by new speech
+        self.fed = False  # the whole file was sent
+        self.segments = []
+
+    def sent(self, silent, seconds):
+        if not silent:
+            if self.speech_start is None:
+                self.speech_start = self.position
+            self.speech_end = self.position + seconds
+            self.answered.clear()
+        self.position += seconds
+
+    def awaiting_answer(self):
+        """True once the speech sent since the last answer is followed by END_OF_SPEECH_SECONDS of silence."""
+        return (not self.answered.is_set() and self.speech_end is not None
+                and self.position - self.speech_end >= END_OF_SPEECH_SECONDS)
+
+    def span(self):
+        """Span of the speech the turn that just started answers; speech after this starts the next span."""
+        start = self.speech_start if self.speech_start is not None else self.position
+        end = self.speech_end if self.speech_end is not None and self.speech_end >= start else self.position
+        self.speech_start = None
+        return round(start, 2), round(end, 2)
+
+async def wait_for_answer(session, transcript):
+    """Send silence at real time until the turn of the last utterance ends."""
+    deadline = time.monotonic() + ANSWER_TIMEOUT
+    async for _ in pacing.paced(transcript.chunk_seconds):
+        if transcript.answered.is_set() or not session.is_active or time.monotonic() > deadline:
+            break
+        await session.send_silence(translator.CHUNK_SIZE * 2)
+    transcript.answered.set()
+
+async def feed_file(session, reader, transcript, speed):
+    """Send the frames of reader as they are mapped, speed times faster than real time, pausing for each answer."""
+    conditioner = AudioConditioner(reader.sample_rate, reader.channels, reader.sample_width, out_rate=translator.INPUT_SAMPLE_RATE)
+    ticks = pacing.paced(transcript.chunk_seconds / speed)
+    try:
+        # Chunks of the duration of CHUNK_SIZE frames at INPUT_SAMPLE_RATE
+        for _, view in reader.chunks(translator.CHUNK_SIZE * reader.sample_rate // translator.INPUT_SAMPLE_RATE):
+            await anext(ticks)
+            if not session.is_active:
+                break
+            # Audio in the input format is sent straight from the mapping
+            audio = view if conditioner.passthrough else conditioner.process(view)
+            if audio:
+                silent = translator.is_silent(audio)
+                await session.send_audio_chunk(audio)
+                transcript.sent(silent, len(audio) / (2 * translator.INPUT_SAMPLE_RATE))
+            view.release()
+            if transcript.awaiting_answer():
+                await wait_for_answer(session, transcript)
+                ticks = pacing.paced(transcript.chunk_seconds / speed)
+        if session.is_active and transcript.speech_end is not None and not transcript.answered.is_set():
+            await wait_for_answer(session, transcript)
+    finally:
+        transcript.fed = True
+
+async def translate_file(path, out_dir, language, speed, index, timeout):
+    """Translate one recording; returns its segments."""
+    with WavReader(path, sample_rate=translator.INPUT_SAMPLE_RATE) as reader:
+        transcript = FileTranscript(translator.CHUNK_SIZE / translator.INPUT_SAMPLE_RATE)
+        session = translator.get_session(f"file-{index}")
+        session.use_streamlit_audio = True
+        session.collect_audio = False  # only the text is kept
+        started_at = time.monotonic()
+        session.task = asyncio.create_task(session.speech2text(language, lambda: feed_file(session, reader, transcript, speed)))
+        try:
+            await asyncio.wait_for(session.ready.wait(), timeout=timeout)
+
+            segment = None
+            last_output_at = time.monotonic()
+            while not session.task.done():
+                try:
+                    text = await asyncio.wait_for(session.output_queue.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    idle = time.monotonic() - last_output_at
+                    if transcript.fed and ((segment is None and (transcript.answered.is_set() or idle > IDLE_SECONDS)) or idle > timeout):
+                        break
+                    continue
+                last_output_at = time.monotonic()
+                if text == translator.END_OF_TURN:
+                    transcript.answered.set()
+                    source = "".join(session.transcript_queue.drain())  # taken even for an empty turn, so it is not added to the next one
+                    if segment and segment["text"]:
+                        segment["source"] = source
+                        transcript.segments.append(segment)
+                        logger.info(f"{os.path.basename(path)} [{timestamp(segment['start'])} - {timestamp(segment['end'])}] {segment['text']}")
+                    segment = None
+                    continue
+                if segment is None:
+                    start, end = transcript.span()
+                    segment = {"start": start, "end": end, "source": "", "text": ""}
+                segment["text"] += text
+            if segment and segment["text"]:
+                segment["source"] = "".join(session.transcript_queue.drain())
+                transcript.segments.append(segment)
+        finally:
+            await session.stop()
+            translator.remove_session(session.session_id)
+
+    elapsed = time.monotonic() - started_at
+    name = os.path.splitext(os.path.basename(path))[0] + ".jsonl"
+    with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+        for segment in transcript.segments:
+            f.write(json.dumps(segment, ensure_ascii=False) + "\n")
+    logger.info(f"{os.path.basename(path)}: {reader.duration:.1f}s of audio in {elapsed:.1f}s "
+                f"({reader.duration / elapsed:.1f}x real time), {len(transcript.segments)} segments")
+    return transcript.segments
+
+async def translate_files(paths, out_dir, language, speed=2.0, concurrency=4, timeout=30.0):
+    """Translate recordings with at most concurrency sessions at once; returns the number of failed files."""
+    os.makedirs(out_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def run(index, path):
+        nonlocal failed
+        async with semaphore:
+            try:
+                await translate_file(path, out_dir, language, speed, index, timeout)
+            except Exception as e:
+                failed += 1
+                logger.info(f"{path}: {e}")
+
+    await asyncio.gather(*(run(i, path) for i, path in enumerate(paths)))
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description='translate recorded speech into timestamped text')
+    parser.add_argument('input', help='WAV/PCM file or directory of recordings')
+    parser.add_argument('--language', required=True, help='language spoken in the recordings')
+    parser.add_argument('--out', required=True, help='directory of the <name>.jsonl transcripts')
+    parser.add_argument('--speed', type=float, default=2.0, help=f'multiple of real time to send the audio at (at most {MAX_SPEED})')
+    parser.add_argument('--concurrency', type=int, default=4, help='recordings translated at once')
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for a session or an answer')
+    args = parser.parse_args()
+
+    speed = min(max(args.speed, 0.1), MAX_SPEED)
+    if speed != args.speed:
+        logger.info(f"Speed limited to {speed}x real time")
+    paths = list_files(args.input)
+    logger.info(f"{len(paths)} recordings, {speed}x real time, {args.concurrency} sessions")
+    failed = asyncio.run(translate_files(paths, args.out, args.language, speed, max(1, args.concurrency), args.timeout))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
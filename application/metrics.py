@@ -0,0 +1,220 @@
+import bisect
+import json
+import logging
+import sys
+import threading
+import time
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("metrics")
+
+# In-process metrics: counters, gauges and fixed-bucket histograms with labels, safe to update from any thread.
+# registry.snapshot() returns every metric as a dict (histograms with estimated percentiles),
+# registry.dump() the same as JSON, e.g. to log it or to show it in the app, and
+# registry.render_prometheus() the Prometheus text format served by metrics_server.
+
+# Latency buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+# Real-time factor buckets (generation wall time / audio duration; below 1 is faster than real time)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+# Audio duration buckets in seconds
+DURATION_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+        self.values = dict()  # label key -> value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return [{"labels": dict(key), "value": value} for key, value in self.values.items()]
+
+class Gauge:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+        self.values = dict()  # label key -> value
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[_label_key(labels)] = value
+
+    def replace(self, values):
+        """Set all series at once from a list of (labels dict, value); series not listed are removed."""
+        with self.lock:
+            self.values = {_label_key(labels): value for labels, value in values}
+
+    def snapshot(self):
+        with self.lock:
+            return [{"labels": dict(key), "value": value} for key, value in self.values.items()]
+
+class Histogram:
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        self.series = dict()  # label key -> [bucket counts (+Inf last), sum, count, min, max]
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value, value]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+            series[3] = min(series[3], value)
+            series[4] = max(series[4], value)
+
+    def _quantile(self, counts, count, low, high, q):
+        """Estimate a quantile by linear interpolation inside its bucket, clamped to the observed range."""
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else low
+                upper = self.buckets[i] if i < len(self.buckets) else high
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return round(min(max(value, low), high), 4)
+            seen += bucket_count
+        return round(high, 4)
+
+    def series_snapshot(self):
+        """Return (label key, bucket counts, sum, count) of every series."""
+        with self.lock:
+            return [(key, list(series[0]), series[1], series[2]) for key, series in self.series.items()]
+
+    def snapshot(self):
+        with self.lock:
+            result = []
+            for key, (counts, total, count, low, high) in self.series.items():
+                result.append({
+                    "labels": dict(key),
+                    "count": count,
+                    "sum": round(total, 4),
+                    "mean": round(total / count, 4),
+                    "min": round(low, 4),
+                    "max": round(high, 4),
+                    "p50": self._quantile(counts, count, low, high, 0.5),
+                    "p90": self._quantile(counts, count, low, high, 0.9),
+                    "p99": self._quantile(counts, count, low, high, 0.99),
+                    "buckets": dict(zip([*map(str, self.buckets), "+Inf"], counts)),
+                })
+            return result
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = dict()
+        self.collectors = []  # called before every snapshot/render to refresh gauges
+        self.started_at = time.time()
+
+    def _get(self, cls, name, help, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name, help=""):
+        """Return the counter called name, registering it on first use."""
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help=""):
+        """Return the gauge called name, registering it on first use."""
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        """Return the histogram called name, registering it on first use."""
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def add_collector(self, collector):
+        """Register a function that updates gauges from the current state when metrics are read."""
+        with self.lock:
+            self.collectors.append(collector)
+
+    def _collect(self):
+        """Run the collectors and return the registered metrics."""
+        with self.lock:
+            collectors = list(self.collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.info(f"Error in metrics collector {collector.__name__}: {e}")
+        with self.lock:
+            return list(self.metrics.values())
+
+    def snapshot(self):
+        metrics = self._collect()
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "metrics": {metric.name: {"type": type(metric).__name__.lower(), "help": metric.help, "series": metric.snapshot()} for metric in metrics},
+        }
+
+    def dump(self):
+        return json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+
+    def render_prometheus(self):
+        """Return every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._collect():
+            kind = type(metric).__name__.lower()
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            if isinstance(metric, Histogram):
+                for key, counts, total, count in metric.series_snapshot():
+                    cumulative = 0
+                    for bound, bucket_count in zip([*metric.buckets, "+Inf"], counts):
+                        cumulative += bucket_count
+                        lines.append(f"{metric.name}_bucket{_labels(key, le=bound)} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_labels(key)} {_number(total)}")
+                    lines.append(f"{metric.name}_count{_labels(key)} {count}")
+            else:
+                for series in metric.snapshot():
+                    lines.append(f"{metric.name}{_labels(_label_key(series['labels']))} {_number(series['value'])}")
+        lines.append("")
+        return "\n".join(lines)
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(key, **extra):
+    pairs = [*key, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+registry = MetricsRegistry()
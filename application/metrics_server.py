@@ -0,0 +1,89 @@
+import logging
+import os
+import resource
+import sys
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("metrics_server")
+
+# Prometheus endpoint (GET /metrics) served from its own thread, so it keeps answering when the
+# translator event loop is busy or stuck; the event loop lag it reports is how to notice that.
+# Loopback unless the port must be reachable from outside (the container image sets 0.0.0.0)
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "8503"))
+
+PROCESS_RSS = metrics.registry.gauge("process_resident_memory_bytes", "Resident memory size in bytes")
+
+def _collect_process():
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs: the peak RSS is the closest figure (kilobytes on Linux, bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = rss if sys.platform == "darwin" else rss * 1024
+    PROCESS_RSS.set(rss)
+
+metrics.registry.add_collector(_collect_process)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0].rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = metrics.registry.render_prometheus().encode('utf-8')
+        except Exception as e:
+            logger.info(f"Error rendering metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+class MetricsServer:
+    def __init__(self, host=METRICS_HOST, port=METRICS_PORT):
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start serving on a daemon thread; does nothing if it already runs or the port is taken."""
+        with self.lock:
+            if self.httpd is not None:
+                return
+            try:
+                self.httpd = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+            except OSError as e:
+                logger.info(f"Metrics endpoint is not available on port {self.port}: {e}")
+                return
+            self.httpd.daemon_threads = True
+            threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Metrics endpoint listening on {self.host}:{self.port}/metrics")
+
+    def close(self):
+        with self.lock:
+            if self.httpd:
+                self.httpd.shutdown()
+                self.httpd.server_close()
+                self.httpd = None
+
+server = MetricsServer()
@@ -0,0 +1,20 @@
+import asyncio
+import time
+
+async def paced(interval, max_lag=1.0):
+    """
+    Yield once every interval seconds on the monotonic clock.
+
+    Ticks are scheduled against absolute deadlines, so the time spent by the caller between
+    ticks does not slow the rate down. If the caller falls more than max_lag seconds behind,
+    the missed ticks are dropped instead of being sent in a burst.
+    """
+    next_tick = time.monotonic()
+    while True:
+        yield next_tick
+        next_tick += interval
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif -delay > max_lag:
+            next_tick = time.monotonic()
@@ -0,0 +1,172 @@
+import logging
+import sys
+import threading
+import time
+
+from collections import deque
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("playback")
+
+class PlaybackEngine:
+    """
+    Plays 16-bit mono PCM on its own thread from a bounded, adaptive jitter buffer.
+
+    feed() may be called from any thread (usually the event loop) and never blocks. The playback
+    thread owns the output stream and writes CHUNK-sized pieces to it. After the buffer runs dry,
+    playback restarts only once target_ms of audio is buffered (or the buffered audio has waited
+    that long, so the tail of an utterance is not held back). The target follows the observed
+    arrival jitter between min_ms and max_ms. flush() drops everything buffered for barge-in.
+    """
+
+    def __init__(self, output_stream, sample_rate=24000, chunk_size=1024, min_ms=60, max_ms=500, capacity_ms=30000):
+        self.output_stream = output_stream
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self.chunk_bytes = chunk_size * 2
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.capacity = int(capacity_ms * self.bytes_per_ms)
+
+        self.chunks = deque()
+        self.buffered = 0  # bytes in chunks
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+
+        self.playing = False  # False while (re)filling up to the target depth
+        self.fill_started = None
+        self.starved_at = None
+        self.last_arrival = None
+        self.last_duration = 0.0
+        self.jitter_ms = 0.0
+        self.target_ms = float(min_ms)
+
+        # Counters
+        self.underruns = 0
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.flushes = 0
+        self.played_bytes = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="playback", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the playback thread; buffered audio is discarded."""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def feed(self, audio_bytes):
+        """Queue audio for playback; the oldest audio is dropped when the buffer is full."""
+        now = time.monotonic()
+        with self.cond:
+            self._update_jitter(now, len(audio_bytes))
+
+            if not self.chunks:
+                if self.starved_at is not None and now < self.starved_at:
+                    # The last chunk is still playing: hand over without a refill
+                    pass
+                else:
+                    if self.starved_at is not None and now < self.starved_at + 0.5:
+                        # The buffer ran dry in the middle of a response: an audible gap
+                        self.underruns += 1
+                        self.jitter_ms = min(self.jitter_ms + self.target_ms / 2, self.max_ms)
+                    if self.starved_at is not None or not self.playing:
+                        self.playing = False
+                        self.fill_started = now
+                self.starved_at = None
+
+            self.chunks.append(audio_bytes)
+            self.buffered += len(audio_bytes)
+            while self.buffered > self.capacity and len(self.chunks) > 1:
+                dropped = self.chunks.popleft()
+                self.buffered -= len(dropped)
+                self.dropped_bytes += len(dropped)
+                self.overruns += 1
+            self.cond.notify()
+
+    def _update_jitter(self, now, size):
+        # Only arrivals later than the previous chunk's play time add jitter; bursts ahead of real time do not
+        if self.last_arrival is not None:
+            late_ms = max((now - self.last_arrival) * 1000 - self.last_duration, 0.0)
+            if late_ms < 1000:  # longer gaps are pauses between responses
+                self.jitter_ms += (late_ms - self.jitter_ms) / 16
+        self.last_arrival = now
+        self.last_duration = size / self.bytes_per_ms
+        self.target_ms = min(max(self.min_ms, 2 * self.jitter_ms), self.max_ms)
+
+    def flush(self):
+        """Drop all buffered audio immediately (barge-in)."""
+        with self.cond:
+            self.chunks.clear()
+            self.buffered = 0
+            self.playing = False
+            self.starved_at = None
+            self.flushes += 1
+
+    def _ready(self):
+        if self.playing:
+            return self.buffered > 0
+        if not self.buffered:
+            return False
+        target_bytes = self.target_ms * self.bytes_per_ms
+        return self.buffered >= target_bytes or time.monotonic() - self.fill_started >= self.target_ms / 1000
+
+    def _take(self):
+        """Pop up to one chunk of audio from the buffer (called with cond held)."""
+        pieces = []
+        size = 0
+        while self.chunks and size < self.chunk_bytes:
+            data = self.chunks.popleft()
+            room = self.chunk_bytes - size
+            if len(data) > room:
+                self.chunks.appendleft(data[room:])
+                data = data[:room]
+            pieces.append(data)
+            size += len(data)
+        self.buffered -= size
+        return b''.join(pieces)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self._ready():
+                    # Wake periodically so the fill timeout is honoured
+                    self.cond.wait(self.target_ms / 4000 if self.buffered else None)
+                if not self.running:
+                    break
+                self.playing = True
+                chunk = self._take()
+                if not self.chunks:
+                    # Playing stays on: audio fed before this chunk has played out continues without a refill
+                    self.starved_at = time.monotonic() + len(chunk) / self.bytes_per_ms / 1000
+
+            try:
+                self.output_stream.write(chunk)
+                self.played_bytes += len(chunk)
+            except Exception as e:
+                logger.error(f"Error writing audio: {e}")
+
+    def stats(self):
+        return {
+            "buffered_ms": round(self.buffered / self.bytes_per_ms),
+            "target_ms": round(self.target_ms),
+            "jitter_ms": round(self.jitter_ms, 1),
+            "underruns": self.underruns,
+            "overruns": self.overruns,
+            "dropped_bytes": self.dropped_bytes,
+            "flushes": self.flushes,
+            "played_ms": round(self.played_bytes / self.bytes_per_ms),
+        }
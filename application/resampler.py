@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Input conditioning: integer PCM at any rate and channel count -> 16-bit mono PCM at the rate Nova Sonic
+# expects. Channels are averaged, then a polyphase FIR resampler (Kaiser-windowed sinc) converts the rate.
+# Every step works on whole buffers with NumPy; the filter history and phase are carried from one chunk
+# to the next, so a stream cut into chunks of any size resamples like one long buffer (up to float rounding).
+
+FILTER_TAPS = 64  # filter length in samples of the lower of the two rates
+KAISER_BETA = 8.6  # about 90 dB stopband attenuation
+CUTOFF = 0.9  # passband edge as a fraction of the lower Nyquist frequency
+GATHER_BLOCK = 1024  # outputs computed per gather
+
+def design_filter(up, down, filter_taps=FILTER_TAPS, beta=KAISER_BETA, cutoff=CUTOFF):
+    """Low-pass prototype for resampling by up/down, a multiple of up taps long, with a DC gain of up."""
+    length = up * -(-filter_taps * max(up, down) // up)
+    fc = cutoff * 0.5 / max(up, down)  # cycles per sample at the upsampled rate
+    n = np.arange(length) - (length - 1) / 2
+    h = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(length, beta)
+    return h * (up / h.sum())
+
+class Resampler:
+    """
+    Polyphase resampler of a mono float32 stream by out_rate/in_rate.
+
+    Output sample k sits at position k * down of the signal upsampled by up; its phase
+    (k * down) % up selects one row of the filter, applied to the input samples before it.
+    All outputs of a chunk are computed with one gather and one row-wise dot product; integer
+    decimation (up == 1) and interpolation (down == 1) need no gather and run as one np.convolve
+    per phase, several times faster than a dot product over strided windows.
+    """
+
+    def __init__(self, in_rate, out_rate, filter_taps=FILTER_TAPS):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        h = design_filter(self.up, self.down, filter_taps)
+        self.taps = len(h) // self.up  # input samples per output
+        # phases[p, w] multiplies the w-th sample of the window ending at the current input sample
+        self.phases = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32)
+        self.kernels = np.ascontiguousarray(self.phases[:, ::-1])  # the phases as convolution kernels
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.position = 0  # upsampled position of the next output, relative to the next input sample
+
+    def process(self, samples):
+        """Resample a float32 chunk; returns the outputs whose input is complete."""
+        n = len(samples)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        end = n * self.up
+        count = max(0, -(-(end - self.position) // self.down))
+        buffer = np.concatenate((self.history, samples))
+        if self.up == 1:
+            out = np.convolve(buffer, self.kernels[0], 'valid')[self.position::self.down][:count]
+        elif self.down == 1:
+            # Every input sample gives one output per phase
+            out = np.empty((n, self.up), dtype=np.float32)
+            for phase, kernel in enumerate(self.kernels):
+                out[:, phase] = np.convolve(buffer, kernel, 'valid')
+            out = out.ravel()
+        else:
+            # Gathered windows are count x taps; blocks of outputs keep them in cache for long chunks
+            out = np.empty(count, dtype=np.float32)
+            view = sliding_window_view(buffer, self.taps)
+            for block in range(0, count, GATHER_BLOCK):
+                t = self.position + self.down * np.arange(block, min(block + GATHER_BLOCK, count))
+                out[block:block + len(t)] = np.einsum('ij,ij->i', view[t // self.up], self.phases[t % self.up])
+
+        self.position += count * self.down - end
+        self.history = buffer[len(buffer) - (self.taps - 1):]
+        return out
+
+    def latency(self):
+        """Delay of the filter in output samples."""
+        return (self.up * self.taps - 1) / 2 / self.down
+
+    def reset(self):
+        self.history[:] = 0
+        self.position = 0
+
+def pcm_to_float(data, sample_width):
+    """Integer little-endian PCM (8-bit unsigned, 16/24/32-bit signed) to float32 in 16-bit units."""
+    if sample_width == 2:
+        return np.frombuffer(data, dtype='<i2').astype(np.float32)
+    if sample_width == 1:
+        return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    if sample_width == 3:
+        b = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        return (samples - ((samples & 0x800000) << 1)).astype(np.float32) / 256.0
+    if sample_width == 4:
+        return np.frombuffer(data, dtype='<i4').astype(np.float32) / 65536.0
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+class AudioConditioner:
+    """
+    Converts captured or decoded PCM to 16-bit mono at out_rate for send_audio_chunk().
+
+    process() accepts chunks of any length, including ones that end in the middle of a frame;
+    the partial frame is kept for the next call. flush() returns the filter tail at the end of a stream.
+    """
+
+    def __init__(self, sample_rate, channels=1, sample_width=2, out_rate=16000):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.out_rate = out_rate
+        self.frame_size = channels * sample_width
+        self.passthrough = sample_rate == out_rate and channels == 1 and sample_width == 2
+        self.resampler = Resampler(sample_rate, out_rate) if sample_rate != out_rate else None
+        self.remainder = b''
+        self.frames_in = 0
+        self.frames_out = 0
+
+    def process(self, data):
+        """Condition a chunk of interleaved PCM; returns 16-bit mono PCM bytes."""
+        if self.remainder:
+            data = self.remainder + bytes(data)
+        whole = len(data) - len(data) % self.frame_size
+        self.remainder = bytes(data[whole:])
+        if not whole:
+            return b''
+        self.frames_in += whole // self.frame_size
+        if self.passthrough:
+            self.frames_out += whole // 2
+            return bytes(data[:whole])
+
+        samples = pcm_to_float(memoryview(data)[:whole], self.sample_width)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        if self.resampler:
+            samples = self.resampler.process(samples)
+        return self._to_pcm16(samples)
+
+    def flush(self):
+        """Return the output still held back by the filter, as if the stream ended with silence."""
+        if not self.resampler:
+            return b''
+        tail = int(math.ceil(self.resampler.taps / 2)) + 1
+        return self._to_pcm16(self.resampler.process(np.zeros(tail, dtype=np.float32)))
+
+    def _to_pcm16(self, samples):
+        self.frames_out += len(samples)
+        return np.clip(np.rint(samples), -32768, 32767).astype('<i2').tobytes()
+
+    def stats(self):
+        return {
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+        }
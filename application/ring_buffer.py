@@ -0,0 +1,64 @@
+class RingBuffer:
+    """
+    Preallocated single-producer / single-consumer byte ring buffer.
+
+    One thread (e.g. a PyAudio callback) calls write() and one other (the event loop) calls
+    read(). No lock is taken: the producer only advances write_pos after copying its data in,
+    the consumer only advances read_pos after copying data out, and each position is a single
+    Python int assignment, which the GIL makes atomic. Writes that do not fit are dropped whole
+    and counted in overruns, so a stalled consumer never blocks the audio thread.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.write_pos = 0  # total bytes written, only advanced by the producer
+        self.read_pos = 0  # total bytes read, only advanced by the consumer
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.high_water = 0
+
+    def available(self):
+        return self.write_pos - self.read_pos
+
+    def write(self, data):
+        """Copy data into the buffer; returns False (and drops it) if there is not enough space."""
+        size = len(data)
+        used = self.write_pos - self.read_pos
+        if size > self.capacity - used:
+            self.overruns += 1
+            self.dropped_bytes += size
+            return False
+
+        data = memoryview(data)
+        start = self.write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self.view[start:start + first] = data[:first]
+        if first < size:
+            self.view[0:size - first] = data[first:]
+        self.write_pos += size
+        self.high_water = max(self.high_water, used + size)
+        return True
+
+    def read(self, max_bytes=None, multiple=1):
+        """Return up to max_bytes of the buffered data as bytes, rounded down to a multiple of multiple."""
+        size = self.write_pos - self.read_pos
+        if max_bytes is not None:
+            size = min(size, max_bytes)
+        size -= size % multiple
+        if size <= 0:
+            return b''
+
+        start = self.read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        if first < size:
+            data = bytes(self.view[start:]) + bytes(self.view[0:size - first])
+        else:
+            data = bytes(self.view[start:start + size])
+        self.read_pos += size
+        return data
+
+    def clear(self):
+        """Drop all buffered data (consumer side)."""
+        self.read_pos = self.write_pos
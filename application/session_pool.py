@@ -0,0 +1,135 @@
+import asyncio
+import time
+import logging
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+logger = logging.getLogger("session_pool")
+
+class SessionPool:
+    """
+    Pool of pre-warmed Nova Sonic streams keyed by (language, translation_mode).
+
+    open_stream(language, translation_mode) must return an initialized stream object
+    with is_active, created_at and an async close(). Warm streams older than max_age
+    are closed and replaced, and a key that has not been acquired for idle_ttl seconds
+    is no longer refilled. The pool must only be used from the event loop it runs on.
+    """
+
+    def __init__(self, open_stream, size=1, max_age=420.0, idle_ttl=300.0):
+        self.open_stream = open_stream
+        self.size = size
+        self.max_age = max_age
+        self.idle_ttl = idle_ttl
+        self.streams = dict()    # key -> list of warm streams
+        self.last_used = dict()  # key -> time of the last prewarm()/acquire()
+        self.pending = dict()    # key -> number of streams being opened
+        self.maintenance_task = None
+        self.tasks = set()       # streams being opened or closed in the background
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, stream):
+        return stream.is_active and time.monotonic() - stream.created_at < self.max_age
+
+    def prewarm(self, language, translation_mode):
+        """Keep size streams warm for (language, translation_mode) from now on."""
+        key = (language, translation_mode)
+        self.last_used[key] = time.monotonic()
+        self.streams.setdefault(key, [])
+        self._refill(key)
+        self._ensure_maintenance()
+
+    async def acquire(self, language, translation_mode):
+        """Return a warm stream for (language, translation_mode), opening one if none is ready."""
+        key = (language, translation_mode)
+        self.last_used[key] = time.monotonic()
+        warm = self.streams.setdefault(key, [])
+
+        stream = None
+        while warm:
+            candidate = warm.pop(0)
+            if self._is_fresh(candidate):
+                stream = candidate
+                break
+            self._spawn(self._close(candidate))
+
+        self._refill(key)
+        self._ensure_maintenance()
+
+        if stream:
+            self.hits += 1
+            logger.info(f"Acquired warm stream for {key} (hits={self.hits}, misses={self.misses})")
+            return stream
+
+        self.misses += 1
+        logger.info(f"No warm stream for {key}, opening a new one (hits={self.hits}, misses={self.misses})")
+        return await self.open_stream(language, translation_mode)
+
+    def _refill(self, key):
+        missing = self.size - len(self.streams.get(key, [])) - self.pending.get(key, 0)
+        for _ in range(max(missing, 0)):
+            self.pending[key] = self.pending.get(key, 0) + 1
+            self._spawn(self._open(key))
+
+    def _spawn(self, coro):
+        # The loop keeps only weak references to tasks; hold them until they finish
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _open(self, key):
+        try:
+            stream = await self.open_stream(*key)
+            if key in self.last_used:
+                self.streams.setdefault(key, []).append(stream)
+            else:
+                await self._close(stream)
+        except Exception as e:
+            logger.info(f"Error pre-warming stream for {key}: {e}")
+        finally:
+            self.pending[key] -= 1
+
+    async def _close(self, stream):
+        try:
+            await stream.close()
+        except Exception as e:
+            logger.info(f"Error closing pooled stream: {e}")
+
+    def _ensure_maintenance(self):
+        if self.maintenance_task is None or self.maintenance_task.done():
+            self.maintenance_task = asyncio.create_task(self._maintain())
+
+    async def _maintain(self):
+        """Replace expired warm streams and forget keys that have been idle for idle_ttl."""
+        while self.last_used:
+            await asyncio.sleep(min(self.max_age, self.idle_ttl) / 2)
+            now = time.monotonic()
+            for key in list(self.last_used):
+                warm = self.streams.get(key, [])
+                for stream in [s for s in warm if not self._is_fresh(s)]:
+                    warm.remove(stream)
+                    await self._close(stream)
+
+                if now - self.last_used[key] > self.idle_ttl:
+                    logger.info(f"Stream pool for {key} is idle, closing {len(warm)} warm streams")
+                    del self.last_used[key]
+                    for stream in self.streams.pop(key, []):
+                        await self._close(stream)
+                else:
+                    self._refill(key)
+
+    async def close(self):
+        """Close every warm stream and stop refilling."""
+        self.last_used.clear()
+        if self.maintenance_task and not self.maintenance_task.done():
+            self.maintenance_task.cancel()
+        for key in list(self.streams):
+            for stream in self.streams.pop(key):
+                await self._close(stream)
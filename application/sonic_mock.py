@@ -0,0 +1,349 @@
+import asyncio
+import array
+import base64
+import json
+import logging
+import math
+import os
+import re
+import sys
+import uuid
+
+from types import SimpleNamespace
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("sonic_mock")
+
+# Local stand-in for the Bedrock bidirectional stream of Nova Sonic, for offline tests and load generation.
+# MockBedrockClient has the invoke_model_with_bidirectional_stream() of BedrockRuntimeClient and speaks the
+# same event protocol: it reads sessionStart/promptStart/contentStart/textInput/audioInput/toolResult/
+# contentEnd/promptEnd/sessionEnd and answers with completionStart, contentStart, textOutput (speculative
+# and final), audioOutput, toolUse, contentEnd and completionEnd, and fails the stream like Bedrock once
+# the cumulative audio input passes maxLengthMilliseconds. No AWS SDK is needed; input chunks only need a
+# value.bytes_ attribute and outputs are returned the same way.
+#
+# Set SONIC_MOCK=1 (or to a JSON object overriding MOCK_CONFIG) to make translator._initialize_client()
+# and the console BedrockStreamManager use it.
+SONIC_MOCK = os.environ.get("SONIC_MOCK")
+
+MOCK_CONFIG = {
+    "connect_latency": 0.05,  # seconds to open a stream
+    "first_token_latency": 0.3,  # seconds from the end of an input to the first text output
+    "token_rate": 50.0,  # text output tokens per second
+    "chars_per_token": 4,
+    "audio_rate": 2.0,  # output audio produced per wall-clock second, as a multiple of real time
+    "speech_rate": 12.0,  # characters spoken per second of output audio
+    "audio_chunk_ms": 80,  # duration of an audioOutput event
+    "end_of_speech_ms": 600,  # silence that ends the user's speech in audio input
+    "min_speech_ms": 200,  # shorter bursts of audio input are ignored
+    "max_length_ms": None,  # overrides maxLengthMilliseconds of the audio input when set
+    "tool_timeout": 10.0,  # seconds to wait for a toolResult
+}
+SILENCE_PEAK = 500  # input chunks whose 16-bit peak stays below this are silence
+SENTENCE = re.compile(r'[^.!?。！？]+[.!?。！？]*\s*')
+
+class MockStreamError(Exception):
+    """Raised by the output stream where Bedrock fails the stream (e.g. the audio length limit)."""
+
+def config_from_env():
+    """MOCK_CONFIG overridden by the JSON object in SONIC_MOCK, if any."""
+    config = dict(MOCK_CONFIG)
+    if SONIC_MOCK and SONIC_MOCK.strip().startswith('{'):
+        config.update(json.loads(SONIC_MOCK))
+    return config
+
+def default_choose_tool(text, tools):
+    """Call the first tool whose name appears in the user's text, without input."""
+    lowered = text.lower()
+    for name in tools:
+        if name.lower() in lowered:
+            return name, {}
+    return None
+
+class MockBedrockClient:
+    """
+    Replacement for BedrockRuntimeClient that runs Nova Sonic streams locally.
+
+    translate(text) gives the assistant's answer to a user text (the text itself by default),
+    transcribe(speech_ms) the transcript of speech in audio input, and choose_tool(text, tool_names)
+    returns (tool_name, input) to answer with a toolUse instead. Other keyword arguments override
+    MOCK_CONFIG.
+    """
+
+    def __init__(self, translate=None, transcribe=None, choose_tool=default_choose_tool, **config):
+        self.config = dict(MOCK_CONFIG)
+        self.config.update(config)
+        self.translate = translate or (lambda text: text)
+        self.transcribe = transcribe or (lambda speech_ms: f"({speech_ms / 1000:.1f}s of speech)")
+        self.choose_tool = choose_tool
+        self.streams_opened = 0
+        self._audio_chunks = dict()  # (sample_rate, chunk_ms) -> base64 of a quiet tone
+
+    async def invoke_model_with_bidirectional_stream(self, operation_input=None):
+        await asyncio.sleep(self.config["connect_latency"])
+        self.streams_opened += 1
+        return MockStream(self)
+
+    def audio_chunk(self, sample_rate):
+        """base64 of one audioOutput chunk: a quiet 440 Hz tone, so it does not count as silence."""
+        key = (sample_rate, self.config["audio_chunk_ms"])
+        chunk = self._audio_chunks.get(key)
+        if chunk is None:
+            samples = sample_rate * key[1] // 1000
+            tone = array.array('h', (int(3000 * math.sin(2 * math.pi * 440 * i / sample_rate)) for i in range(samples)))
+            if sys.byteorder != 'little':
+                tone.byteswap()
+            chunk = self._audio_chunks[key] = base64.b64encode(tone.tobytes()).decode('ascii')
+        return chunk
+
+class MockInputStream:
+    def __init__(self, stream):
+        self.stream = stream
+        self.closed = False
+
+    async def send(self, chunk):
+        if self.closed:
+            raise MockStreamError("The input stream is closed")
+        if self.stream.error:
+            raise self.stream.error
+        self.stream._on_input(chunk.value.bytes_)
+
+    async def close(self):
+        self.closed = True
+
+class MockOutputStream:
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def receive(self):
+        """Return the next output event as result.value.bytes_; raises the stream's error once it failed."""
+        item = await self.stream.outbox.get()
+        if isinstance(item, Exception):
+            raise item
+        return SimpleNamespace(value=SimpleNamespace(bytes_=item))
+
+class MockStream:
+    """One bidirectional stream: parses input events and plays the model's side of the protocol."""
+
+    def __init__(self, client):
+        self.client = client
+        self.config = client.config
+        self.input_stream = MockInputStream(self)
+        self.output_stream = MockOutputStream(self)
+        self.outbox = asyncio.Queue()
+        self.error = None
+
+        self.session_id = str(uuid.uuid4())
+        self.prompt_name = None
+        self.completion_id = None
+        self.output_sample_rate = 24000
+        self.tools = []
+        self.contents = dict()  # contentName -> {"role", "type", "text", ...} of open input contents
+        self.turns = asyncio.Queue()  # ("text" | "speech", text) answered in order
+        self.responder = None
+        self.response_task = None  # turn being answered, cancelled on barge-in
+        self.interrupted = False
+        self.tool_results = dict()  # toolUseId -> future of the toolResult content
+
+        # Audio input
+        self.audio_ms = 0.0
+        self.max_length_ms = None
+        self.input_sample_rate = 16000
+        self.speech_ms = 0.0
+        self.silence_ms = 0.0
+
+    async def await_output(self):
+        return self, self.output_stream
+
+    # Input
+
+    def _on_input(self, raw):
+        event = json.loads(raw)['event']
+        event_type = next(iter(event))
+        body = event[event_type]
+
+        if event_type == 'promptStart':
+            self.prompt_name = body.get('promptName')
+            self.output_sample_rate = body.get('audioOutputConfiguration', {}).get('sampleRateHertz', 24000)
+            self.tools = [tool['toolSpec']['name'] for tool in body.get('toolConfiguration', {}).get('tools', [])]
+            self.responder = asyncio.get_running_loop().create_task(self._respond_loop())
+        elif event_type == 'contentStart':
+            self.contents[body['contentName']] = {"role": body.get('role'), "type": body.get('type'), "text": [], "body": body}
+            if body.get('type') == 'AUDIO':
+                audio_config = body.get('audioInputConfiguration', {})
+                self.input_sample_rate = audio_config.get('sampleRateHertz', 16000)
+                self.max_length_ms = self.config["max_length_ms"] or audio_config.get('maxLengthMilliseconds', 600000)
+        elif event_type in ('textInput', 'toolResult'):
+            content = self.contents.get(body.get('contentName'))
+            if content is not None:
+                content["text"].append(body.get('content', ''))
+        elif event_type == 'audioInput':
+            self._on_audio(base64.b64decode(body.get('content', '')))
+        elif event_type == 'contentEnd':
+            content = self.contents.pop(body.get('contentName'), None)
+            if content:
+                self._on_content_end(content)
+        elif event_type == 'promptEnd':
+            self.turns.put_nowait(None)
+
+    def _on_content_end(self, content):
+        text = "".join(content["text"])
+        if content["role"] == "USER" and content["type"] == "TEXT":
+            self.turns.put_nowait(("text", text))
+        elif content["role"] == "TOOL":
+            tool_use_id = content["body"].get('toolResultInputConfiguration', {}).get('toolUseId')
+            future = self.tool_results.pop(tool_use_id, None)
+            if future and not future.done():
+                future.set_result(text)
+
+    def _on_audio(self, audio):
+        chunk_ms = len(audio) * 1000 / (2 * self.input_sample_rate)
+        self.audio_ms += chunk_ms
+        if self.max_length_ms and self.audio_ms > self.max_length_ms:
+            self._fail(MockStreamError(
+                f"ValidationException: The cumulative audio stream length exceeded max length of {self.max_length_ms} milliseconds"
+            ))
+            return
+
+        samples = array.array('h')
+        samples.frombytes(audio[:len(audio) & ~1])
+        if samples and (max(samples) >= SILENCE_PEAK or min(samples) <= -SILENCE_PEAK):
+            if self.speech_ms == 0 and self.response_task and not self.response_task.done():
+                self.interrupted = True  # barge-in
+                self.response_task.cancel()
+            self.speech_ms += chunk_ms + self.silence_ms
+            self.silence_ms = 0.0
+        elif self.speech_ms:
+            self.silence_ms += chunk_ms
+            if self.silence_ms >= self.config["end_of_speech_ms"]:
+                if self.speech_ms >= self.config["min_speech_ms"]:
+                    self.turns.put_nowait(("speech", self.client.transcribe(self.speech_ms)))
+                self.speech_ms = 0.0
+                self.silence_ms = 0.0
+
+    def _fail(self, error):
+        if self.error is None:
+            self.error = error
+            self.outbox.put_nowait(error)
+            if self.responder:
+                self.responder.cancel()
+
+    # Output
+
+    def _emit(self, event_type, body):
+        body["promptName"] = self.prompt_name
+        body["sessionId"] = self.session_id
+        self.outbox.put_nowait(json.dumps({"event": {event_type: body}}, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def _content_start(self, role, content_type, stage=None, **fields):
+        content_id = str(uuid.uuid4())
+        body = {"completionId": self.completion_id, "contentId": content_id, "role": role, "type": content_type, **fields}
+        if stage:
+            body["additionalModelFields"] = json.dumps({"generationStage": stage})
+        self._emit("contentStart", body)
+        return content_id
+
+    def _content_end(self, content_id, content_type, stop_reason):
+        self._emit("contentEnd", {"completionId": self.completion_id, "contentId": content_id, "stopReason": stop_reason, "type": content_type})
+
+    def _text(self, content_id, role, text):
+        self._emit("textOutput", {"completionId": self.completion_id, "content": text, "contentId": content_id, "role": role})
+
+    async def _respond_loop(self):
+        try:
+            while True:
+                turn = await self.turns.get()
+                if turn is None:
+                    break
+                if self.completion_id is None:
+                    self.completion_id = str(uuid.uuid4())
+                    self._emit("completionStart", {"completionId": self.completion_id})
+                self.response_task = asyncio.get_running_loop().create_task(self._respond(*turn))
+                try:
+                    await self.response_task
+                except asyncio.CancelledError:
+                    if not self.interrupted:
+                        raise
+                    self.interrupted = False
+                finally:
+                    self.response_task = None
+            if self.completion_id:
+                self._emit("completionEnd", {"completionId": self.completion_id, "stopReason": "END_TURN"})
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"Mock stream failed: {e}")
+            self._fail(MockStreamError(str(e)))
+
+    async def _respond(self, kind, text):
+        """Answer one user turn: transcript, optional tool use, speculative text, audio and final text."""
+        if kind == "speech":
+            content_id = self._content_start("USER", "TEXT", "FINAL", textOutputConfiguration={"mediaType": "text/plain"})
+            self._text(content_id, "USER", text)
+            self._content_end(content_id, "TEXT", "END_TURN")
+
+        await asyncio.sleep(self.config["first_token_latency"])
+
+        tool = self.client.choose_tool(text, self.tools) if self.tools and self.client.choose_tool else None
+        if tool:
+            text = await self._use_tool(*tool)
+
+        answer = self.client.translate(text)
+        content_id = self._content_start("ASSISTANT", "TEXT", "SPECULATIVE", textOutputConfiguration={"mediaType": "text/plain"})
+        audio_id = None
+        try:
+            for sentence in SENTENCE.findall(answer) or [answer]:
+                tokens = max(1.0, len(sentence) / self.config["chars_per_token"])
+                await asyncio.sleep(tokens / self.config["token_rate"])
+                self._text(content_id, "ASSISTANT", sentence)
+            self._content_end(content_id, "TEXT", "PARTIAL_TURN")
+
+            audio_id = self._content_start("ASSISTANT", "AUDIO", audioOutputConfiguration={
+                "mediaType": "audio/lpcm", "sampleRateHertz": self.output_sample_rate, "sampleSizeBits": 16, "channelCount": 1
+            })
+            chunk = self.client.audio_chunk(self.output_sample_rate)
+            chunk_seconds = self.config["audio_chunk_ms"] / 1000
+            chunks = max(1, math.ceil(len(answer) / self.config["speech_rate"] / chunk_seconds))
+            loop = asyncio.get_running_loop()
+            started_at = loop.time()
+            for i in range(chunks):
+                # Produce audio at audio_rate times real time
+                delay = started_at + (i + 1) * chunk_seconds / self.config["audio_rate"] - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._emit("audioOutput", {"completionId": self.completion_id, "content": chunk, "contentId": audio_id, "role": "ASSISTANT"})
+            self._content_end(audio_id, "AUDIO", "END_TURN")
+        except asyncio.CancelledError:
+            # Barge-in: the speech of the user interrupts the answer
+            interrupted_id = audio_id or content_id
+            self._text(interrupted_id, "ASSISTANT", '{ "interrupted" : true }')
+            self._content_end(interrupted_id, "AUDIO" if audio_id else "TEXT", "INTERRUPTED")
+            raise
+
+        content_id = self._content_start("ASSISTANT", "TEXT", "FINAL", textOutputConfiguration={"mediaType": "text/plain"})
+        self._text(content_id, "ASSISTANT", answer)
+        self._content_end(content_id, "TEXT", "END_TURN")
+
+    async def _use_tool(self, tool_name, tool_input):
+        """Ask for a tool and return its result as the text to answer with."""
+        content_id = self._content_start("TOOL", "TOOL", toolUseOutputConfiguration={"mediaType": "application/json"})
+        tool_use_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self.tool_results[tool_use_id] = future
+        self._emit("toolUse", {
+            "completionId": self.completion_id, "content": json.dumps(tool_input), "contentId": content_id,
+            "role": "TOOL", "toolName": tool_name, "toolUseId": tool_use_id
+        })
+        self._content_end(content_id, "TOOL", "TOOL_USE")
+        try:
+            return await asyncio.wait_for(future, timeout=self.config["tool_timeout"])
+        except asyncio.TimeoutError:
+            self.tool_results.pop(tool_use_id, None)
+            return f"{tool_name} did not answer"
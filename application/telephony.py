@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import sys
+
+import numpy as np
+
+import g711
+from bounded_queue import BoundedQueue
+from resampler import Resampler
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("telephony")
+
+# Phone line media: 8 kHz G.711 (mu-law or A-law) in 20 ms frames of 160 bytes.
+# Ingress decodes the caller's frames with a lookup table and upsamples them to the 16 kHz LPCM that
+# start_audio_input() declares; egress takes the 24 kHz output of Nova Sonic down to 8 kHz and encodes
+# it back into 20 ms frames. Each direction works on whole buffers: one table gather and one resampler
+# call per batch of frames, with the filter state kept per call.
+TELEPHONY_SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_BYTES = TELEPHONY_SAMPLE_RATE * FRAME_MS // 1000  # one G.711 byte per sample
+INGRESS_FRAMES = 3  # frames decoded and sent together (60 ms), trading latency for per-call overhead
+INBOX_SIZE = 100  # caller chunks waiting for a stalled stream (6 s) before the oldest are dropped
+FRAME_QUEUE_SIZE = 3000  # translated frames not yet taken by the gateway (60 s)
+
+CODECS = {
+    # codec: (decode table, encode table, silence byte)
+    "mulaw": (g711.MULAW_DECODE, g711.MULAW_ENCODE, g711.MULAW_SILENCE),
+    "alaw": (g711.ALAW_DECODE, g711.ALAW_ENCODE, g711.ALAW_SILENCE),
+}
+
+def _codec(codec):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown G.711 codec: {codec}")
+    return CODECS[codec]
+
+def _to_pcm16(samples):
+    return np.clip(np.rint(samples), -32768, 32767).astype('<i2')
+
+class TelephonyIngress:
+    """
+    Caller audio: G.711 payloads of any size in, 16-bit PCM at out_rate out.
+
+    Payloads are buffered and released in batches of frames_per_chunk whole 20 ms frames, so jittery
+    or odd-sized packets still reach the stream as evenly sized chunks.
+    """
+
+    def __init__(self, codec="mulaw", out_rate=16000, frames_per_chunk=INGRESS_FRAMES):
+        decode, _, _ = _codec(codec)
+        self.codec = codec
+        self.decode = decode.astype(np.float32)
+        self.resampler = Resampler(TELEPHONY_SAMPLE_RATE, out_rate) if out_rate != TELEPHONY_SAMPLE_RATE else None
+        self.chunk_bytes = FRAME_BYTES * frames_per_chunk
+        self.pending = bytearray()
+        self.frames_in = 0
+
+    def feed(self, payload):
+        """Add G.711 bytes; returns the PCM of every complete chunk (b'' while a chunk is filling up)."""
+        self.pending += payload
+        whole = len(self.pending) - len(self.pending) % self.chunk_bytes
+        if not whole:
+            return b''
+        data = self.pending[:whole]
+        del self.pending[:whole]
+        return self._convert(data)
+
+    def flush(self):
+        """Return the PCM of the buffered partial chunk, e.g. when the call ends."""
+        data, self.pending = self.pending, bytearray()
+        return self._convert(data) if data else b''
+
+    def _convert(self, data):
+        self.frames_in += len(data) / FRAME_BYTES
+        samples = self.decode[np.frombuffer(data, dtype=np.uint8)]
+        if self.resampler:
+            samples = self.resampler.process(samples)
+        return _to_pcm16(samples).tobytes()
+
+class TelephonyEgress:
+    """Translated speech: 16-bit PCM at in_rate in, 20 ms G.711 frames out."""
+
+    def __init__(self, codec="mulaw", in_rate=24000):
+        _, encode, silence = _codec(codec)
+        self.codec = codec
+        self.encode = encode
+        self.silence = silence
+        self.resampler = Resampler(in_rate, TELEPHONY_SAMPLE_RATE) if in_rate != TELEPHONY_SAMPLE_RATE else None
+        self.pending = bytearray()  # encoded bytes short of a frame
+        self.remainder = b''  # odd byte of the PCM input
+        self.frames_out = 0
+
+    def feed(self, pcm):
+        """Add PCM; returns the complete 20 ms frames as a list of bytes."""
+        if self.remainder:
+            pcm = self.remainder + bytes(pcm)
+        even = len(pcm) & ~1
+        self.remainder = bytes(pcm[even:])
+        samples = np.frombuffer(pcm, dtype='<i2', count=even // 2)
+        if self.resampler:
+            samples = _to_pcm16(self.resampler.process(samples.astype(np.float32)))
+        self.pending += self.encode[samples.view(np.uint16)].tobytes()
+        return self._frames()
+
+    def flush(self):
+        """Return the last partial frame padded with silence (empty when there is none)."""
+        if not self.pending:
+            return []
+        self.pending += bytes([self.silence]) * (FRAME_BYTES - len(self.pending))
+        return self._frames()
+
+    def _frames(self):
+        whole = len(self.pending) - len(self.pending) % FRAME_BYTES
+        frames = [bytes(self.pending[i:i + FRAME_BYTES]) for i in range(0, whole, FRAME_BYTES)]
+        del self.pending[:whole]
+        self.frames_out += len(frames)
+        return frames
+
+    def silence_frame(self):
+        return bytes([self.silence]) * FRAME_BYTES
+
+class TelephonyCall:
+    """
+    A phone call through a speech2text TranslatorSession.
+
+    The media gateway passes the caller's G.711 payloads to receive() and sends the frames it reads
+    from frames (20 ms each, one every 20 ms) back to the line. The translated text of each turn still
+    arrives on session.output_queue.
+    """
+
+    def __init__(self, session, codec="mulaw", output_rate=24000):
+        self.session = session
+        self.ingress = TelephonyIngress(codec, out_rate=16000)
+        self.egress = TelephonyEgress(codec, in_rate=output_rate)
+        self.inbox = BoundedQueue("inbox", INBOX_SIZE, "drop_oldest")  # conditioned caller audio waiting to be sent
+        self.frames = BoundedQueue("frames", FRAME_QUEUE_SIZE, "drop_oldest")  # G.711 frames of the translated speech
+
+    async def start(self, language):
+        """Start translating the call into language; returns when the session accepts audio."""
+        session = self.session
+        session.use_streamlit_audio = True  # no local playback
+        session.collect_audio = False
+        session.audio_channel = self
+        session.task = asyncio.create_task(session.speech2text(language, self._send_audio))
+        await session.ready.wait()
+
+    def receive(self, payload):
+        """Queue a G.711 payload from the line (any number of bytes)."""
+        pcm = self.ingress.feed(payload)
+        if pcm:
+            self.inbox.put_nowait(pcm)
+
+    async def _send_audio(self):
+        # audio_input() of the session
+        while self.session.is_active:
+            pcm = await self.inbox.get()
+            if pcm is None:
+                break
+            await self.session.send_captured_audio(pcm)
+
+    # Audio channel of the session: the translated speech
+    def write(self, pcm):
+        for frame in self.egress.feed(pcm):
+            self.frames.put_nowait(frame)
+
+    def close(self):
+        for frame in self.egress.flush():
+            self.frames.put_nowait(frame)
+
+    async def hangup(self):
+        """End the call and its session."""
+        pcm = self.ingress.flush()
+        if pcm:
+            self.inbox.put_nowait(pcm)
+        self.inbox.put_nowait(None)
+        self.close()
+        await self.session.stop()
+        self.session.audio_channel = None
+        logger.info(f"[{self.session.session_id}] Call ended: {self.ingress.frames_in:.0f} frames in, {self.egress.frames_out} frames out")
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+
+from collections import OrderedDict
+
+logging.basicConfig(
+    level=logging.INFO,  # Default to INFO level
+    format='%(filename)s:%(lineno)d | %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ]
+)
+
+logger = logging.getLogger("translation_cache")
+
+# Finished translations (text, compressed audio and pronunciation) keyed by (text, language, mode, voice)
+TRANSLATION_CACHE_MEMORY_BYTES = int(os.environ.get("TRANSLATION_CACHE_MEMORY_BYTES", 16 * 1024 * 1024))
+TRANSLATION_CACHE_DB = os.environ.get(
+    "TRANSLATION_CACHE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.db")
+)
+TRANSLATION_CACHE_MAX_ROWS = 20000  # the least recently used rows beyond this are deleted
+
+def normalize_text(text):
+    """Cache key form of an input: NFC, trimmed, inner whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def cache_key(text, language, mode, voice):
+    raw = "\x1f".join((normalize_text(text), language, mode, voice))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class TranslationCache:
+    """
+    Two-tier cache of finished translations.
+
+    Entries are dicts with "translation", "pronunciation", "audio_format" and "audio" (compressed
+    bytes as produced by the audio store). The memory tier is an LRU bounded by the byte size of
+    its entries; every entry is also written to a SQLite table, which serves memory misses and
+    survives restarts. get() and put() may be called from any thread.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_DB, memory_bytes=TRANSLATION_CACHE_MEMORY_BYTES, max_rows=TRANSLATION_CACHE_MAX_ROWS):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # key -> (entry, size), least recently used first
+        self.memory_used = 0
+        self.db = None
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.puts = 0
+
+    def _connect(self):
+        if self.db is None and self.path:
+            try:
+                self.db = sqlite3.connect(self.path, check_same_thread=False)
+                self.db.execute("PRAGMA journal_mode=WAL")
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, text TEXT, language TEXT, mode TEXT, voice TEXT, "
+                    "translation TEXT, pronunciation TEXT, audio_format TEXT, audio BLOB, "
+                    "created_at REAL, last_used REAL)"
+                )
+                self.db.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+                self.db.commit()
+            except sqlite3.Error as e:
+                logger.info(f"Translation cache database is not available: {e}")
+                self.path = None
+                self.db = None
+        return self.db
+
+    def get(self, text, language, mode, voice):
+        """Return the cached entry or None."""
+        key = cache_key(text, language, mode, voice)
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return cached[0]
+
+            db = self._connect()
+            row = None
+            if db:
+                try:
+                    row = db.execute(
+                        "SELECT translation, pronunciation, audio_format, audio FROM translations WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row:
+                        db.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+                        db.commit()
+                except sqlite3.Error as e:
+                    logger.info(f"Error reading the translation cache: {e}")
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            entry = {"translation": row[0], "pronunciation": row[1], "audio_format": row[2], "audio": row[3]}
+            self._remember(key, entry)
+            return entry
+
+    def put(self, text, language, mode, voice, translation, pronunciation=None, audio_format=None, audio=None):
+        key = cache_key(text, language, mode, voice)
+        entry = {"translation": translation, "pronunciation": pronunciation, "audio_format": audio_format, "audio": audio}
+        with self.lock:
+            self.puts += 1
+            self._remember(key, entry)
+
+            db = self._connect()
+            if db:
+                now = time.time()
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, normalize_text(text), language, mode, voice, translation, pronunciation, audio_format, audio, now, now)
+                    )
+                    if self.puts % 100 == 0:
+                        db.execute(
+                            "DELETE FROM translations WHERE key IN "
+                            "(SELECT key FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_rows,)
+                        )
+                    db.commit()
+                except sqlite3.Error as e:
+                    logger.info(f"Error writing the translation cache: {e}")
+
+    def _remember(self, key, entry):
+        """Add an entry to the memory tier and evict least recently used ones past the budget (lock held)."""
+        size = len(key)
+        for value in entry.values():
+            if value:
+                size += len(value.encode('utf-8')) if isinstance(value, str) else len(value)
+        if key in self.memory:
+            self.memory_used -= self.memory.pop(key)[1]
+        self.memory[key] = (entry, size)
+        self.memory_used += size
+        while self.memory_used > self.memory_bytes and len(self.memory) > 1:
+            _, (_, evicted) = self.memory.popitem(last=False)
+            self.memory_used -= evicted
+
+    def stats(self):
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_used,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "puts": self.puts,
+            }
+
+    def close(self):
+        with self.lock:
+            if self.db:
+                self.db.close()
+                self.db = None
+
+cache = TranslationCache()
@@ -7,11 +7,24 @@ import pyaudio
 import wave
 import logging
 import sys
+import time
+import array
 
 from io import BytesIO
 from pathlib import Path
 from configparser import ConfigParser
 from concurrent.futures._base import InvalidStateError
+from session_pool import SessionPool
+import event_encoder
+import event_decoder
+import pacing
+from vad import VoiceActivityDetector
+from ring_buffer import RingBuffer
+from playback import PlaybackEngine
+from bounded_queue import BoundedQueue
+from resampler import AudioConditioner
+import metrics
+import sonic_mock
 from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
 from aws_sdk_bedrock_runtime.config import Config
@@ -33,6 +46,11 @@ OUTPUT_SAMPLE_RATE = 24000
 CHANNELS = 1
 FORMAT = pyaudio.paInt16
 CHUNK_SIZE = 1024
+CAPTURE_BUFFER_SECONDS = 5  # microphone audio buffered between the PyAudio callback and the event loop
+# Microphone format; audio captured at another rate or in stereo is converted to INPUT_SAMPLE_RATE mono
+CAPTURE_SAMPLE_RATE = int(os.environ.get("CAPTURE_SAMPLE_RATE", INPUT_SAMPLE_RATE))
+CAPTURE_CHANNELS = int(os.environ.get("CAPTURE_CHANNELS", CHANNELS))
+VOICE_ID = "tiffany"  # tiffany, amy, matthew, ambre
 
 def load_aws_credentials_from_config(profile='default'):
     """
@@ -94,972 +112,1312 @@ def load_aws_credentials_from_config(profile='default'):
 logger.info("Loading AWS credentials...")
 load_aws_credentials_from_config()
 
+
 model_id = 'amazon.nova-2-sonic-v1:0'
 region = 'us-west-2'
-client = None
-stream = None
-response = None
-is_active = False
-prompt_name = str(uuid.uuid4())
-content_name = str(uuid.uuid4())
-audio_content_name = str(uuid.uuid4())
-text_content_name = str(uuid.uuid4())
-# Queues will be initialized in the current event loop when translate() is called
-# This avoids "bound to a different event loop" errors
-audio_queue = None
-input_queue = None  # 외부에서 텍스트 입력을 받기 위한 큐
-output_queue = None
-role = None
-display_assistant_text = False
-is_active = False
+# Bedrock client shared by every session; each session opens its own bidirectional stream
 sonic_client = None
-# Audio chunks collected for Streamlit playback
-audio_chunks = []
-use_streamlit_audio = False  # Set to True when running in Streamlit/Docker
+use_streamlit_audio = False  # Default for new sessions, set to True when running in Streamlit/Docker
+
+# Stream pool: warm streams kept per (language, translation_mode)
+POOL_SIZE = 1
+POOL_MAX_AGE = 420.0  # seconds a warm stream may wait before it is replaced, inside the 8-minute Nova Sonic connection limit
+POOL_IDLE_TTL = 300.0  # seconds a (language, translation_mode) stays warm after its last use
+# A registered session nobody has used for this long (no request, text or speech; keepalive silence does
+# not count) is stopped and removed, e.g. the session of a browser tab that was closed
+SESSION_IDLE_TTL = float(os.environ.get("SESSION_IDLE_TTL", 900))
+
+# Stream rotation: Nova Sonic ends a stream once its cumulative audio input reaches maxLengthMilliseconds,
+# so a replacement stream is opened ahead of the limit and swapped in on a silent chunk
+MAX_AUDIO_LENGTH_MS = 1200000
+ROTATION_LEAD_MS = 60000  # open the replacement stream this long before the limit
+ROTATION_DEADLINE_MS = MAX_AUDIO_LENGTH_MS - 5000  # swap even without silence after this point
+ROTATION_DRAIN_TIMEOUT = 30.0  # seconds a retired stream may keep delivering its last response
+SILENCE_PEAK = 500  # chunks whose 16-bit peak stays below this are treated as silence
+
+# Silence keepalive: text2speech keeps the audio input alive with silence sent at real time
+KEEPALIVE_CHUNK_SIZE = CHUNK_SIZE  # samples per silent chunk (64 ms at 16 kHz)
+KEEPALIVE_RATE = 1.0  # audio seconds sent per wall-clock second
+
+# Put on a session's output_queue after the last text of an assistant turn
+END_OF_TURN = "__end_of_turn__"
+
+# Voice activity detection on microphone capture: non-speech frames are sent as pre-encoded silence
+USE_VAD = True
+VAD_CONFIG = {
+    "threshold_db": -50.0,  # minimum speech level in dBFS
+    "margin_db": 10.0,  # speech must be this far above the adaptive noise floor
+    "zcr_max": 0.35,  # quiet frames crossing zero more often than this are treated as noise
+    "hangover_ms": 400,  # keep sending real audio this long after speech ends
+    "preroll_ms": 192,  # real audio sent before a speech onset (adds this much capture latency)
+}
+
+# Local playback: a dedicated thread plays from a jitter buffer whose depth follows the arrival jitter
+PLAYBACK_CONFIG = {
+    "min_ms": 60,  # smallest buffered audio before playback (re)starts
+    "max_ms": 500,  # largest adaptive buffer target
+    "capacity_ms": 30000,  # buffered audio beyond this is dropped, oldest first
+}
+
+# Session queues are bounded so a stalled consumer cannot grow memory without limit. maxsize is in items;
+# policy is "block" (the producer waits), "drop_oldest" or "drop_silence" (silent audio is dropped first, then the oldest)
+QUEUE_CONFIG = {
+    "audio": {"maxsize": 400, "policy": "drop_silence"},  # output audio chunks waiting for play_audio()
+    "output": {"maxsize": 1000, "policy": "drop_oldest"},  # assistant text of turns without a TranslationRequest
+    "transcript": {"maxsize": 100, "policy": "drop_oldest"},  # transcripts of the user's speech
+    "input": {"maxsize": 100, "policy": "block"},  # text inputs waiting for the stream
+    "request": {"maxsize": 2000, "policy": "drop_oldest"},  # text and audio of one TranslationRequest not read yet
+}
+
+# Per-turn latency metrics, see TurnTimer
+TURN_TTFT = metrics.registry.histogram("translator_time_to_first_text_seconds", "Turn start to the first assistant text")
+TURN_TTFA = metrics.registry.histogram("translator_time_to_first_audio_seconds", "Turn start to the first assistant audio byte")
+TURN_LAST_AUDIO = metrics.registry.histogram("translator_time_to_last_audio_seconds", "Turn start to the last assistant audio byte")
+TURN_AUDIO = metrics.registry.histogram("translator_turn_audio_seconds", "Assistant audio produced per turn", buckets=metrics.DURATION_BUCKETS)
+TURN_RTF = metrics.registry.histogram("translator_real_time_factor", "Turn start to last audio byte divided by the audio duration", buckets=metrics.RTF_BUCKETS)
+TURNS = metrics.registry.counter("translator_turns_total", "Assistant turns by end reason")
+SESSION_SETUP = metrics.registry.histogram("translator_session_setup_seconds", "Time to attach a ready stream to a session")
+RESTARTS = metrics.registry.counter("translator_restarts_total", "Stream replacements by reason (rotation, max_length, error)")
+BEDROCK_ERRORS = metrics.registry.counter("translator_bedrock_errors_total", "Errors of Bedrock streams by operation and type")
+ACTIVE_SESSIONS = metrics.registry.gauge("translator_active_sessions", "Active translator sessions by mode")
+ACTIVE_STREAMS = metrics.registry.gauge("translator_active_streams", "Open Nova Sonic streams in use, being rotated in or retiring")
+QUEUE_DEPTH = metrics.registry.gauge("translator_queue_depth", "Items waiting in the session queues, summed over sessions")
+QUEUE_HIGH_WATER = metrics.registry.gauge("translator_queue_high_water", "Largest depth reached by a session queue")
+VAD_FRAMES = metrics.registry.counter("translator_vad_frames_total", "Captured audio frames by VAD decision (voiced, suppressed)")
+
+def error_type(e):
+    """Label of a stream error for BEDROCK_ERRORS: max_length for the audio length limit, else the exception class."""
+    error_msg = str(e)
+    if "exceeded max length" in error_msg or "cumulative audio stream length" in error_msg:
+        return "max_length"
+    return type(e).__name__
+
+def is_silent(audio_bytes):
+    """Return True if a 16-bit PCM chunk contains no sample louder than SILENCE_PEAK."""
+    samples = array.array('h')
+    samples.frombytes(audio_bytes[:len(audio_bytes) & ~1])
+    if not samples:
+        return True
+    return max(samples) < SILENCE_PEAK and min(samples) > -SILENCE_PEAK
 
 def _initialize_client(region):
-    """Initialize the Bedrock client."""
+    """Initialize the Bedrock client (the local stand-in of sonic_mock when SONIC_MOCK is set)."""
+    if sonic_mock.SONIC_MOCK:
+        logger.info("Using the local Nova Sonic mock")
+        return sonic_mock.MockBedrockClient(**sonic_mock.config_from_env())
+
     config_params = {
         "endpoint_uri": f"https://bedrock-runtime.{region}.amazonaws.com",
         "region": region,
     }
-    
+
     if os.getenv("AWS_ACCESS_KEY_ID"):
         config_params["aws_credentials_identity_resolver"] = EnvironmentCredentialsResolver()
-    
+
     config = Config(**config_params)
     client = BedrockRuntimeClient(config=config)
 
     return client
 
-async def send_event(event_json):
-    """Send an event to the stream."""
-    global is_active
-    # Ensure event_json is a string
-    if isinstance(event_json, bytes):
-        event_json = event_json.decode('utf-8', errors='replace')
-    elif not isinstance(event_json, str):
-        event_json = str(event_json)
-    
-    # Ensure valid UTF-8 encoding before sending
-    try:
-        encoded_bytes = event_json.encode('utf-8')
-    except UnicodeEncodeError:
-        # Fallback: replace invalid characters
-        encoded_bytes = event_json.encode('utf-8', errors='replace')
-    
-    try:
-        event = InvokeModelWithBidirectionalStreamInputChunk(
-            value=BidirectionalInputPayloadPart(bytes_=encoded_bytes)
-        )
-        await stream.input_stream.send(event)
-    except Exception as e:
-        logger.info(f"Error sending event: {e}")
-        is_active = False
-        raise
-
-async def start_session(language, translation_mode):
-    """Start a new session with Nova Sonic."""
-    global is_active, sonic_client, stream, response
-
+def get_client():
+    """Return the shared Bedrock client, creating it on first use."""
+    global sonic_client
     if not sonic_client:
         sonic_client = _initialize_client(region)
-        
-    # Initialize the stream
-    stream = await sonic_client.invoke_model_with_bidirectional_stream(
-        InvokeModelWithBidirectionalStreamOperationInput(model_id=model_id)
-    )
-    is_active = True
-    
-    # Send session start event
-    session_start = '''
-    {
-        "event": {
-        "sessionStart": {
-            "inferenceConfiguration": {
-            "maxTokens": 1024,
-            "topP": 0.9,
-            "temperature": 0.1
-            }
-        }
-        }
-    }
-    '''
-    await send_event(session_start)
-    
-    # Send prompt start event
-    #tiffany, amy, matthew ambre
-    prompt_start = f'''
-    {{
-        "event": {{
-        "promptStart": {{
-            "promptName": "{prompt_name}",
-            "textOutputConfiguration": {{
-            "mediaType": "text/plain"
-            }},
-            "audioOutputConfiguration": {{
-            "mediaType": "audio/lpcm",
-            "sampleRateHertz": 24000,
-            "sampleSizeBits": 16,
-            "channelCount": 1,
-            "voiceId": "tiffany",
-            "encoding": "base64",
-            "audioType": "SPEECH"
-            }}
-        }}
-        }}
-    }}
-    '''
-    await send_event(prompt_start)
-    
-    # Send system prompt
-    text_content_start = f'''
-    {{
-        "event": {{
-            "contentStart": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{content_name}",
-                "type": "TEXT",
-                "interactive": false,
-                "role": "SYSTEM",
-                "textInputConfiguration": {{
-                    "mediaType": "text/plain"
-                }}
-            }}
-        }}
-    }}
-    '''
-    await send_event(text_content_start)
-
-    if translation_mode == "text2speech":    
-        system_prompt = (
-            "당신은 실시간 번역기입니다." 
-            f"사용자가 한국어로 입력하면, 원문 그대로를 {language}로 번역하여 답변하세요."
-            "번역한 내용만 답변합니다."        
-            "이전의 대화는 무시하고 현재 대화만 번역합니다."
-        )
-    else: # speech2text
-        system_prompt = (
-            "당신은 실시간 번역기입니다." 
-            f"사용자가 {language}로 입력하면, 원문 그대로를 한국어로 번역하여 답변하세요."
-            "번역한 내용만 답변합니다."        
-            "이전의 대화는 무시하고 현재 대화만 번역합니다."
-        )
+    return sonic_client
+
+class SonicStream:
+    """A bidirectional Nova Sonic stream initialised with the translation system prompt."""
+
+    def __init__(self, language, translation_mode):
+        self.language = language
+        self.translation_mode = translation_mode
+        self.stream = None
+        self.response = None
+        self.is_active = False
+        self.created_at = time.monotonic()
+        self.last_output_at = self.created_at
+        self.audio_ms_sent = 0.0  # cumulative audio input, limited by MAX_AUDIO_LENGTH_MS
+        self.prompt_name = str(uuid.uuid4())
+        self.content_name = str(uuid.uuid4())
+        self.audio_content_name = str(uuid.uuid4())
+        self.text_content_name = str(uuid.uuid4())
+        self.role = None
+        self.display_assistant_text = False
+        self.turn_open = False  # an assistant turn has started and its END_OF_TURN is not published yet
+        self.content_id = None  # contentId of the last contentStart
+        self.content_requests = dict()  # contentId -> TranslationRequest answered by that content
+        self.turn_timer = None  # TurnTimer of the current turn that has no TranslationRequest
+        # TranslatorSession receiving the output; None while the stream waits in the pool
+        self.session = None
+
+    async def send_event(self, event_json):
+        """Send an event to the stream."""
+        if isinstance(event_json, bytes):
+            # Already UTF-8 encoded (event_encoder output)
+            encoded_bytes = event_json
+        else:
+            # Ensure event_json is a string
+            if not isinstance(event_json, str):
+                event_json = str(event_json)
+
+            # Ensure valid UTF-8 encoding before sending
+            try:
+                encoded_bytes = event_json.encode('utf-8')
+            except UnicodeEncodeError:
+                # Fallback: replace invalid characters
+                encoded_bytes = event_json.encode('utf-8', errors='replace')
 
-    text_input = f'''
-    {{
-        "event": {{
-            "textInput": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{content_name}",
-                "content": "{system_prompt}"
-            }}
-        }}
-    }}
-    '''
-    await send_event(text_input)
-    
-    text_content_end = f'''
-    {{
-        "event": {{
-            "contentEnd": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{content_name}"
-            }}
-        }}
-    }}
-    '''
-    await send_event(text_content_end)
-    
-    # Start processing responses
-    response = asyncio.create_task(_process_responses())
-
-async def start_audio_input():
-    """Start audio input stream."""
-    # maxLengthMilliseconds: Maximum cumulative audio stream length in milliseconds
-    # Default is 600000ms (10 minutes), increase to 1200000ms (20 minutes)
-    audio_content_start = f'''
-    {{
-        "event": {{
-            "contentStart": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{audio_content_name}",
-                "type": "AUDIO",
-                "interactive": true,
-                "role": "USER",
-                "audioInputConfiguration": {{
-                    "mediaType": "audio/lpcm",
-                    "sampleRateHertz": 16000,
-                    "sampleSizeBits": 16,
-                    "channelCount": 1,
-                    "audioType": "SPEECH",
-                    "encoding": "base64",
-                    "maxLengthMilliseconds": 1200000
-                }}
-            }}
-        }}
-    }}
-    '''
-    await send_event(audio_content_start)
-
-async def send_audio_chunk(audio_bytes):
-    """Send an audio chunk to the stream."""
-    if not is_active:
-        return
-        
-    blob = base64.b64encode(audio_bytes)
-    audio_event = f'''
-    {{
-        "event": {{
-            "audioInput": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{audio_content_name}",
-                "content": "{blob.decode('utf-8')}"
-            }}
-        }}
-    }}
-    '''
-    await send_event(audio_event)
-
-async def end_audio_input():
-    """End audio input stream."""
-    audio_content_end = f'''
-    {{
-        "event": {{
-            "contentEnd": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{audio_content_name}"
-            }}
-        }}
-    }}
-    '''
-    await send_event(audio_content_end)
-
-async def start_text_input():
-    """Start text input stream."""
-    global text_content_name
-    text_content_name = str(uuid.uuid4())  # Generate new content name for each text input
-    text_content_start = f'''
-    {{
-        "event": {{
-            "contentStart": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{text_content_name}",
-                "role": "USER",
-                "type": "TEXT",
-                "interactive": true,
-                "textInputConfiguration": {{
-                    "mediaType": "text/plain"
-                }}
-            }}
-        }}
-    }}
-    '''
-    await send_event(text_content_start)
-
-async def send_text(text):
-    """Send text input to the stream."""
-    if not is_active:
-        return
-    
-    # Ensure text is a proper UTF-8 string
-    if isinstance(text, bytes):
-        text = text.decode('utf-8', errors='replace')
-    elif not isinstance(text, str):
-        text = str(text)
-    
-    # Create text input event with proper JSON encoding
-    text_input_event = {
-        "event": {
-            "textInput": {
-                "promptName": prompt_name,
-                "contentName": text_content_name,
-                "content": text
-            }
-        }
-    }
-    text_event = json.dumps(text_input_event, ensure_ascii=False)
-    await send_event(text_event)
-
-async def end_text_input():
-    """End text input stream."""
-    text_content_end = f'''
-    {{
-        "event": {{
-            "contentEnd": {{
-                "promptName": "{prompt_name}",
-                "contentName": "{text_content_name}"
-            }}
-        }}
-    }}
-    '''
-    await send_event(text_content_end)
-
-async def end_session():
-    """End the session."""
-    if not is_active:
-        return
-        
-    prompt_end = f'''
-    {{
-        "event": {{
-            "promptEnd": {{
-                "promptName": "{prompt_name}"
-            }}
-        }}
-    }}
-    '''
-    await send_event(prompt_end)
-    
-    session_end = '''
-    {
-        "event": {
-            "sessionEnd": {}
-        }
-    }
-    '''
-    await send_event(session_end)
-    # close the stream
-    await stream.input_stream.close()
-
-async def _restart_session(language, translation_mode):
-    """Restart the session when audio stream length exceeds max length."""
-    global is_active, stream, response
-    
-    logger.info("Restarting session due to audio stream length error...")
-    
-    # Cancel current response task if it exists
-    if response and not response.done():
-        response.cancel()
         try:
-            await response
-        except asyncio.CancelledError:
-            pass
+            event = InvokeModelWithBidirectionalStreamInputChunk(
+                value=BidirectionalInputPayloadPart(bytes_=encoded_bytes)
+            )
+            await self.stream.input_stream.send(event)
         except Exception as e:
-            logger.info(f"Error cancelling response task: {e}")
-    
-    try:
-        # End current session gracefully
-        if stream:
-            try:
-                # Close stream input
-                if hasattr(stream, 'input_stream'):
-                    try:
-                        await stream.input_stream.close()
-                    except Exception as e:
-                        logger.info(f"Error closing input stream: {e}")
-            except Exception as e:
-                logger.info(f"Error ending session during restart: {e}")
-        
-        # Reset state temporarily
-        old_is_active = is_active
-        is_active = False
-        
-        # Wait a moment before restarting
-        await asyncio.sleep(1.0)
-        
-        # Restore is_active state
-        is_active = old_is_active
-        
-        # Start new session (this will create a new response task)
-        await start_session(language, translation_mode)
-        
-        logger.info("Session restarted successfully")
-        
-    except Exception as e:
-        logger.info(f"Error restarting session: {e}")
-        is_active = False
-        raise
-
-async def _process_responses():
-    """Process responses from the stream."""
-    global is_active, role, display_assistant_text, stream
-    
-    try:
-        while is_active:
-            try:
-                output = await stream.await_output()
-                result = await output[1].receive()
-                
-                if result.value and result.value.bytes_:
-                    response_data = result.value.bytes_.decode('utf-8')
-                    json_data = json.loads(response_data)                    
-                    
-                    if 'event' in json_data:
+            logger.info(f"Error sending event: {e}")
+            BEDROCK_ERRORS.inc(operation="send", type=error_type(e))
+            self.is_active = False
+            raise
+
+    async def start(self):
+        """Open the stream and send sessionStart, promptStart and the system prompt."""
+        language = self.language
+        translation_mode = self.translation_mode
+
+        # Initialize the stream
+        self.stream = await get_client().invoke_model_with_bidirectional_stream(
+            InvokeModelWithBidirectionalStreamOperationInput(model_id=model_id)
+        )
+        self.is_active = True
+
+        # Send session start event
+        await self.send_event(event_encoder.session_start())
+
+        # Send prompt start event
+        await self.send_event(event_encoder.prompt_start(self.prompt_name, VOICE_ID, sample_rate=OUTPUT_SAMPLE_RATE))
+
+        # Send system prompt
+        await self.send_event(event_encoder.text_content_start(self.prompt_name, self.content_name, role="SYSTEM", interactive=False))
+
+        if translation_mode == "text2speech":
+            system_prompt = (
+                "당신은 실시간 번역기입니다."
+                f"사용자가 한국어로 입력하면, 원문 그대로를 {language}로 번역하여 답변하세요."
+                "번역한 내용만 답변합니다."
+                "이전의 대화는 무시하고 현재 대화만 번역합니다."
+            )
+        elif translation_mode == "interpret":
+            system_prompt = (
+                "당신은 실시간 통역사입니다."
+                f"사용자가 한국어로 말하면, 원문 그대로를 {language}로 번역하여 답변하세요."
+                "번역한 내용만 답변합니다."
+                "이전의 대화는 무시하고 현재 대화만 번역합니다."
+            )
+        else: # speech2text
+            system_prompt = (
+                "당신은 실시간 번역기입니다."
+                f"사용자가 {language}로 입력하면, 원문 그대로를 한국어로 번역하여 답변하세요."
+                "번역한 내용만 답변합니다."
+                "이전의 대화는 무시하고 현재 대화만 번역합니다."
+            )
+
+        await self.send_event(event_encoder.text_input(self.prompt_name, self.content_name, system_prompt))
+        await self.send_event(event_encoder.content_end(self.prompt_name, self.content_name))
+
+        # Start processing responses
+        self.response = asyncio.create_task(self._process_responses())
+
+    async def start_audio_input(self):
+        """Start audio input stream."""
+        # maxLengthMilliseconds: Maximum cumulative audio stream length in milliseconds
+        # Default is 600000ms (10 minutes), increase to 1200000ms (20 minutes)
+        await self.send_event(event_encoder.audio_content_start(self.prompt_name, self.audio_content_name, MAX_AUDIO_LENGTH_MS, sample_rate=INPUT_SAMPLE_RATE))
+
+    async def send_audio_chunk(self, audio_bytes, content=None):
+        """Send an audio chunk to the stream; content is its base64 when already encoded for another stream."""
+        if not self.is_active:
+            return
+
+        self.audio_ms_sent += len(audio_bytes) * 1000 / (2 * INPUT_SAMPLE_RATE)
+
+        if content is None:
+            await self.send_event(event_encoder.audio_input(self.prompt_name, self.audio_content_name, audio_bytes))
+        else:
+            await self.send_event(event_encoder.encoded_audio_input(self.prompt_name, self.audio_content_name, content))
+
+    async def send_silence(self, num_bytes):
+        """Send num_bytes of silence using the pre-encoded silent audio event."""
+        if not self.is_active:
+            return
+
+        self.audio_ms_sent += num_bytes * 1000 / (2 * INPUT_SAMPLE_RATE)
+        await self.send_event(event_encoder.silent_audio_input(self.prompt_name, self.audio_content_name, num_bytes))
+
+    async def end_audio_input(self):
+        """End audio input stream."""
+        await self.send_event(event_encoder.content_end(self.prompt_name, self.audio_content_name))
+
+    async def start_text_input(self, content_name=None):
+        """Start text input stream."""
+        self.text_content_name = content_name or str(uuid.uuid4())  # Generate new content name for each text input
+        await self.send_event(event_encoder.text_content_start(self.prompt_name, self.text_content_name))
+
+    async def send_text(self, text):
+        """Send text input to the stream."""
+        if not self.is_active:
+            return
+
+        # Ensure text is a proper UTF-8 string
+        if isinstance(text, bytes):
+            text = text.decode('utf-8', errors='replace')
+        elif not isinstance(text, str):
+            text = str(text)
+
+        # Create text input event with proper JSON encoding
+        await self.send_event(event_encoder.text_input(self.prompt_name, self.text_content_name, text))
+
+    async def end_text_input(self):
+        """End text input stream."""
+        await self.send_event(event_encoder.content_end(self.prompt_name, self.text_content_name))
+
+    async def end(self):
+        """End the Nova Sonic session and close the stream."""
+        if not self.is_active:
+            return
+
+        await self.send_event(event_encoder.prompt_end(self.prompt_name))
+
+        await self.send_event(event_encoder.session_end())
+        # close the stream
+        await self.stream.input_stream.close()
+
+    async def _process_responses(self):
+        """Process responses from the stream."""
+        try:
+            while self.is_active:
+                try:
+                    output = await self.stream.await_output()
+                    result = await output[1].receive()
+
+                    if result.value and result.value.bytes_:
+                        self.last_output_at = time.monotonic()
+                        if event_decoder.EVENT_RECORDING:
+                            event_decoder.record(result.value.bytes_)
+                        event_type, event = event_decoder.decode_event(result.value.bytes_)
+
+                        # Handle audio output (the most frequent event; content is already decoded)
+                        if event_type == 'audioOutput':
+                            audio_bytes = event['content']
+                            if self.session:
+                                # Never waits: this loop also delivers the turn ends of every request
+                                self.session.audio_queue.put_nowait(audio_bytes)
+                                request = self._request_for(event)
+                                if request:
+                                    request.put("audio", audio_bytes)
+                                timer = self._timer_for(request)
+                                if timer:
+                                    timer.mark_audio(len(audio_bytes))
+
                         # Handle content start event
-                        if 'contentStart' in json_data['event']:
-                            # logger.info(f"json_data: {json_data}")
-                            content_start = json_data['event']['contentStart'] 
+                        elif event_type == 'contentStart':
                             # set role
-                            role = content_start['role']
-                            # logger.info(f"-> contentStart: role={content_start['role']}, type={content_start['type']}, completionId={content_start['completionId']}, contentId={content_start['contentId']}")
-                            
+                            self.role = event['role']
+                            self.content_id = event.get('contentId')
+                            # logger.info(f"-> contentStart: role={event['role']}, type={event['type']}, completionId={event['completionId']}, contentId={event['contentId']}")
+
                             # Check for speculative content
-                            if 'additionalModelFields' in content_start:
-                                additional_fields = json.loads(content_start['additionalModelFields'])
-                                #logger.info(f" additionalModelFields: {additional_fields}")
-                                if additional_fields.get('generationStage') == 'SPECULATIVE':
-                                    display_assistant_text = True
+                            if 'additionalModelFields' in event:
+                                if event_decoder.generation_stage(event) == 'SPECULATIVE':
+                                    self.display_assistant_text = True
+                                    # An assistant turn starts with its speculative text
+                                    if self.role == "ASSISTANT":
+                                        self.turn_open = True
                                 else:
-                                    display_assistant_text = False
-                                
+                                    self.display_assistant_text = False
+
+                            if self.role == "USER" or self.turn_open:
+                                self._bind_content(event)
+
                         # Handle text output event
-                        elif 'textOutput' in json_data['event']:
-                            text = json_data['event']['textOutput']['content']    
-                            
-                            if (role == "ASSISTANT" and display_assistant_text):
+                        elif event_type == 'textOutput':
+                            text = event['content']
+
+                            # Barge-in: drop the assistant audio that is still buffered for playback
+                            if '{ "interrupted" : true }' in text:
+                                if self.session and self.session.player:
+                                    self.session.player.flush()
+                                continue
+
+                            if (self.role == "ASSISTANT" and self.display_assistant_text):
                                 logger.info(f"Assistant: {text}")
-                                await output_queue.put(text)
+                                request = self._request_for(event)
+                                timer = self._timer_for(request)
+                                if timer:
+                                    timer.mark_text()
+                                await self._put_output(text, request)
                                 await asyncio.sleep(0.01)
-                            elif role == "USER":
+                            elif self.role == "USER":
                                 logger.info(f"User: {text}")
-                                await output_queue.put(text)
+                                request = self._request_for(event)
+                                # A voice turn is timed from the transcript of the user's speech
+                                if request is None and self.turn_timer is None:
+                                    self.turn_timer = TurnTimer(self.translation_mode)
+                                # The source text goes to its own queue, apart from the translation
+                                if self.session:
+                                    await self.session.transcript_queue.put(text)
                                 await asyncio.sleep(0.01)
-                        
-                        # Handle audio output
-                        elif 'audioOutput' in json_data['event']:
-                            # logger.info(f"audio...")
-                            audio_content = json_data['event']['audioOutput']['content']
-                            audio_bytes = base64.b64decode(audio_content)
-                            await audio_queue.put(audio_bytes)
-
-                        # elif 'completionStart' in json_data['event']:
-                        #     completionId = json_data['event']['completionStart']['completionId']
-                        #     logger.info(f"-> completionStart: {completionId}")                            
-                        # elif 'contentEnd' in json_data['event']:
-                        #     logger.info(f"-> contentEnd")
-                        #elif 'usageEvent' in json_data['event']:
-                        #    logger.info(f"usageEvent...")
-                        # else:
-                        #     logger.info(f"json_data: {json_data}")
-            except InvalidStateError as e:
-                # Ignore CANCELLED state errors from AWS CRT library
-                # This can happen when the stream is cancelled/closed
-                if "CANCELLED" in str(e):
-                    logger.debug(f"Ignoring cancelled future error: {e}")
-                    if not is_active:
-                        break
-                    continue
-                else:
-                    raise
-    except Exception as e:
-        error_msg = str(e)
-        logger.info(f"Error processing responses: {e}")
-        
-        # Check if it's an audio stream length exceeded error
-        if "exceeded max length" in error_msg or "cumulative audio stream length" in error_msg:
-            logger.info("Audio stream length exceeded max length. Attempting to restart session...")
-            try:
-                # Signal that we need to restart by setting a flag
-                # The translate() function will handle the actual restart
+
+                        # The first assistant content that ends the turn (normally the audio) completes the translation
+                        elif event_type == 'contentEnd':
+                            if self.role == "ASSISTANT" and event.get('stopReason') in ("END_TURN", "INTERRUPTED"):
+                                await self._end_turn(event.get('stopReason'), event)
+
+                        elif event_type == 'completionEnd':
+                            await self._end_turn(event.get('stopReason', "END_TURN"), event)
+
+                        # elif event_type == 'completionStart':
+                        #     logger.info(f"-> completionStart: {event['completionId']}")
+                        # elif event_type == 'usageEvent':
+                        #     logger.info(f"usageEvent...")
+                except InvalidStateError as e:
+                    # Ignore CANCELLED state errors from AWS CRT library
+                    # This can happen when the stream is cancelled/closed
+                    if "CANCELLED" in str(e):
+                        logger.debug(f"Ignoring cancelled future error: {e}")
+                        if not self.is_active:
+                            break
+                        continue
+                    else:
+                        raise
+        except Exception as e:
+            error_msg = str(e)
+            logger.info(f"Error processing responses: {e}")
+            BEDROCK_ERRORS.inc(operation="receive", type=error_type(e))
+            # Let a caller waiting on this turn return what it has instead of timing out
+            await self._end_turn("ERROR")
+
+            # Check if it's an audio stream length exceeded error
+            if "exceeded max length" in error_msg or "cumulative audio stream length" in error_msg:
+                logger.info("Audio stream length exceeded max length. Attempting to restart session...")
+                # Signal that we need to restart; the session input loop handles the actual restart
                 # We just need to exit this function so the task completes
-                is_active = False
-            except Exception as restart_error:
-                logger.info(f"Error preparing for restart: {restart_error}")
-                is_active = False
+                self.is_active = False
+            else:
+                # For other errors, re-raise to be handled by the session input loop
+                self.is_active = False
+                raise
+
+    def _bind_content(self, content_start):
+        """Attribute a content block to the oldest unanswered request sent on this stream."""
+        if not self.session:
+            return
+        request = next((r for r in self.session.requests if r.sonic is self), None)
+        if request:
+            self.content_requests[content_start.get('contentId')] = request
+            if request.completion_id is None:
+                request.completion_id = content_start.get('completionId')
+
+    def _request_for(self, event=None):
+        """Return the request an output event answers by its contentId, then its completionId; None for voice turns."""
+        event = event or {}
+        request = self.content_requests.get(event.get('contentId', self.content_id))
+        if request is None and event.get('completionId') and self.session:
+            request = next((r for r in self.session.requests if r.sonic is self and r.completion_id == event['completionId']), None)
+        return request
+
+    def _timer_for(self, request):
+        """TurnTimer of the turn answering request, or of the current voice turn."""
+        if request and request.timer:
+            return request.timer
+        return self.turn_timer
+
+    async def _end_turn(self, reason, event=None):
+        """Publish END_OF_TURN once per assistant turn so callers stop waiting for output."""
+        if not self.turn_open:
+            return
+        self.turn_open = False
+        request = self._request_for(event)
+        timer = self._timer_for(request)
+        if timer is self.turn_timer:
+            self.turn_timer = None
+        logger.info(f"End of turn: {reason} {timer.finish(reason) if timer else ''}")
+        if request:
+            self.content_requests = {k: v for k, v in self.content_requests.items() if v is not request}
+            self.session._finish_request(request, reason)
         else:
-            # For other errors, re-raise to be handled by translate() function
-            raise
+            await self._put_output(END_OF_TURN)
 
-async def play_audio():
-    """Play audio responses."""
-    global is_active, audio_chunks
-    
-    # If running in Streamlit/Docker, collect audio chunks instead of playing
-    if use_streamlit_audio:
-        logger.info("Collecting audio chunks for Streamlit playback...")
-        try:
-            while is_active:
-                try:
-                    audio_data = await asyncio.wait_for(audio_queue.get(), timeout=1.0)
-                    audio_chunks.append(audio_data)
-                    logger.debug(f"Collected audio chunk: {len(audio_data)} bytes")
-                except asyncio.TimeoutError:
-                    # Check if still active
-                    if not is_active:
-                        break
-                    continue
-        except Exception as e:
-            logger.info(f"Error collecting audio: {e}")
-        finally:
-            logger.info(f"Audio collection stopped. Total chunks: {len(audio_chunks)}")
-    else:
-        # Original pyaudio playback for console/local use
-        p = pyaudio.PyAudio()
-        stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=OUTPUT_SAMPLE_RATE,
-            output=True,
-            frames_per_buffer=CHUNK_SIZE
-        )
+    async def _put_output(self, text, request=None):
+        if request:
+            request.put("text", text)
+        elif self.session:
+            await self.session.output_queue.put(text)
+        else:
+            logger.info(f"Dropping output of a detached stream: {text}")
+
+    async def close(self):
+        """Cancel response processing and close the stream without ending the prompt."""
+        self.is_active = False
+        if self.response and not self.response.done():
+            self.response.cancel()
+            try:
+                await self.response
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.info(f"Error cancelling response task: {e}")
+
+        if self.stream:
+            try:
+                await self.stream.input_stream.close()
+            except Exception as e:
+                logger.info(f"Error closing input stream: {e}")
+
+async def open_stream(language, translation_mode):
+    """Open a new stream that is ready to take text or audio input."""
+    stream = SonicStream(language, translation_mode)
+    await stream.start()
+    return stream
+
+# Pre-warmed streams handed out to new sessions and session restarts
+pool = SessionPool(open_stream, size=POOL_SIZE, max_age=POOL_MAX_AGE, idle_ttl=POOL_IDLE_TTL)
+
+class TurnTimer:
+    """
+    Timing of one assistant turn, recorded into the metrics registry when the turn ends.
+
+    A turn starts when its text input is sent, or for speech input when the user's transcript arrives.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.started_at = time.monotonic()
+        self.first_text_at = None
+        self.first_audio_at = None
+        self.last_audio_at = None
+        self.audio_bytes = 0
+
+    def mark_text(self):
+        if self.first_text_at is None:
+            self.first_text_at = time.monotonic()
+
+    def mark_audio(self, num_bytes):
+        now = time.monotonic()
+        if self.first_audio_at is None:
+            self.first_audio_at = now
+        self.last_audio_at = now
+        self.audio_bytes += num_bytes
+
+    def finish(self, reason):
+        """Record the turn and return its timings in seconds."""
+        timings = {"mode": self.mode, "reason": reason}
+        TURNS.inc(mode=self.mode, reason=reason)
+        if self.first_text_at is not None:
+            timings["ttft"] = round(self.first_text_at - self.started_at, 3)
+            TURN_TTFT.observe(timings["ttft"], mode=self.mode)
+        if self.first_audio_at is not None:
+            audio_seconds = self.audio_bytes / (2 * OUTPUT_SAMPLE_RATE)
+            timings["ttfa"] = round(self.first_audio_at - self.started_at, 3)
+            timings["last_audio"] = round(self.last_audio_at - self.started_at, 3)
+            timings["audio_seconds"] = round(audio_seconds, 3)
+            timings["rtf"] = round(timings["last_audio"] / audio_seconds, 3)
+            TURN_TTFA.observe(timings["ttfa"], mode=self.mode)
+            TURN_LAST_AUDIO.observe(timings["last_audio"], mode=self.mode)
+            TURN_AUDIO.observe(audio_seconds, mode=self.mode)
+            TURN_RTF.observe(timings["rtf"], mode=self.mode)
+        return timings
+
+class TurnIncompleteError(Exception):
+    """The turn answering a TranslationRequest ended other than with END_TURN; text and audio are what arrived."""
+
+    def __init__(self, reason, text="", audio=b""):
+        super().__init__(f"Turn ended with {reason}")
+        self.reason = reason
+        self.text = text
+        self.audio = audio
+
+class TranslationRequest:
+    """
+    Handle of one text input sent through TranslatorSession.send_text_input().
+
+    The text and audio of the assistant turn that answers this input are routed here by the
+    contentId / completionId of the stream events, so callers sharing a session never read
+    each other's output. Iterate it once with `async for kind, data in request` to receive
+    ("text", str) and ("audio", bytes) items until the turn ends.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.content_name = str(uuid.uuid4())  # contentName of the text input
+        self.completion_id = None
+        self.sonic = None  # stream the text was sent on
+        self.timer = None  # TurnTimer started when the text is sent
+        self.done = False
+        self.stop_reason = None  # END_TURN, INTERRUPTED, ERROR, TIMEOUT, ABANDONED or OVERFLOW once the turn is over
+        # Filled from the stream's receive loop, which must never wait; a request nobody reads loses its oldest output
+        self.queue = BoundedQueue("request", **QUEUE_CONFIG["request"])
+
+    def put(self, kind, data):
+        self.queue.put_nowait((kind, data))
+
+    def finish(self, reason="ABANDONED"):
+        if not self.done:
+            self.done = True
+            self.stop_reason = reason
+            self.queue.put_nowait((END_OF_TURN, None))
+
+    async def __aiter__(self):
+        while True:
+            kind, data = await self.queue.get()
+            if kind == END_OF_TURN:
+                return
+            yield kind, data
+
+    async def result(self, timeout=30.0, on_audio=None, on_text=None, keep_audio=True):
+        """
+        Wait for the end of the turn and return its (text, audio bytes); on_audio/on_text see each chunk as it arrives.
+        With keep_audio=False the audio is only passed to on_audio and b"" is returned in its place.
+
+        Raises TurnIncompleteError, with the output received so far, when the turn times out or ends
+        other than with END_TURN (interrupted, stream error, abandoned) or part of its output was dropped.
+        """
+        texts = []
+        audio = []
+
+        async def collect():
+            async for kind, data in self:
+                if kind == "text":
+                    texts.append(data)
+                    if on_text:
+                        on_text(data)
+                else:
+                    if keep_audio:
+                        audio.append(data)
+                    if on_audio:
+                        on_audio(data)
 
         try:
-            while is_active:
-                audio_data = await audio_queue.get()
+            await asyncio.wait_for(collect(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Timeout waiting for the response to {self.content_name}")
+            # Late output of this turn must not be taken for the answer to the next request
+            session = self.sonic.session if self.sonic else None
+            if session:
+                session._finish_request(self, "TIMEOUT")
+            else:
+                self.finish("TIMEOUT")
 
-                # Write the audio data in chunks to avoid blocking
-                for i in range(0, len(audio_data), CHUNK_SIZE):
-                    if not is_active:
-                        break
+        if self.queue.dropped and self.stop_reason == "END_TURN":
+            # Output was read too late and lost its beginning
+            self.stop_reason = "OVERFLOW"
+        if self.stop_reason != "END_TURN":
+            raise TurnIncompleteError(self.stop_reason, "".join(texts), b"".join(audio))
+        return "".join(texts), b"".join(audio)
 
-                    end = min(i + CHUNK_SIZE, len(audio_data))
-                    chunk = audio_data[i:end]
+def count_vad_frames(frames):
+    """Add the (frame, voiced) pairs released by a VoiceActivityDetector to VAD_FRAMES."""
+    voiced = sum(1 for _, is_voiced in frames if is_voiced)
+    if voiced:
+        VAD_FRAMES.inc(voiced, decision="voiced")
+    if len(frames) > voiced:
+        VAD_FRAMES.inc(len(frames) - voiced, decision="suppressed")
 
-                    # Write chunk in executor to avoid blocking the event loop
-                    await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        stream.write,
-                        chunk
-                    )
+async def capture_microphone(sample_rate, channels, send, is_active):
+    """Capture the microphone as 16 kHz mono PCM, passing each batch to send() while is_active() is true."""
+    loop = asyncio.get_running_loop()
+    conditioner = AudioConditioner(sample_rate, channels, out_rate=INPUT_SAMPLE_RATE)
+    # Capture in chunks of the same duration as CHUNK_SIZE at INPUT_SAMPLE_RATE
+    capture_chunk = CHUNK_SIZE * sample_rate // INPUT_SAMPLE_RATE
+    frame_bytes = 2 * channels
+    ring = RingBuffer(sample_rate * frame_bytes * CAPTURE_BUFFER_SECONDS)
+    data_ready = asyncio.Event()
+    wake_pending = False
 
-                    # Brief yield to allow other tasks to run
-                    await asyncio.sleep(0.001)
+    def wake():
+        nonlocal wake_pending
+        wake_pending = False
+        data_ready.set()
+
+    def input_callback(in_data, frame_count, time_info, status):
+        # Runs on the PyAudio thread: copy into the ring buffer and wake the event loop at most once per batch
+        nonlocal wake_pending
+        ring.write(in_data)
+        if not wake_pending:
+            wake_pending = True
+            loop.call_soon_threadsafe(wake)
+        return (None, pyaudio.paContinue)
 
-        except Exception as e:
-            logger.info(f"Error playing audio: {e}")
-        finally:
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            logger.info("Audio playing stopped.")
-            is_active = False
-
-async def capture_audio():
-    """Capture audio from microphone and send to Nova Sonic."""
     p = pyaudio.PyAudio()
     stream = p.open(
         format=FORMAT,
-        channels=CHANNELS,
-        rate=INPUT_SAMPLE_RATE,
+        channels=channels,
+        rate=sample_rate,
         input=True,
-        frames_per_buffer=CHUNK_SIZE
+        frames_per_buffer=capture_chunk,
+        stream_callback=input_callback
     )
-    
+
     logger.info("Starting audio capture. Speak into your microphone...")
     logger.info("Press Enter to stop...")
-    
-    await start_audio_input()
-    
+
     try:
-        while is_active:
-            audio_data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-            # logger.info(f"-> audioInput: {audio_data[:10]}...")
-            await send_audio_chunk(audio_data)
-            await asyncio.sleep(0.01)
-    except Exception as e:
-        logger.info(f"Error capturing audio: {e}")
+        stream.start_stream()
+        while is_active():
+            await data_ready.wait()
+            data_ready.clear()
+            # Drain everything captured since the last wake-up in one batch of whole chunks
+            audio_data = ring.read(multiple=capture_chunk * frame_bytes)
+            if audio_data and not conditioner.passthrough:
+                audio_data = conditioner.process(audio_data)
+            if audio_data:
+                await send(audio_data)
     finally:
         stream.stop_stream()
         stream.close()
         p.terminate()
-        logger.info("Audio capture stopped.")
-        await end_audio_input()
-
-async def send_silent_audio():
-    """Send continuous silent audio chunks to maintain audio stream."""
-    # Create silent audio chunk (16-bit PCM, 16kHz, mono)
-    silent_chunk_size = CHUNK_SIZE * 2  # 2 bytes per sample for 16-bit
-    silent_chunk = b'\x00' * silent_chunk_size
-    
-    while is_active:
+        if ring.overruns:
+            logger.info(f"Audio capture dropped {ring.dropped_bytes} bytes in {ring.overruns} overruns")
+        if not conditioner.passthrough:
+            logger.info(f"Audio conditioning: {conditioner.stats()}")
+
+class TranslatorSession:
+    """One user's translation session: queues, collected audio and the Nova Sonic stream in use."""
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.last_used_at = time.monotonic()  # last request, text input or speech, see SESSION_IDLE_TTL
+        self.sonic = None  # SonicStream in use
+        self.next_sonic = None  # replacement stream prepared ahead of the audio length limit
+        self.rotation_task = None
+        self.retiring = set()  # rotated-out streams still delivering their last response
+        self.rotations = 0
+        self.restarts = 0  # streams replaced after a failure or the audio length limit
+        self.task = None  # background text2speech()/speech2text() task
+        self.is_active = False
+        self.ready = asyncio.Event()  # set once the session accepts input
+        self.language = None
+        self.translation_mode = None
+        # Queues will be initialized in the current event loop when text2speech()/speech2text() is called
+        # This avoids "bound to a different event loop" errors
+        self.audio_queue = None
+        self.input_queue = None  # 외부에서 텍스트 입력을 받기 위한 큐
+        self.output_queue = None  # assistant text, END_OF_TURN after each turn
+        self.transcript_queue = None  # transcripts of the user's speech (the source of speech2text/interpret turns)
+        # TranslationRequests of send_text_input() whose turn has not ended, in send order
+        self.requests = []
+        # Audio chunks collected for Streamlit playback
+        self.audio_chunks = []
+        self.collect_audio = True  # off when the audio only goes to audio_channel, e.g. on a phone call
+        # audio_stream.AudioChannel that also receives the collected audio, e.g. for streaming to the browser
+        self.audio_channel = None
+        self.use_streamlit_audio = use_streamlit_audio
+        # Voice activity detection for speech2text, configurable per session before it starts
+        self.use_vad = USE_VAD
+        self.vad_config = dict(VAD_CONFIG)
+        # Queue limits and overflow policies, configurable per session before it starts
+        self.queue_config = {name: dict(config) for name, config in QUEUE_CONFIG.items()}
+        self.vad = None
+        # Microphone format, configurable per session before it starts
+        self.capture_sample_rate = CAPTURE_SAMPLE_RATE
+        self.capture_channels = CAPTURE_CHANNELS
+        # Local playback engine while play_audio() runs with pyaudio
+        self.player = None
+
+    async def start_session(self, language, translation_mode):
+        """Attach a stream for language and translation_mode, pre-warmed when the pool has one."""
+        self.language = language
+        self.translation_mode = translation_mode
+
+        started_at = time.monotonic()
+        self.sonic = await pool.acquire(language, translation_mode)
+        self.sonic.session = self
+        self.is_active = True
+        SESSION_SETUP.observe(time.monotonic() - started_at, mode=translation_mode)
+
+    async def send_audio_chunk(self, audio_bytes, content=None):
+        """Send an audio chunk to the stream, rotating to a fresh stream before the audio length limit."""
+        if not self.is_active:
+            return
+        self.last_used_at = time.monotonic()
+
+        self._check_rotation(is_silent(audio_bytes) if self.next_sonic else False)
+
+        if not self.sonic.is_active:
+            return
+        await self.sonic.send_audio_chunk(audio_bytes, content)
+
+    async def send_silence(self, num_bytes):
+        """Send num_bytes of silence to the stream."""
+        if not self.is_active:
+            return
+
+        self._check_rotation(True)
+
+        if not self.sonic.is_active:
+            return
+        await self.sonic.send_silence(num_bytes)
+
+    def _check_rotation(self, silent):
+        """Prepare a replacement stream close to the audio length limit and swap to it on silence."""
+        sent_ms = self.sonic.audio_ms_sent
+        if sent_ms >= MAX_AUDIO_LENGTH_MS - ROTATION_LEAD_MS and self.rotation_task is None:
+            self.rotation_task = asyncio.create_task(self._prepare_rotation())
+
+        # Swap on a silence boundary so no utterance is split across the two streams
+        if self.next_sonic and (silent or sent_ms >= ROTATION_DEADLINE_MS):
+            self._rotate()
+
+    async def _prepare_rotation(self):
+        """Open the replacement stream and start its audio input so it can take over without a gap."""
+        logger.info(f"[{self.session_id}] Audio length {self.sonic.audio_ms_sent:.0f}ms is close to the limit. Preparing a new stream...")
         try:
-            # Send silent audio chunk
-            await send_audio_chunk(silent_chunk)
-            # Wait for next chunk (maintain ~16kHz sample rate)
-            await asyncio.sleep(0.01)  # 10ms delay
+            sonic = await pool.acquire(self.language, self.translation_mode)
+            sonic.session = self
+            await sonic.start_audio_input()
+            self.next_sonic = sonic
         except Exception as e:
-            if is_active:
-                logger.info(f"Error sending silent audio: {e}")
-            break
-
-async def process_text_input(user_input):
-    """Process text input and send to Nova Sonic."""
-    # Ensure proper UTF-8 encoding handling
-    if isinstance(user_input, bytes):
-        # If somehow bytes, decode with error handling
-        user_input = user_input.decode('utf-8', errors='replace')
-    elif not isinstance(user_input, str):
-        user_input = str(user_input)
-    
-    # Normalize the string to ensure valid UTF-8
-    # Encode and decode to catch any encoding issues early
-    try:
-        user_input = user_input.encode('utf-8', errors='replace').decode('utf-8')
-    except (UnicodeEncodeError, UnicodeDecodeError) as e:
-        logger.info(f"Warning: Encoding issue detected, using error replacement: {e}")
-        user_input = user_input.encode('utf-8', errors='replace').decode('utf-8')
-    
-    # Send text input to Nova Sonic
-    await start_text_input()
-    await send_text(user_input)
-    await end_text_input()
-    
-    logger.info(f"📝 Text sent: {user_input}\n")
-
-async def send_text_input(text):
-    """Send text input to Nova Sonic."""
-    global is_active
-    if not is_active:
-        logger.info("Session is not active. Setting is_active to False.")
-        is_active = False
-        raise RuntimeError("Session is not active. Call start_session() first.")
-    await input_queue.put(text)
-
-async def _read_stdin_to_queue():
-    """Read from stdin and send via send_text_input."""
-    try:
-        while is_active:
-            logger.info("Waiting for user input...")
-            # Get user input from stdin
-            user_input = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: input("You: ")
-            )
-            
-            # Check if user wants to stop
-            if user_input.strip().lower() == 'quit':
-                logger.info("Quitting...")
-                await input_queue.put('__stop__')
-                break
-            if user_input.strip() == '':
-                logger.info("Stopping text input...")
-                await input_queue.put('__stop__')
-                break
-            
-            # Send input via send_text_input function
-            await send_text_input(user_input)
-    except Exception as e:
-        logger.info(f"Error reading from stdin: {e}")
-        if is_active:
-            await input_queue.put('__stop__')
-
-async def text2speech(language):
-    global is_active, response, output_queue, input_queue, audio_queue, audio_chunks
-    
-    # Reset audio chunks for new translation session
-    audio_chunks = []
-    
-    # Ensure queues are created in the current event loop
-    # This prevents "bound to a different event loop" errors
-    # Recreate queues in the current event loop to ensure they're bound correctly
-    output_queue = asyncio.Queue()
-    input_queue = asyncio.Queue()
-    audio_queue = asyncio.Queue()
-    
-    # Start session
-    await start_session(language, "text2speech")
-    
-    # Start audio playback task
-    logger.info("Starting audio playback task...")
-    playback_task = asyncio.create_task(play_audio())
-    
-    # Start audio input stream (required for audio output)
-    await start_audio_input()
-    
-    # Start silent audio task to maintain audio stream
-    silent_audio_task = asyncio.create_task(send_silent_audio())
-    
-    # Start stdin reading task
-    # stdin_task = asyncio.create_task(_read_stdin_to_queue())
-    
-    try:
-        while is_active:
-            # Monitor both input queue and response task
-            # Use asyncio.wait to monitor both simultaneously
-            tasks_to_wait = [asyncio.create_task(input_queue.get())]
-            if response:
-                tasks_to_wait.append(response)
-            
-            done, pending = await asyncio.wait(
-                tasks_to_wait,
-                return_when=asyncio.FIRST_COMPLETED
+            logger.info(f"[{self.session_id}] Error preparing a new stream: {e}")
+            self.rotation_task = None
+
+    def _rotate(self):
+        """Make the prepared stream current and retire the old one in the background."""
+        old_sonic = self.sonic
+        self.sonic = self.next_sonic
+        self.next_sonic = None
+        self.rotation_task = None
+        self.rotations += 1
+        RESTARTS.inc(reason="rotation")
+        logger.info(f"[{self.session_id}] Rotated to a new stream after {old_sonic.audio_ms_sent:.0f}ms of audio (rotations: {self.rotations})")
+
+        task = asyncio.create_task(self._retire(old_sonic))
+        self.retiring.add(task)
+        task.add_done_callback(self.retiring.discard)
+
+    async def _retire(self, sonic):
+        """End the audio input of a rotated-out stream and close it once its last response is delivered."""
+        try:
+            if sonic.is_active:
+                await sonic.end_audio_input()
+            retired_at = time.monotonic()
+            while sonic.is_active and time.monotonic() - retired_at < ROTATION_DRAIN_TIMEOUT:
+                if time.monotonic() - sonic.last_output_at > 2.0:
+                    break
+                await asyncio.sleep(0.5)
+            if sonic.is_active:
+                await sonic.end()
+        except Exception as e:
+            logger.info(f"[{self.session_id}] Error retiring stream: {e}")
+        finally:
+            await sonic.close()
+            self._abandon_requests(sonic)
+
+    async def end_session(self):
+        """End the Nova Sonic session of the stream in use."""
+        if self.rotation_task and not self.rotation_task.done():
+            self.rotation_task.cancel()
+        self.rotation_task = None
+        if self.next_sonic:
+            await self.next_sonic.close()
+            self.next_sonic = None
+        for task in list(self.retiring):
+            task.cancel()
+
+        if self.sonic and self.sonic.is_active:
+            await self.sonic.end()
+        if self.sonic:
+            await self.sonic.close()
+        self._abandon_requests()
+
+    def _finish_request(self, request, reason="ABANDONED"):
+        """End the channel of a request whose turn is over."""
+        request.finish(reason)
+        if request in self.requests:
+            self.requests.remove(request)
+
+    def _abandon_requests(self, sonic=None):
+        """Finish the pending requests sent on sonic (all if None) that will never get an answer."""
+        for request in list(self.requests):
+            if sonic is None or request.sonic is sonic:
+                logger.info(f"[{self.session_id}] Abandoning request {request.content_name}")
+                self._finish_request(request)
+
+    async def _restart_session(self, language, translation_mode, reason="max_length"):
+        """Replace the stream when the audio stream length exceeds max length or the stream fails."""
+        logger.info(f"[{self.session_id}] Restarting session due to audio stream length error...")
+        self.restarts += 1
+        RESTARTS.inc(reason=reason)
+
+        try:
+            # End current stream
+            old_sonic = self.sonic
+            await old_sonic.close()
+            self._abandon_requests(old_sonic)
+
+            if self.next_sonic:
+                # A replacement stream is already prepared
+                self.sonic = self.next_sonic
+                self.next_sonic = None
+                self.rotation_task = None
+            else:
+                # Attach a new stream (this will create a new response task)
+                await self.start_session(language, translation_mode)
+                await self.sonic.start_audio_input()
+
+            logger.info(f"[{self.session_id}] Session restarted successfully")
+
+        except Exception as e:
+            logger.info(f"Error restarting session: {e}")
+            self.is_active = False
+            raise
+
+    async def play_audio(self):
+        """Play audio responses."""
+        # If running in Streamlit/Docker, collect audio chunks instead of playing
+        if self.use_streamlit_audio:
+            logger.info("Collecting audio chunks for Streamlit playback...")
+            try:
+                while self.is_active:
+                    try:
+                        audio_data = await asyncio.wait_for(self.audio_queue.get(), timeout=1.0)
+                        if self.collect_audio:
+                            self.audio_chunks.append(audio_data)
+                        if self.audio_channel:
+                            self.audio_channel.write(audio_data)
+                        logger.debug(f"Collected audio chunk: {len(audio_data)} bytes")
+                    except asyncio.TimeoutError:
+                        # Check if still active
+                        if not self.is_active:
+                            break
+                        continue
+            except Exception as e:
+                logger.info(f"Error collecting audio: {e}")
+            finally:
+                logger.info(f"Audio collection stopped. Total chunks: {len(self.audio_chunks)}")
+        else:
+            # Original pyaudio playback for console/local use
+            p = pyaudio.PyAudio()
+            stream = p.open(
+                format=FORMAT,
+                channels=CHANNELS,
+                rate=OUTPUT_SAMPLE_RATE,
+                output=True,
+                frames_per_buffer=CHUNK_SIZE
             )
-            
-            # Check if response task completed (failed)
-            response_completed = False
-            if response and response in done:
-                response_completed = True
+
+            # Device writes happen on the playback thread; this task only feeds its jitter buffer
+            player = PlaybackEngine(stream, sample_rate=OUTPUT_SAMPLE_RATE, chunk_size=CHUNK_SIZE, **PLAYBACK_CONFIG)
+            player.start()
+            self.player = player
+
+            try:
+                while self.is_active:
+                    audio_data = await self.audio_queue.get()
+                    player.feed(audio_data)
+
+            except Exception as e:
+                logger.info(f"Error playing audio: {e}")
+            finally:
+                self.player = None
+                await asyncio.get_running_loop().run_in_executor(None, player.stop)
+                logger.info(f"[{self.session_id}] Playback stats: {player.stats()}")
+                stream.stop_stream()
+                stream.close()
+                p.terminate()
+                logger.info("Audio playing stopped.")
+                self.is_active = False
+
+    async def capture_audio(self):
+        """Capture audio from microphone and send to Nova Sonic."""
+        self.vad = VoiceActivityDetector(frame_size=CHUNK_SIZE, sample_rate=INPUT_SAMPLE_RATE, **self.vad_config) if self.use_vad else None
+        try:
+            await capture_microphone(self.capture_sample_rate, self.capture_channels, self.send_captured_audio, lambda: self.is_active)
+        except Exception as e:
+            logger.info(f"Error capturing audio: {e}")
+        finally:
+            if self.vad:
+                # Frames still held for pre-roll and hangover
                 try:
-                    # Check if task completed with an error
-                    await response
+                    await self._send_vad_frames(self.vad.flush())
                 except Exception as e:
-                    error_msg = str(e)
-                    logger.info(f"Response task failed: {e}")
-                    
-                    # Cancel the input queue task if it's still pending
-                    for task in pending:
-                        task.cancel()
-                        try:
-                            await task
-                        except (asyncio.CancelledError, Exception):
-                            pass
-                    
-                    # Check if it's an audio stream length exceeded error
-                    if "exceeded max length" in error_msg or "cumulative audio stream length" in error_msg:
-                        logger.info("Detected audio stream length error. Restarting session...")
-                        try:
-                            await _restart_session(language, "text2speech")
-                            logger.info("Session restarted. Continuing...")
-                            continue  # Continue the loop to wait for next input
-                        except Exception as restart_error:
-                            logger.info(f"Failed to restart session: {restart_error}")
-                            break
-                    else:
-                        # For other errors, try to restart once
-                        logger.info("Attempting to restart session due to error...")
-                        try:
-                            await _restart_session(language, "text2speech")
-                            logger.info("Session restarted. Continuing...")
-                            continue  # Continue the loop to wait for next input
-                        except Exception as restart_error:
-                            logger.info(f"Failed to restart session: {restart_error}")
-                            break
-            
-            # If response task completed without error, just continue
-            if response_completed:
-                continue
-            
-            # Get user input from completed task
-            user_input_task = None
-            for task in done:
-                if task != response:
-                    user_input_task = task
+                    logger.info(f"Error sending the last captured audio: {e}")
+                logger.info(f"Audio capture stopped. VAD: {self.vad.stats()}")
+            else:
+                logger.info("Audio capture stopped.")
+
+    async def send_captured_audio(self, audio_data):
+        """Send captured audio, replacing frames without speech by silence when VAD is enabled."""
+        if not self.vad:
+            view = memoryview(audio_data)
+            for i in range(0, len(view), CHUNK_SIZE * 2):
+                await self.send_audio_chunk(view[i:i + CHUNK_SIZE * 2])
+            return
+
+        await self._send_vad_frames(self.vad.process(audio_data))
+
+    async def _send_vad_frames(self, frames):
+        count_vad_frames(frames)
+        for frame, voiced in frames:
+            if voiced:
+                await self.send_audio_chunk(frame)
+            else:
+                await self.send_silence(len(frame))
+
+    async def send_silent_audio(self):
+        """Send silent audio chunks at real time to maintain audio stream."""
+        # Silent audio chunk (16-bit PCM, 16kHz, mono)
+        silent_chunk_size = KEEPALIVE_CHUNK_SIZE * 2  # 2 bytes per sample for 16-bit
+        interval = KEEPALIVE_CHUNK_SIZE / INPUT_SAMPLE_RATE / KEEPALIVE_RATE
+
+        try:
+            async for _ in pacing.paced(interval):
+                if not self.is_active:
                     break
-            
-            if user_input_task:
-                user_input = await user_input_task
-                
-                # Check for special stop signal
-                if user_input is None or user_input.strip().lower() == '__stop__':
+                await self.send_silence(silent_chunk_size)
+        except Exception as e:
+            if self.is_active:
+                logger.info(f"Error sending silent audio: {e}")
+
+    async def process_text_input(self, user_input, request=None):
+        """Process text input and send to Nova Sonic."""
+        # Ensure proper UTF-8 encoding handling
+        if isinstance(user_input, bytes):
+            # If somehow bytes, decode with error handling
+            user_input = user_input.decode('utf-8', errors='replace')
+        elif not isinstance(user_input, str):
+            user_input = str(user_input)
+
+        # Normalize the string to ensure valid UTF-8
+        # Encode and decode to catch any encoding issues early
+        try:
+            user_input = user_input.encode('utf-8', errors='replace').decode('utf-8')
+        except (UnicodeEncodeError, UnicodeDecodeError) as e:
+            logger.info(f"Warning: Encoding issue detected, using error replacement: {e}")
+            user_input = user_input.encode('utf-8', errors='replace').decode('utf-8')
+
+        # Send text input to Nova Sonic; the request's channel receives the answer of this stream
+        timer = TurnTimer(self.translation_mode)
+        if request:
+            request.sonic = self.sonic
+            request.timer = timer
+        else:
+            self.sonic.turn_timer = timer
+        await self.sonic.start_text_input(request.content_name if request else None)
+        await self.sonic.send_text(user_input)
+        await self.sonic.end_text_input()
+
+        logger.info(f"📝 Text sent: {user_input}\n")
+
+    async def send_text_input(self, text):
+        """Send text input to Nova Sonic and return the TranslationRequest that receives its answer."""
+        if not self.is_active:
+            logger.info("Session is not active. Setting is_active to False.")
+            self.is_active = False
+            raise RuntimeError("Session is not active. Call start_session() first.")
+        self.last_used_at = time.monotonic()
+        request = TranslationRequest(text)
+        self.requests.append(request)
+        await self.input_queue.put(request)
+        return request
+
+    async def stop(self):
+        """Ask the running text2speech()/speech2text() loop to end the session."""
+        if self.input_queue is not None and self.task and not self.task.done():
+            try:
+                # The input queue may be full behind a stalled stream
+                await asyncio.wait_for(self.input_queue.put('__stop__'), timeout=5.0)
+                await asyncio.wait_for(asyncio.shield(self.task), timeout=5.0)
+            except (asyncio.TimeoutError, Exception) as e:
+                logger.info(f"[{self.session_id}] Error stopping session: {e}")
+                self.task.cancel()
+        self.is_active = False
+        self.ready.clear()
+
+    async def _read_stdin_to_queue(self):
+        """Read from stdin and send via send_text_input."""
+        try:
+            while self.is_active:
+                logger.info("Waiting for user input...")
+                # Get user input from stdin
+                user_input = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: input("You: ")
+                )
+
+                # Check if user wants to stop
+                if user_input.strip().lower() == 'quit':
+                    logger.info("Quitting...")
+                    await self.input_queue.put('__stop__')
+                    break
+                if user_input.strip() == '':
                     logger.info("Stopping text input...")
+                    await self.input_queue.put('__stop__')
                     break
-                
-                # Process text input
-                await process_text_input(user_input)
-            else:
-                # If no input task, just continue (response task might have completed)
-                continue
-            
-    except Exception as e:
-        logger.info(f"Error reading text: {e}")
-    finally:
-        # # Stop stdin task if it exists
-        # if stdin_task and not stdin_task.done():
-        #     stdin_task.cancel()
-        #     try:
-        #         await stdin_task
-        #     except asyncio.CancelledError:
-        #         pass
-        
-        # Stop silent audio task
-        if not silent_audio_task.done():
-            silent_audio_task.cancel()
-            try:
-                await silent_audio_task
-            except asyncio.CancelledError:
-                pass
-        
-        # End audio input
-        await end_audio_input()
-        logger.info("Text input stopped.")
-        
-        # First cancel the tasks
-        tasks = []
-        if not playback_task.done():
-            logger.info("Cancelling audio playback task...")
-            tasks.append(playback_task)
-        for task in tasks:
-            logger.info(f"Cancelling task: {task}")
-            task.cancel()
-        if tasks:
-            logger.info("Gathering tasks...")
-            await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # End session
-    await end_session()
-    is_active = False
 
-    # cancel the response task
-    if response and not response.done():
-        response.cancel()
+                # Send input via send_text_input function
+                await self.send_text_input(user_input)
+        except Exception as e:
+            logger.info(f"Error reading from stdin: {e}")
+            if self.is_active:
+                await self.input_queue.put('__stop__')
 
-    logger.info("Session ended")
+    async def _run_input_loop(self, language, translation_mode):
+        """Forward queued text input to Nova Sonic and restart the stream when its response task ends."""
+        try:
+            while self.is_active:
+                # Monitor both input queue and response task
+                # Use asyncio.wait to monitor both simultaneously
+                response = self.sonic.response
+                input_task = asyncio.create_task(self.input_queue.get())
+                tasks_to_wait = [input_task]
+                if response:
+                    tasks_to_wait.append(response)
+
+                done, pending = await asyncio.wait(
+                    tasks_to_wait,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                # Check if response task completed (stream failed or exceeded its max length)
+                if response and response in done:
+                    if response is not self.sonic.response:
+                        # The stream was rotated out; keep waiting on the current one
+                        if input_task in pending:
+                            input_task.cancel()
+                        else:
+                            self.input_queue.unget(input_task.result())
+                        continue
+
+                    error_msg = ""
+                    try:
+                        # Check if task completed with an error
+                        await response
+                    except Exception as e:
+                        error_msg = str(e)
+                        logger.info(f"Response task failed: {e}")
 
-async def speech2text(language):
-    global is_active, response, output_queue, input_queue, audio_queue, audio_chunks
-    
-    # Reset audio chunks for new translation session
-    audio_chunks = []
-    
-    # Ensure queues are created in the current event loop
-    # This prevents "bound to a different event loop" errors
-    # Recreate queues in the current event loop to ensure they're bound correctly
-    output_queue = asyncio.Queue()
-    input_queue = asyncio.Queue()
-    audio_queue = asyncio.Queue()
-    
-    # Start session
-    await start_session(language, "speech2text")
-    
-    # Start audio playback task
-    logger.info("Starting audio playback task...")
-    playback_task = asyncio.create_task(play_audio())
-    
-    # Start audio input stream (required for audio output)
-    await start_audio_input()
-    
-    # Start audio capture task
-    capture_task = asyncio.create_task(capture_audio())
-    
-    try:
-        while is_active:
-            # Monitor both input queue and response task
-            # Use asyncio.wait to monitor both simultaneously
-            tasks_to_wait = [asyncio.create_task(input_queue.get())]
-            if response:
-                tasks_to_wait.append(response)
-            
-            done, pending = await asyncio.wait(
-                tasks_to_wait,
-                return_when=asyncio.FIRST_COMPLETED
-            )
-            
-            # Check if response task completed (failed)
-            response_completed = False
-            if response and response in done:
-                response_completed = True
-                try:
-                    # Check if task completed with an error
-                    await response
-                except Exception as e:
-                    error_msg = str(e)
-                    logger.info(f"Response task failed: {e}")
-                    
                     # Cancel the input queue task if it's still pending
-                    for task in pending:
-                        task.cancel()
+                    if input_task in pending:
+                        input_task.cancel()
                         try:
-                            await task
+                            await input_task
                         except (asyncio.CancelledError, Exception):
                             pass
-                    
+                    else:
+                        # Keep input that arrived together with the failure
+                        self.input_queue.unget(input_task.result())
+
+                    if not self.is_active:
+                        break
+
                     # Check if it's an audio stream length exceeded error
-                    if "exceeded max length" in error_msg or "cumulative audio stream length" in error_msg:
+                    if not error_msg or "exceeded max length" in error_msg or "cumulative audio stream length" in error_msg:
                         logger.info("Detected audio stream length error. Restarting session...")
-                        try:
-                            await _restart_session(language, "speech2text")
-                            logger.info("Session restarted. Continuing...")
-                            continue  # Continue the loop to wait for next input
-                        except Exception as restart_error:
-                            logger.info(f"Failed to restart session: {restart_error}")
-                            break
+                        reason = "max_length"
                     else:
                         # For other errors, try to restart once
                         logger.info("Attempting to restart session due to error...")
-                        try:
-                            await _restart_session(language, "speech2text")
-                            logger.info("Session restarted. Continuing...")
-                            continue  # Continue the loop to wait for next input
-                        except Exception as restart_error:
-                            logger.info(f"Failed to restart session: {restart_error}")
-                            break
-            
-            # If response task completed without error, just continue
-            if response_completed:
-                continue
-            
-            # Get user input from completed task
-            user_input_task = None
-            for task in done:
-                if task != response:
-                    user_input_task = task
-                    break
-            
-            if user_input_task:
-                user_input = await user_input_task
-                
+                        reason = "error"
+                    try:
+                        await self._restart_session(language, translation_mode, reason)
+                        logger.info("Session restarted. Continuing...")
+                        continue  # Continue the loop to wait for next input
+                    except Exception as restart_error:
+                        logger.info(f"Failed to restart session: {restart_error}")
+                        break
+
+                user_input = await input_task
+
                 # Check for special stop signal
-                if user_input is None or user_input.strip().lower() == '__stop__':
+                if user_input is None or (isinstance(user_input, str) and user_input.strip().lower() == '__stop__'):
                     logger.info("Stopping text input...")
                     break
-                
+
                 # Process text input
-                await process_text_input(user_input)
-            else:
-                # If no input task, just continue (response task might have completed)
+                if isinstance(user_input, TranslationRequest):
+                    await self.process_text_input(user_input.text, user_input)
+                else:
+                    await self.process_text_input(user_input)
+
+        except Exception as e:
+            logger.info(f"Error reading text: {e}")
+
+    async def _run(self, language, translation_mode, audio_input):
+        """Run a translation session until it is stopped, feeding audio from audio_input()."""
+        # Reset audio chunks for new translation session
+        self.audio_chunks = []
+
+        # Ensure queues are created in the current event loop
+        # This prevents "bound to a different event loop" errors
+        # Recreate queues in the current event loop to ensure they're bound correctly
+        self.output_queue = BoundedQueue("output", **self.queue_config["output"])
+        self.transcript_queue = BoundedQueue("transcript", **self.queue_config["transcript"])
+        self.input_queue = BoundedQueue("input", **self.queue_config["input"])
+        self.audio_queue = BoundedQueue("audio", is_silent=is_silent, **self.queue_config["audio"])
+
+        # Start session
+        await self.start_session(language, translation_mode)
+
+        # Start audio playback task
+        logger.info("Starting audio playback task...")
+        playback_task = asyncio.create_task(self.play_audio())
+
+        # Start audio input stream (required for audio output)
+        await self.sonic.start_audio_input()
+
+        # Start audio input task to maintain audio stream
+        audio_input_task = asyncio.create_task(audio_input())
+        self.ready.set()
+
+        try:
+            await self._run_input_loop(language, translation_mode)
+        finally:
+            self.ready.clear()
+
+            # Stop audio input task
+            if not audio_input_task.done():
+                audio_input_task.cancel()
+                try:
+                    await audio_input_task
+                except asyncio.CancelledError:
+                    pass
+
+            # End audio input
+            if self.sonic.is_active:
+                await self.sonic.end_audio_input()
+            logger.info("Text input stopped.")
+
+            # First cancel the tasks
+            tasks = []
+            if not playback_task.done():
+                logger.info("Cancelling audio playback task...")
+                tasks.append(playback_task)
+            for task in tasks:
+                logger.info(f"Cancelling task: {task}")
+                task.cancel()
+            if tasks:
+                logger.info("Gathering tasks...")
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        # End session
+        self.is_active = False
+        await self.end_session()
+
+        logger.info(f"[{self.session_id}] Session ended (rotations: {self.rotations}, restarts: {self.restarts}), queues: {self.queue_stats()}")
+
+    def queue_stats(self):
+        """Size, high-water mark and drop counters of the session queues."""
+        queues = (("audio", self.audio_queue), ("output", self.output_queue), ("transcript", self.transcript_queue), ("input", self.input_queue))
+        return {name: q.stats() for name, q in queues if q is not None}
+
+    async def text2speech(self, language):
+        """Translate queued Korean text into speech in the target language."""
+        await self._run(language, "text2speech", self.send_silent_audio)
+
+    async def speech2text(self, language, audio_input=None):
+        """Translate speech in the target language into Korean text, from the microphone unless audio_input() feeds the audio."""
+        await self._run(language, "speech2text", audio_input or self.capture_audio)
+
+    async def interpret(self, language, audio_input=None):
+        """Translate Korean speech into the target language, from the microphone unless audio_input() feeds the audio."""
+        await self._run(language, "interpret", audio_input or self.capture_audio)
+
+    def get_audio_wav_bytes(self):
+        """Convert collected audio chunks to WAV format bytes for Streamlit playback."""
+        if not self.audio_chunks:
+            return None
+
+        # Combine all audio chunks
+        audio_data = b''.join(self.audio_chunks)
+
+        if len(audio_data) == 0:
+            return None
+
+        # Create WAV file in memory
+        wav_buffer = BytesIO()
+        with wave.open(wav_buffer, 'wb') as wav_file:
+            wav_file.setnchannels(CHANNELS)
+            wav_file.setsampwidth(2)  # 16-bit = 2 bytes
+            wav_file.setframerate(OUTPUT_SAMPLE_RATE)
+            wav_file.writeframes(audio_data)
+
+        wav_buffer.seek(0)
+        return wav_buffer.read()
+
+    def clear_audio_chunks(self):
+        """Clear collected audio chunks."""
+        self.audio_chunks = []
+
+# Translator sessions keyed by Streamlit session id
+sessions = dict()
+reaper_task = None  # reap_idle_sessions() on the loop of the sessions
+
+def get_session(session_id):
+    """Return the translator session for session_id, creating it on first use."""
+    if session_id not in sessions:
+        logger.info(f"Creating translator session: {session_id}")
+        sessions[session_id] = TranslatorSession(session_id)
+    session = sessions[session_id]
+    session.last_used_at = time.monotonic()
+    _ensure_reaper()
+    return session
+
+def _ensure_reaper():
+    global reaper_task
+    if reaper_task is not None and not reaper_task.done():
+        return
+    try:
+        reaper_task = asyncio.get_running_loop().create_task(reap_idle_sessions())
+    except RuntimeError:
+        pass  # no event loop yet; the first get_session() on the loop starts it
+
+async def reap_idle_sessions(idle_ttl=None):
+    """Stop and remove the sessions that have not been used for idle_ttl (SESSION_IDLE_TTL) seconds."""
+    idle_ttl = idle_ttl or SESSION_IDLE_TTL
+    while sessions:
+        await asyncio.sleep(idle_ttl / 4)
+        now = time.monotonic()
+        for session_id, session in list(sessions.items()):
+            if now - session.last_used_at <= idle_ttl or sessions.get(session_id) is not session:
                 continue
-            
-    except Exception as e:
-        logger.info(f"Error reading text: {e}")
-    finally:
-        # # Stop stdin task if it exists
-        # if stdin_task and not stdin_task.done():
-        #     stdin_task.cancel()
-        #     try:
-        #         await stdin_task
-        #     except asyncio.CancelledError:
-        #         pass
-        
-        # Stop silent audio task
-        if not capture_task.done():
-            capture_task.cancel()
+            logger.info(f"[{session_id}] Idle for {now - session.last_used_at:.0f}s, stopping the session")
+            remove_session(session_id)
             try:
-                await capture_task
-            except asyncio.CancelledError:
-                pass
-        
-        # End audio input
-        await end_audio_input()
-        logger.info("Text input stopped.")
-        
-        # First cancel the tasks
-        tasks = []
-        if not playback_task.done():
-            logger.info("Cancelling audio playback task...")
-            tasks.append(playback_task)
-        for task in tasks:
-            logger.info(f"Cancelling task: {task}")
-            task.cancel()
-        if tasks:
-            logger.info("Gathering tasks...")
-            await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # End session
-    await end_session()
-    is_active = False
+                await session.stop()
+            except Exception as e:
+                logger.info(f"[{session_id}] Error stopping idle session: {e}")
 
-    # cancel the response task
-    if response and not response.done():
-        response.cancel()
+def remove_session(session_id):
+    """Remove a session from the registry and return it (None if unknown)."""
+    return sessions.pop(session_id, None)
 
-    logger.info("Session ended")
+def _collect_sessions():
+    """Refresh the session gauges (called by the metrics registry, from any thread)."""
+    active = dict()
+    streams = 0
+    depth = dict()
+    high_water = dict()
+    for session in list(sessions.values()):
+        if not session.is_active:
+            continue
+        active[session.translation_mode] = active.get(session.translation_mode, 0) + 1
+        streams += 1 + (session.next_sonic is not None) + len(session.retiring)
+        for name, stats in session.queue_stats().items():
+            depth[name] = depth.get(name, 0) + stats["size"]
+            high_water[name] = max(high_water.get(name, 0), stats["high_water"])
+    ACTIVE_SESSIONS.replace([({"mode": mode}, count) for mode, count in active.items()])
+    ACTIVE_STREAMS.set(streams)
+    QUEUE_DEPTH.replace([({"queue": name}, value) for name, value in depth.items()])
+    QUEUE_HIGH_WATER.replace([({"queue": name}, value) for name, value in high_water.items()])
 
-def get_audio_wav_bytes():
-    """Convert collected audio chunks to WAV format bytes for Streamlit playback."""
-    global audio_chunks
-    
-    if not audio_chunks:
-        return None
-    
-    # Combine all audio chunks
-    audio_data = b''.join(audio_chunks)
-    
-    if len(audio_data) == 0:
-        return None
-    
-    # Create WAV file in memory
-    wav_buffer = BytesIO()
-    with wave.open(wav_buffer, 'wb') as wav_file:
-        wav_file.setnchannels(CHANNELS)
-        wav_file.setsampwidth(2)  # 16-bit = 2 bytes
-        wav_file.setframerate(OUTPUT_SAMPLE_RATE)
-        wav_file.writeframes(audio_data)
-    
-    wav_buffer.seek(0)
-    return wav_buffer.read()
+metrics.registry.add_collector(_collect_sessions)
+
+def get_audio_wav_bytes(session_id):
+    """Return the collected audio of a session as WAV bytes."""
+    session = sessions.get(session_id)
+    return session.get_audio_wav_bytes() if session else None
 
-def clear_audio_chunks():
-    """Clear collected audio chunks."""
-    global audio_chunks
-    audio_chunks = []
+def clear_audio_chunks(session_id):
+    """Clear collected audio chunks of a session."""
+    session = sessions.get(session_id)
+    if session:
+        session.clear_audio_chunks()
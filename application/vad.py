@@ -0,0 +1,110 @@
+import numpy as np
+
+from collections import deque
+
+class VoiceActivityDetector:
+    """
+    Energy / zero-crossing voice activity detector for 16-bit mono PCM.
+
+    Audio is classified in frames of frame_size samples, all frames of a buffer at once against
+    the noise floor reached by the previous buffers.
+    Frames are released with a delay of preroll frames so the frames just before a speech
+    onset can still be marked as voiced; frames within hangover frames after the last speech
+    frame stay voiced so trailing syllables are not clipped. The stream timeline is preserved:
+    every input frame is returned exactly once, flagged voiced or not.
+    """
+
+    def __init__(self, frame_size=1024, sample_rate=16000, threshold_db=-50.0, margin_db=10.0,
+                 zcr_max=0.35, hangover_ms=400, preroll_ms=192, noise_adapt=0.05):
+        self.frame_size = frame_size
+        self.threshold_db = threshold_db  # minimum speech level in dBFS
+        self.margin_db = margin_db  # speech must be this far above the noise floor
+        self.zcr_max = zcr_max  # low-level frames with more zero crossings are treated as noise
+        self.noise_adapt = noise_adapt
+        frame_ms = frame_size * 1000 / sample_rate
+        self.hangover = int(round(hangover_ms / frame_ms))
+        self.preroll = int(round(preroll_ms / frame_ms))
+
+        self.noise_floor_db = threshold_db - margin_db
+        self.pending = deque()  # (index, frame) waiting for the look-ahead decision
+        self.index = 0  # index of the next input frame
+        self.last_speech = None  # index of the last speech frame
+        self.remainder = b''
+
+        # Counters
+        self.frames_total = 0
+        self.frames_voiced = 0
+        self.frames_suppressed = 0
+
+    def classify(self, samples):
+        """Return a boolean speech flag for each frame of an int16 array of whole frames."""
+        frames = samples.reshape(-1, self.frame_size).astype(np.float32)
+        power = np.mean(frames * frames, axis=1) / (32768.0 * 32768.0)
+        level_db = 10.0 * np.log10(power + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_size
+
+        # All frames of a buffer are judged against the noise floor at its start
+        threshold = max(self.threshold_db, self.noise_floor_db + self.margin_db)
+        # Loud frames are speech regardless of ZCR; quieter ones must look voiced
+        flags = (level_db > threshold) & ((zcr < self.zcr_max) | (level_db > threshold + self.margin_db))
+
+        # The noise floor follows the levels of the other frames: an exponential average, applied in closed form
+        noise = level_db[~flags]
+        if len(noise):
+            keep = 1.0 - self.noise_adapt
+            weights = self.noise_adapt * keep ** np.arange(len(noise) - 1, -1, -1)
+            self.noise_floor_db = float(keep ** len(noise) * self.noise_floor_db + np.dot(weights, noise))
+        return flags
+
+    def process(self, audio_bytes):
+        """
+        Feed captured audio and return the frames whose decision is final as (frame, voiced) pairs.
+
+        Trailing bytes that do not fill a frame are kept for the next call.
+        """
+        data = self.remainder + bytes(audio_bytes) if self.remainder else audio_bytes
+        frame_bytes = self.frame_size * 2
+        whole = len(data) - len(data) % frame_bytes
+        self.remainder = bytes(data[whole:])
+        if not whole:
+            return []
+
+        view = memoryview(data)[:whole]
+        flags = self.classify(np.frombuffer(view, dtype='<i2'))
+
+        released = []
+        for i, speech in enumerate(flags):
+            if speech:
+                self.last_speech = self.index
+            self.pending.append((self.index, view[i * frame_bytes:(i + 1) * frame_bytes]))
+            self.index += 1
+
+            if len(self.pending) > self.preroll:
+                released.append(self._release())
+        return released
+
+    def flush(self):
+        """Release every pending frame, e.g. when capture stops."""
+        released = []
+        while self.pending:
+            released.append(self._release())
+        return released
+
+    def _release(self):
+        index, frame = self.pending.popleft()
+        voiced = self.last_speech is not None and self.last_speech >= index - self.hangover
+        self.frames_total += 1
+        if voiced:
+            self.frames_voiced += 1
+        else:
+            self.frames_suppressed += 1
+        return frame, voiced
+
+    def stats(self):
+        return {
+            "frames_total": self.frames_total,
+            "frames_voiced": self.frames_voiced,
+            "frames_suppressed": self.frames_suppressed,
+            "noise_floor_db": round(float(self.noise_floor_db), 1),
+        }
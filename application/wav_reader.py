@@ -0,0 +1,95 @@
+import mmap
+import os
+import struct
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavReader:
+    """
+    Memory-mapped reader of a PCM WAV file, or of a headerless .pcm/.raw file with the given format.
+
+    The file is mapped read-only and frames are returned as memoryview slices of the mapping, so
+    reading a recording costs no copies and no read() calls; the OS pages the audio in as it is sent.
+    Release the views before close() (or leaving the with block).
+    """
+
+    def __init__(self, path, sample_rate=16000, channels=1, sample_width=2):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.view = memoryview(self.mmap) if self.mmap else memoryview(b'')
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_offset = 0
+        self.data_size = size
+        try:
+            if self.view[:4] == b'RIFF':
+                self._parse_riff()
+        except Exception:
+            self.close()
+            raise
+
+        self.frame_size = self.channels * self.sample_width
+        self.frames = self.data_size // self.frame_size
+        self.duration = self.frames / self.sample_rate
+
+    def _parse_riff(self):
+        if self.view[8:12] != b'WAVE':
+            raise ValueError(f"{self.path}: not a WAVE file")
+        pos = 12
+        fmt = None
+        while pos + 8 <= len(self.view):
+            chunk_id = bytes(self.view[pos:pos + 4])
+            chunk_size, = struct.unpack_from('<I', self.view, pos + 4)
+            body = pos + 8
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', self.view, body)
+                if fmt[0] == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                    # The sub-format GUID starts with the format code
+                    fmt = (struct.unpack_from('<H', self.view, body + 24)[0],) + fmt[1:]
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{self.path}: data chunk before the fmt chunk")
+                self.data_offset = body
+                # Streamed WAVs may leave the size at 0 or 0xFFFFFFFF; the data then runs to the end of the file
+                available = len(self.view) - body
+                self.data_size = chunk_size if 0 < chunk_size <= available else available
+                break
+            pos = body + chunk_size + (chunk_size & 1)
+        else:
+            raise ValueError(f"{self.path}: no data chunk")
+
+        audio_format, self.channels, self.sample_rate, _, _, bits = fmt
+        if audio_format != WAVE_FORMAT_PCM or bits not in (8, 16, 24, 32):
+            raise ValueError(f"{self.path}: only integer PCM is supported (format {audio_format:#x}, {bits} bits)")
+        self.sample_width = bits // 8
+
+    def read(self, start_frame, frame_count):
+        """Return up to frame_count frames from start_frame as a memoryview of the file."""
+        start = self.data_offset + min(start_frame, self.frames) * self.frame_size
+        end = self.data_offset + min(start_frame + frame_count, self.frames) * self.frame_size
+        return self.view[start:end]
+
+    def chunks(self, frames_per_chunk, start_frame=0):
+        """Yield (start frame, memoryview) of consecutive chunks of frames_per_chunk frames; the last may be shorter."""
+        for frame in range(start_frame, self.frames, frames_per_chunk):
+            yield frame, self.read(frame, frames_per_chunk)
+
+    def close(self):
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
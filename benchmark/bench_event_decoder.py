@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Per-event CPU cost of decoding the output events of a bidirectional stream.
+
+legacy:   bytes -> str, json.loads of the whole event, 'x' in event checks, b64decode of the audio str,
+          json.loads of additionalModelFields on every contentStart
+decoder:  event_decoder.decode_event() (type from the raw bytes, audio sliced and decoded as bytes)
+          with orjson when it is installed
+stdlib:   event_decoder with the standard library json parser (only measured when orjson is installed)
+
+The events come from a recording (SONIC_EVENT_RECORDING=events.jsonl while running the app or the
+console client) or, without one, from a synthetic stream shaped like a translator turn.
+
+Usage: python benchmark/bench_event_decoder.py [--recording events.jsonl] [--turns 50] [--audio-bytes 3840] [--json result.json]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'application'))
+import event_decoder
+
+def synthetic_stream(turns, audio_bytes, audio_events=25):
+    """Events of a translator turn: ASR text, speculative text, audio chunks, final text and their ends."""
+    session_id, prompt_name = str(uuid.uuid4()), str(uuid.uuid4())
+    events = []
+
+    def add(event_type, body):
+        body.update(promptName=prompt_name, sessionId=session_id)
+        events.append(json.dumps({"event": {event_type: body}}, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    for _ in range(turns):
+        completion_id = str(uuid.uuid4())
+        add("completionStart", {"completionId": completion_id})
+        for role, stage, text in (
+            ("USER", "FINAL", "안녕하세요. 역이 어디에 있나요?"),
+            ("ASSISTANT", "SPECULATIVE", "こんにちは。駅はどこですか？"),
+        ):
+            content_id = str(uuid.uuid4())
+            add("contentStart", {
+                "additionalModelFields": json.dumps({"generationStage": stage}), "completionId": completion_id,
+                "contentId": content_id, "role": role, "textOutputConfiguration": {"mediaType": "text/plain"}, "type": "TEXT"
+            })
+            add("textOutput", {"completionId": completion_id, "content": text, "contentId": content_id, "role": role})
+            add("contentEnd", {"completionId": completion_id, "contentId": content_id, "stopReason": "PARTIAL_TURN", "type": "TEXT"})
+
+        content_id = str(uuid.uuid4())
+        add("contentStart", {
+            "completionId": completion_id, "contentId": content_id, "role": "ASSISTANT", "type": "AUDIO",
+            "audioOutputConfiguration": {"mediaType": "audio/lpcm", "sampleRateHertz": 24000, "sampleSizeBits": 16, "channelCount": 1}
+        })
+        for _ in range(audio_events):
+            add("audioOutput", {
+                "completionId": completion_id, "content": base64.b64encode(os.urandom(audio_bytes)).decode('ascii'),
+                "contentId": content_id, "role": "ASSISTANT"
+            })
+        add("contentEnd", {"completionId": completion_id, "contentId": content_id, "stopReason": "END_TURN", "type": "AUDIO"})
+        add("completionEnd", {"completionId": completion_id, "stopReason": "END_TURN"})
+    return events
+
+def load_recording(path):
+    with open(path, 'rb') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def legacy_decode(raw):
+    """The dispatch of _process_responses() before event_decoder."""
+    json_data = json.loads(raw.decode('utf-8'))
+    if 'event' in json_data:
+        if 'contentStart' in json_data['event']:
+            content_start = json_data['event']['contentStart']
+            if 'additionalModelFields' in content_start:
+                return json.loads(content_start['additionalModelFields']).get('generationStage')
+        elif 'textOutput' in json_data['event']:
+            return json_data['event']['textOutput']['content']
+        elif 'audioOutput' in json_data['event']:
+            return base64.b64decode(json_data['event']['audioOutput']['content'])
+        elif 'contentEnd' in json_data['event']:
+            return json_data['event']['contentEnd'].get('stopReason')
+        elif 'completionEnd' in json_data['event']:
+            return json_data['event']['completionEnd'].get('stopReason')
+    return None
+
+def decoder_decode(raw):
+    event_type, event = event_decoder.decode_event(raw)
+    if event_type == 'audioOutput':
+        return event['content']
+    elif event_type == 'contentStart':
+        if 'additionalModelFields' in event:
+            return event_decoder.generation_stage(event)
+    elif event_type == 'textOutput':
+        return event['content']
+    elif event_type in ('contentEnd', 'completionEnd'):
+        return event.get('stopReason')
+    return None
+
+def stdlib_decode(raw):
+    loads, event_decoder.loads = event_decoder.loads, json.loads
+    try:
+        return decoder_decode(raw)
+    finally:
+        event_decoder.loads = loads
+
+def measure(decoders, events, repeat=7):
+    """Return the best CPU time per event in microseconds of each decoder, interleaving the runs."""
+    best = dict()
+    for _ in range(repeat):
+        for name, decode in decoders:
+            start = time.process_time()
+            for raw in events:
+                decode(raw)
+            elapsed = (time.process_time() - start) / len(events) * 1e6
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='output event decoding benchmark')
+    parser.add_argument('--recording', help='recorded events, one raw event per line (SONIC_EVENT_RECORDING)')
+    parser.add_argument('--turns', type=int, default=50, help='turns of the synthetic stream')
+    parser.add_argument('--audio-bytes', type=int, default=3840, help='PCM bytes per synthetic audioOutput event')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    events = load_recording(args.recording) if args.recording else synthetic_stream(args.turns, args.audio_bytes)
+    total_bytes = sum(len(raw) for raw in events)
+    print(f"{len(events)} events, {total_bytes} bytes, json backend: {'orjson' if event_decoder.orjson else 'json'}")
+
+    # Every decoder must return the same values
+    for raw in events:
+        assert legacy_decode(raw) == decoder_decode(raw) == stdlib_decode(raw), raw[:200]
+
+    decoders = [("legacy", legacy_decode), ("decoder", decoder_decode)]
+    if event_decoder.orjson:
+        # Separate the fast path from the JSON backend
+        decoders.append(("stdlib", stdlib_decode))
+    best = measure(decoders, events)
+
+    results = {}
+    for name, _ in decoders:
+        results[name] = {"us_per_event": round(best[name], 3), "mb_per_s": round(total_bytes / len(events) / best[name], 1)}
+        print(f"{name:8s} {best[name]:8.3f} us/event  {results[name]['mb_per_s']:8.1f} MB/s")
+
+    speedup = results["legacy"]["us_per_event"] / results["decoder"]["us_per_event"]
+    print(f"speedup  {speedup:.2f}x")
+
+    if args.json:
+        results["events"] = len(events)
+        results["bytes"] = total_bytes
+        results["json_backend"] = "orjson" if event_decoder.orjson else "json"
+        results["speedup"] = round(speedup, 3)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Per-chunk CPU cost of building an audioInput event.
+
+legacy:  f-string JSON with whitespace, base64 bytes -> str, then str -> UTF-8 in send_event()
+encoder: event_encoder.audio_input() with precompiled byte prefix/suffix
+
+Usage: python benchmark/bench_event_encoder.py [--chunks 20000] [--chunk-size 1024] [--json result.json]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'application'))
+import event_encoder
+
+def legacy_audio_event(prompt_name, content_name, audio_bytes):
+    """The event path of send_audio_chunk()/send_event() before event_encoder."""
+    blob = base64.b64encode(audio_bytes)
+    audio_event = f'''
+    {{
+        "event": {{
+            "audioInput": {{
+                "promptName": "{prompt_name}",
+                "contentName": "{content_name}",
+                "content": "{blob.decode('utf-8')}"
+            }}
+        }}
+    }}
+    '''
+    if isinstance(audio_event, bytes):
+        audio_event = audio_event.decode('utf-8', errors='replace')
+    return audio_event.encode('utf-8')
+
+def encoder_audio_event(prompt_name, content_name, audio_bytes):
+    return event_encoder.audio_input(prompt_name, content_name, audio_bytes)
+
+def measure(builds, chunks, audio_bytes, repeat=7):
+    """Return the best CPU time per chunk in microseconds of each build, interleaving the runs."""
+    prompt_name = str(uuid.uuid4())
+    content_name = str(uuid.uuid4())
+    best = dict()
+    for _ in range(repeat):
+        for name, build in builds:
+            start = time.process_time()
+            for _ in range(chunks):
+                build(prompt_name, content_name, audio_bytes)
+            elapsed = (time.process_time() - start) / chunks * 1e6
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='audioInput event encoding benchmark')
+    parser.add_argument('--chunks', type=int, default=20000, help='chunks encoded per run')
+    parser.add_argument('--chunk-size', type=int, default=1024, help='16-bit samples per chunk')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    audio_bytes = os.urandom(args.chunk_size * 2)
+
+    # Both paths must produce the same event
+    prompt_name, content_name = str(uuid.uuid4()), str(uuid.uuid4())
+    assert json.loads(legacy_audio_event(prompt_name, content_name, audio_bytes)) == \
+        json.loads(encoder_audio_event(prompt_name, content_name, audio_bytes))
+
+    builds = (("legacy", legacy_audio_event), ("encoder", encoder_audio_event))
+    best = measure(builds, args.chunks, audio_bytes)
+
+    results = {}
+    for name, build in builds:
+        event_size = len(build(prompt_name, content_name, audio_bytes))
+        results[name] = {"us_per_chunk": round(best[name], 3), "event_bytes": event_size}
+        print(f"{name:8s} {best[name]:8.3f} us/chunk  {event_size} bytes/event")
+
+    speedup = results["legacy"]["us_per_chunk"] / results["encoder"]["us_per_chunk"]
+    print(f"speedup  {speedup:.2f}x")
+
+    if args.json:
+        results["chunk_size"] = args.chunk_size
+        results["speedup"] = round(speedup, 3)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Throughput of the input conditioning stage (down-mix + polyphase resampling to 16 kHz mono).
+
+Each input format is conditioned in chunks of 64 ms (the capture chunk) and of 1 s (file input).
+Reported are input frames per second of CPU time on one core, the resulting multiple of real time,
+the SNR of a 1 kHz tone after conversion and, for rates above 20 kHz, the level of a 10 kHz tone
+that cannot be represented at 16 kHz and must be filtered out instead of folding back to 6 kHz.
+audioop.ratecv (standard library up to Python 3.12, no anti-aliasing filter) is measured as a
+reference when it is available.
+
+Usage: python benchmark/bench_resampler.py [--seconds 10] [--json result.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'application'))
+from resampler import AudioConditioner
+
+try:
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+OUT_RATE = 16000
+FORMATS = [(48000, 2), (48000, 1), (44100, 2), (44100, 1), (22050, 1), (8000, 1)]
+CHUNK_SECONDS = (0.064, 1.0)
+TONE_HZ = 1000
+ALIAS_HZ = 10000
+
+def tone(rate, channels, seconds, hz=TONE_HZ):
+    t = np.arange(int(rate * seconds)) / rate
+    samples = (8000 * np.sin(2 * np.pi * hz * t)).astype('<i2')
+    return np.repeat(samples, channels).tobytes()
+
+def snr(pcm, latency):
+    """SNR in dB of the converted tone against an ideal one, ignoring the filter edges."""
+    y = np.frombuffer(pcm, dtype='<i2').astype(np.float64)
+    ideal = 8000 * np.sin(2 * np.pi * TONE_HZ * (np.arange(len(y)) - latency) / OUT_RATE)
+    s = slice(OUT_RATE // 10, len(y) - OUT_RATE // 10)
+    return 10 * np.log10(np.mean(ideal[s] ** 2) / np.mean((y[s] - ideal[s]) ** 2))
+
+def alias_level(process, rate, channels):
+    """Level in dB of a 10 kHz tone after conversion, relative to the tone itself."""
+    y = np.frombuffer(process(tone(rate, channels, 1.0, ALIAS_HZ)), dtype='<i2').astype(np.float64)[OUT_RATE // 10:]
+    return 20 * np.log10(max(np.sqrt(np.mean(y ** 2)), 1e-3) / (8000 / np.sqrt(2)))
+
+def measure(process, data, chunk_bytes, repeat=3):
+    """Best CPU time to process data in chunks of chunk_bytes; returns (seconds, output)."""
+    best = None
+    for _ in range(repeat):
+        out = []
+        start = time.process_time()
+        for i in range(0, len(data), chunk_bytes):
+            out.append(process(data[i:i + chunk_bytes]))
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, b''.join(out)
+
+def audioop_process(rate, channels):
+    state = None
+
+    def process(chunk):
+        nonlocal state
+        if channels == 2:
+            chunk = audioop.tomono(chunk, 2, 0.5, 0.5)
+        out, state = audioop.ratecv(chunk, 2, 1, rate, OUT_RATE, state)
+        return out
+    return process
+
+def main():
+    parser = argparse.ArgumentParser(description='input resampling benchmark')
+    parser.add_argument('--seconds', type=float, default=10.0, help='seconds of audio per format')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    print("format          chunk  impl          frames/s/core   x real time   SNR dB  alias dB")
+    for rate, channels in FORMATS:
+        data = memoryview(tone(rate, channels, args.seconds))
+        frames = len(data) // (2 * channels)
+        for chunk_seconds in CHUNK_SECONDS:
+            chunk_bytes = int(rate * chunk_seconds) * 2 * channels
+            impls = [("conditioner", None)]
+            if audioop:
+                impls.append(("audioop", audioop_process(rate, channels)))
+            for name, process in impls:
+                if process is None:
+                    conditioner = AudioConditioner(rate, channels, out_rate=OUT_RATE)
+                    elapsed, out = measure(conditioner.process, data, chunk_bytes)
+                    latency = conditioner.resampler.latency() if conditioner.resampler else 0
+                else:
+                    elapsed, out = measure(process, data, chunk_bytes, repeat=1)
+                    latency = 0
+                result = {
+                    "rate": rate, "channels": channels, "chunk_ms": round(chunk_seconds * 1000), "impl": name,
+                    "frames_per_s": round(frames / elapsed), "realtime": round(frames / rate / elapsed, 1),
+                    "snr_db": round(snr(out, latency), 1),
+                    "alias_db": None,
+                }
+                if rate > 2 * ALIAS_HZ:
+                    alias = AudioConditioner(rate, channels, out_rate=OUT_RATE).process if process is None else audioop_process(rate, channels)
+                    result["alias_db"] = round(alias_level(alias, rate, channels), 1)
+                results.append(result)
+                label = f"{rate / 1000:g}k {'stereo' if channels == 2 else 'mono'}"
+                print(f"{label:14s} {result['chunk_ms']:5d}ms {name:12s} {result['frames_per_s']:14,d} "
+                      f"{result['realtime']:12.1f} {result['snr_db']:8.1f} {result['alias_db'] if result['alias_db'] is not None else '-':>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seconds": args.seconds, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
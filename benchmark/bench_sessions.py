@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Capacity of one process: N concurrent translator sessions driven at real-time pace.
+
+Every level of --sessions runs that many TranslatorSessions on one event loop for --duration seconds:
+
+text2speech:  each session sends a phrase, waits for the answer, "plays" the translated audio
+              (sleeps for its duration) and thinks for --think seconds before the next phrase
+speech2text:  each session streams a 16 kHz mono 16-bit WAV (--wav) or synthetic speech bursts
+              in 64 ms chunks on the real-time clock, looping the input
+
+Reported per level: completed turns and translated audio per second, TTFA percentiles (text sent
+to first audio byte for text2speech, end of the user's speech to first text for speech2text),
+event-loop lag, RSS and the CPU used in cores. Streams go to the local Nova Sonic stand-in
+(sonic_mock, configurable with --mock-config) unless --live is given; with the mock its own work
+runs in the same process and is included in the CPU and lag figures.
+
+Usage: python benchmark/bench_sessions.py [--mode text2speech] [--sessions 1,4,16,64] [--duration 30]
+                                          [--wav speech.wav] [--json result.json] [--baseline previous.json]
+"""
+import argparse
+import array
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import wave
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'application'))
+
+PHRASES = [
+    "안녕하세요. 만나서 반갑습니다.",
+    "역까지 가는 가장 빠른 길을 알려주세요.",
+    "이 메뉴에서 맵지 않은 음식은 무엇인가요?",
+    "회의는 오후 세 시에 삼층 회의실에서 시작합니다.",
+    "영수증을 따로 받을 수 있을까요?",
+    "내일 아침 일곱 시에 택시를 예약하고 싶습니다.",
+]
+LANGUAGE = "Japanese"
+LAG_INTERVAL = 0.05  # seconds between event loop lag probes
+SPEECH_SECONDS = 2.5  # synthetic speech: voiced burst, then silence
+PAUSE_SECONDS = 1.5
+
+def percentile(values, q):
+    """Nearest-rank percentile of values (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))], 4)
+
+def summary(values):
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else None,
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": round(max(values), 4) if values else None,
+    }
+
+def synthetic_speech(sample_rate):
+    """Voiced bursts (a modulated 180 Hz tone) separated by silence, as 16-bit PCM."""
+    voiced = int(SPEECH_SECONDS * sample_rate)
+    samples = array.array('h', (
+        int(6000 * math.sin(2 * math.pi * 180 * i / sample_rate) * (0.6 + 0.4 * math.sin(2 * math.pi * 3 * i / sample_rate)))
+        for i in range(voiced)
+    ))
+    return samples.tobytes() + bytes(int(PAUSE_SECONDS * sample_rate) * 2)
+
+def load_wav(path, sample_rate):
+    with wave.open(path, 'rb') as f:
+        if f.getframerate() != sample_rate or f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise SystemExit(f"{path}: expected {sample_rate} Hz mono 16-bit PCM")
+        return f.readframes(f.getnframes())
+
+def rss_bytes():
+    """Current and peak resident memory of the process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak if sys.platform == "darwin" else peak * 1024
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"), peak
+    except (OSError, ValueError, IndexError):
+        return peak, peak
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+class Level:
+    """Measurements of one concurrency level."""
+
+    def __init__(self):
+        self.turns = 0
+        self.timeouts = 0
+        self.ttfa = []
+        self.audio_seconds = 0.0
+        self.lags = []
+
+async def probe_lag(level, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        level.lags.append(max(0.0, loop.time() - expected))
+
+async def text2speech_user(translator, session, index, level, deadline, args):
+    """Send phrases one after another, listening to each answer at real time before the next."""
+    n = index
+    while time.monotonic() < deadline:
+        phrase = PHRASES[n % len(PHRASES)]
+        n += 1
+        first_audio = []
+        sent_at = time.monotonic()
+        request = await session.send_text_input(phrase)
+        try:
+            text, audio = await request.result(timeout=args.timeout, on_audio=lambda _: first_audio or first_audio.append(time.monotonic()))
+        except translator.TurnIncompleteError:
+            first_audio = []
+        session.clear_audio_chunks()
+        if not first_audio:
+            level.timeouts += 1
+            continue
+        level.turns += 1
+        level.ttfa.append(first_audio[0] - sent_at)
+        audio_seconds = len(audio) / (2 * translator.OUTPUT_SAMPLE_RATE)
+        level.audio_seconds += audio_seconds
+        await asyncio.sleep(audio_seconds + args.think)
+
+def speech_feeder(translator, pacing, session, speech, state):
+    """audio_input() of speech2text that loops speech on the real-time clock."""
+    chunk_bytes = translator.CHUNK_SIZE * 2
+
+    async def feed():
+        offset = 0
+        async for _ in pacing.paced(translator.CHUNK_SIZE / translator.INPUT_SAMPLE_RATE):
+            if not session.is_active:
+                break
+            chunk = speech[offset:offset + chunk_bytes]
+            offset = offset + chunk_bytes if offset + chunk_bytes < len(speech) else 0
+            if not translator.is_silent(chunk):
+                state["last_voiced_at"] = time.monotonic()
+            await session.send_captured_audio(chunk)
+    return feed
+
+async def speech2text_listener(translator, session, level, state, deadline):
+    """Read the translated text of the session, timing each turn from the end of the speech."""
+    latency = None
+    while time.monotonic() < deadline:
+        try:
+            text = await asyncio.wait_for(session.output_queue.get(), timeout=0.5)
+        except asyncio.TimeoutError:
+            continue
+        if text == translator.END_OF_TURN:
+            if latency is not None:
+                level.turns += 1
+                level.ttfa.append(latency)
+            latency = None
+        elif latency is None and state["last_voiced_at"] is not None:
+            # The speech of the next turn may already have started by the end of this one
+            latency = max(0.0, time.monotonic() - state["last_voiced_at"])
+
+async def run_level(translator, pacing, sessions, args, speech):
+    level = Level()
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(probe_lag(level, stop))
+
+    started = []
+    states = []
+    for i in range(sessions):
+        session = translator.get_session(f"bench-{sessions}-{i}")
+        session.use_streamlit_audio = True
+        if args.mode == "speech2text":
+            state = {"last_voiced_at": None}
+            # Each session starts at a different point of the input
+            offset = random.randrange(0, len(speech) // 2) & ~1
+            feeder = speech_feeder(translator, pacing, session, speech[offset:] + speech[:offset], state)
+            session.task = asyncio.create_task(session.speech2text(LANGUAGE, feeder))
+            states.append(state)
+        else:
+            session.task = asyncio.create_task(session.text2speech(LANGUAGE))
+        started.append(session)
+    await asyncio.gather(*(asyncio.wait_for(s.ready.wait(), timeout=args.timeout) for s in started))
+
+    cpu_start, wall_start = time.process_time(), time.monotonic()
+    deadline = wall_start + args.duration
+    if args.mode == "speech2text":
+        users = [speech2text_listener(translator, s, level, state, deadline) for s, state in zip(started, states)]
+    else:
+        users = [text2speech_user(translator, s, i, level, deadline, args) for i, s in enumerate(started)]
+    await asyncio.gather(*users)
+    wall = time.monotonic() - wall_start
+    cpu = time.process_time() - cpu_start
+    rss, peak_rss = rss_bytes()
+
+    stop.set()
+    await lag_task
+    await asyncio.gather(*(s.stop() for s in started))
+    for s in started:
+        translator.remove_session(s.session_id)
+
+    return {
+        "sessions": sessions,
+        "seconds": round(wall, 2),
+        "turns": level.turns,
+        "timeouts": level.timeouts,
+        "turns_per_s": round(level.turns / wall, 3),
+        "audio_s_per_s": round(level.audio_seconds / wall, 3),
+        "ttfa": summary(level.ttfa),
+        "loop_lag": summary(level.lags),
+        "cpu_cores": round(cpu / wall, 3),
+        "rss_bytes": rss,
+        "peak_rss_bytes": peak_rss,
+    }
+
+def print_level(result, baseline=None):
+    ttfa, lag = result["ttfa"], result["loop_lag"]
+    fmt = lambda v: f"{v * 1000:7.0f}" if v is not None else "      -"
+    line = (f"{result['sessions']:5d} {result['turns']:6d} {result['turns_per_s']:8.2f} {fmt(ttfa['p50'])} {fmt(ttfa['p95'])} "
+            f"{fmt(ttfa['p99'])} {fmt(lag['p99'])} {fmt(lag['max'])} {result['cpu_cores']:6.2f} {result['rss_bytes'] / 2**20:8.1f}")
+    if baseline and ttfa["p95"] and baseline["ttfa"]["p95"]:
+        line += f"  p95 {ttfa['p95'] / baseline['ttfa']['p95']:.2f}x"
+        if baseline["turns_per_s"]:
+            line += f", turns {result['turns_per_s'] / baseline['turns_per_s']:.2f}x"
+    print(line, flush=True)
+
+async def run(args):
+    import translator
+    import pacing
+
+    speech = None
+    if args.mode == "speech2text":
+        speech = load_wav(args.wav, translator.INPUT_SAMPLE_RATE) if args.wav else synthetic_speech(translator.INPUT_SAMPLE_RATE)
+
+    baseline = dict()
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {level["sessions"]: level for level in json.load(f)["levels"]}
+
+    print(f"{args.mode}, {args.duration:.0f}s per level, {'Bedrock' if args.live else 'sonic_mock'}")
+    print("sessions turns  turns/s  ttfa p50   p95     p99  lag p99   max   cores  rss MiB  (ms)")
+    levels = []
+    for sessions in args.sessions:
+        result = await run_level(translator, pacing, sessions, args, speech)
+        print_level(result, baseline.get(sessions))
+        levels.append(result)
+    return levels
+
+def main():
+    parser = argparse.ArgumentParser(description='concurrent translator session benchmark')
+    parser.add_argument('--mode', choices=('text2speech', 'speech2text'), default='text2speech')
+    parser.add_argument('--sessions', default='1,4,16,64', help='comma separated numbers of concurrent sessions')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds measured per level')
+    parser.add_argument('--think', type=float, default=1.0, help='seconds between an answer and the next phrase (text2speech)')
+    parser.add_argument('--wav', help='16 kHz mono 16-bit WAV streamed by every session (speech2text)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='seconds to wait for a session or an answer')
+    parser.add_argument('--live', action='store_true', help='use Bedrock instead of the local mock')
+    parser.add_argument('--mock-config', help='JSON object overriding sonic_mock.MOCK_CONFIG')
+    parser.add_argument('--verbose', action='store_true', help='keep the INFO logs of the translator')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='results of a previous run (--json) to compare with')
+    args = parser.parse_args()
+    args.sessions = [int(n) for n in args.sessions.split(',') if n.strip()]
+
+    # SONIC_MOCK is read when sonic_mock is imported
+    if not args.live:
+        os.environ["SONIC_MOCK"] = args.mock_config or os.environ.get("SONIC_MOCK") or "1"
+    else:
+        os.environ.pop("SONIC_MOCK", None)
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    levels = asyncio.run(run(args))
+
+    if args.json:
+        import sonic_mock
+        results = {
+            "mode": args.mode,
+            "commit": git_commit(),
+            "backend": "bedrock" if args.live else "mock",
+            "mock_config": None if args.live else sonic_mock.config_from_env(),
+            "duration": args.duration,
+            "think": args.think,
+            "input": args.wav or ("synthetic" if args.mode == "speech2text" else "phrases"),
+            "levels": levels,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
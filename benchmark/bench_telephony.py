@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+CPU cost of the telephony media path per call, and the calls one core can carry.
+
+Every call gets one 20 ms G.711 frame from the line per tick (decoded and upsampled to 16 kHz in
+batches of telephony.INGRESS_FRAMES) and 20 ms of 24 kHz translated speech to send back (downsampled
+to 8 kHz, encoded and cut into frames), i.e. both directions busy all the time, the worst case.
+The ticks are processed back to back to measure CPU time, not paced. audioop (standard library up
+to Python 3.12; no anti-aliasing filter) is measured as a reference when it is available.
+
+Usage: python benchmark/bench_telephony.py [--calls 100] [--seconds 10] [--codec mulaw] [--json result.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'application'))
+import g711
+import telephony
+
+try:
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:
+    audioop = None
+
+OUTPUT_SAMPLE_RATE = 24000
+
+def speech(rate, seconds):
+    """Tone bursts with noise, as 16-bit PCM."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(rate * seconds)) / rate
+    voiced = (np.sin(2 * np.pi * 0.5 * t) > 0) * np.sin(2 * np.pi * 220 * t) * 6000
+    return (voiced + rng.normal(0, 200, len(t))).astype('<i2').tobytes()
+
+def adapter_call(codec):
+    ingress = telephony.TelephonyIngress(codec)
+    egress = telephony.TelephonyEgress(codec, in_rate=OUTPUT_SAMPLE_RATE)
+
+    def tick(frame, pcm):
+        return ingress.feed(frame), egress.feed(pcm)
+    return tick
+
+def audioop_call(codec):
+    decode = audioop.ulaw2lin if codec == "mulaw" else audioop.alaw2lin
+    encode = audioop.lin2ulaw if codec == "mulaw" else audioop.lin2alaw
+    state = {"in": None, "out": None, "pending": b''}
+
+    def tick(frame, pcm):
+        up, state["in"] = audioop.ratecv(decode(frame, 2), 2, 1, 8000, 16000, state["in"])
+        down, state["out"] = audioop.ratecv(pcm, 2, 1, OUTPUT_SAMPLE_RATE, 8000, state["out"])
+        state["pending"] += encode(down, 2)
+        frames = []
+        while len(state["pending"]) >= telephony.FRAME_BYTES:
+            frames.append(state["pending"][:telephony.FRAME_BYTES])
+            state["pending"] = state["pending"][telephony.FRAME_BYTES:]
+        return up, frames
+    return tick
+
+def run(make_call, codec, calls, seconds):
+    """CPU seconds to carry calls calls for seconds of audio."""
+    line = g711.pcm16_to_mulaw(speech(8000, seconds)) if codec == "mulaw" else g711.pcm16_to_alaw(speech(8000, seconds))
+    output = speech(OUTPUT_SAMPLE_RATE, seconds)
+    frame_bytes = telephony.FRAME_BYTES
+    pcm_bytes = OUTPUT_SAMPLE_RATE * telephony.FRAME_MS // 1000 * 2
+    ticks = len(line) // frame_bytes
+    # Calls start at different offsets so their buffers fill up at different ticks
+    call_ticks = [make_call(codec) for _ in range(calls)]
+    offsets = [i % ticks for i in range(calls)]
+
+    start = time.process_time()
+    for n in range(ticks):
+        for tick, offset in zip(call_ticks, offsets):
+            k = (n + offset) % ticks
+            tick(line[k * frame_bytes:(k + 1) * frame_bytes], output[k * pcm_bytes:(k + 1) * pcm_bytes])
+    return time.process_time() - start, ticks * telephony.FRAME_MS / 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='telephony media path benchmark')
+    parser.add_argument('--calls', type=int, default=100, help='concurrent calls simulated')
+    parser.add_argument('--seconds', type=float, default=10.0, help='seconds of audio per call')
+    parser.add_argument('--codec', choices=tuple(telephony.CODECS), default='mulaw')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    impls = [("adapter", adapter_call)]
+    if audioop:
+        impls.append(("audioop", audioop_call))
+
+    results = {}
+    print(f"{args.calls} calls, {args.seconds:.0f}s, {args.codec}, both directions")
+    print("impl        us per call per 20 ms   calls per core")
+    for name, make_call in impls:
+        cpu, audio_seconds = run(make_call, args.codec, args.calls, args.seconds)
+        per_tick = cpu / (args.calls * audio_seconds / (telephony.FRAME_MS / 1000)) * 1e6
+        calls_per_core = args.calls * audio_seconds / cpu
+        results[name] = {"us_per_call_tick": round(per_tick, 2), "calls_per_core": round(calls_per_core)}
+        print(f"{name:10s} {per_tick:22.1f} {calls_per_core:16.0f}")
+
+    if args.json:
+        results.update(calls=args.calls, seconds=args.seconds, codec=args.codec)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
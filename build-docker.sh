@@ -42,7 +42,7 @@ if [ $? -eq 0 ]; then
     echo "✅ Docker image built successfully with embedded credentials"
     echo ""
     echo "🚀 To run the container:"
-    echo "   sudo docker run -d --name ${DOCKER_NAME}-container -p 8501:8501 ${DOCKER_NAME}:latest"
+    echo "   sudo docker run -d --name ${DOCKER_NAME}-container -p 8501:8501 -p 8502:8502 -p 8503:8503 ${DOCKER_NAME}:latest"
     echo ""
     echo "⚠️  Note: AWS credentials are embedded in the Docker image"
     echo "   - Do not share this image publicly"
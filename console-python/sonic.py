@@ -11,6 +11,7 @@ import hashlib
 import datetime
 import time
 import inspect
+import sys
 from pathlib import Path
 from configparser import ConfigParser
 from rx.subject import Subject
@@ -21,6 +22,16 @@ from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInp
 from aws_sdk_bedrock_runtime.config import Config
 from smithy_aws_core.identity.environment import EnvironmentCredentialsResolver
 
+# Share the stream event encoder/decoder and pacing with the Streamlit application
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'application'))
+import event_encoder
+import event_decoder
+import pacing
+from playback import PlaybackEngine
+from bounded_queue import BoundedQueue
+from translator import is_silent
+import sonic_mock
+
 # Suppress warnings
 warnings.filterwarnings("ignore")
 # Audio configuration
@@ -29,6 +40,7 @@ OUTPUT_SAMPLE_RATE = 24000
 CHANNELS = 1
 FORMAT = pyaudio.paInt16
 CHUNK_SIZE = 1024  # Number of frames per buffer
+AUDIO_OUTPUT_QUEUE_SIZE = 400  # output chunks waiting for playback; beyond this silent chunks are dropped, then the oldest
 
 def load_aws_credentials_from_config(profile='default'):
     """
@@ -111,6 +123,48 @@ async def time_it_async(label, methodToRun):
     debug_print(f"Execution time for {label}: {end_time - start_time:.4f} seconds")
     return result
 
+async def play_responses(handler, is_running):
+    """Play the audio responses of handler.stream_manager on handler.output_stream while is_running() is true."""
+    # The playback thread owns the output stream; this task only feeds its jitter buffer
+    handler.player = PlaybackEngine(handler.output_stream, sample_rate=OUTPUT_SAMPLE_RATE, chunk_size=CHUNK_SIZE)
+    handler.player.start()
+    try:
+        while is_running():
+            try:
+                # Check for barge-in flag
+                if handler.stream_manager.barge_in:
+                    # Clear the audio queue and the audio already buffered for playback
+                    while not handler.stream_manager.audio_output_queue.empty():
+                        try:
+                            handler.stream_manager.audio_output_queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            break
+                    handler.player.flush()
+                    handler.stream_manager.barge_in = False
+                    continue
+
+                # Get audio data from the stream manager's queue
+                audio_data = await asyncio.wait_for(
+                    handler.stream_manager.audio_output_queue.get(),
+                    timeout=0.1
+                )
+
+                if audio_data and is_running():
+                    handler.player.feed(audio_data)
+
+            except asyncio.TimeoutError:
+                # No data available within timeout, just continue
+                continue
+            except Exception as e:
+                if is_running():
+                    print(f"Error playing output audio: {str(e)}")
+                    import traceback
+                    traceback.print_exc()
+                await asyncio.sleep(0.05)
+    finally:
+        # Stop writing before the output stream is closed
+        await asyncio.get_event_loop().run_in_executor(None, handler.player.stop)
+        debug_print(f"Playback stats: {handler.player.stats()}")
 
 class ToolProcessor:
     def __init__(self):
@@ -375,16 +429,6 @@ class BedrockStreamManager:
         }
     }'''
 
-    AUDIO_EVENT_TEMPLATE = '''{
-        "event": {
-            "audioInput": {
-            "promptName": "%s",
-            "contentName": "%s",
-            "content": "%s"
-            }
-        }
-    }'''
-
     TEXT_CONTENT_START_EVENT = '''{
         "event": {
             "contentStart": {
@@ -474,6 +518,7 @@ class BedrockStreamManager:
         self.input_subject = Subject()
         self.output_subject = Subject()
         self.audio_subject = Subject()
+        self.audio_output_subject = Subject()  # decoded PCM of each audioOutput event
 
         self.response_task = None
         self.stream_response = None
@@ -483,7 +528,7 @@ class BedrockStreamManager:
         self.scheduler = None
 
         # Audio playback components
-        self.audio_output_queue = asyncio.Queue()
+        self.audio_output_queue = BoundedQueue("audio_output", maxsize=AUDIO_OUTPUT_QUEUE_SIZE, policy="drop_silence", is_silent=is_silent)
 
         # Text response components
         self.display_assistant_text = False
@@ -505,7 +550,10 @@ class BedrockStreamManager:
         self.completion_event = asyncio.Event()
 
     def _initialize_client(self):
-        """Initialize the Bedrock client."""
+        """Initialize the Bedrock client (the local stand-in of sonic_mock when SONIC_MOCK is set)."""
+        if sonic_mock.SONIC_MOCK:
+            self.bedrock_client = sonic_mock.MockBedrockClient(**sonic_mock.config_from_env())
+            return
         config = Config(
             endpoint_uri= f"https://bedrock-runtime.{self.region}.amazonaws.com",
             region=self.region,
@@ -584,23 +632,20 @@ class BedrockStreamManager:
             debug_print("Stream not initialized or closed")
             return
         
-        # Ensure event_json is a string
         if isinstance(event_json, bytes):
-            # If it's already bytes, decode it first
+            # Already UTF-8 encoded (event_encoder output)
+            event_bytes = event_json
+        else:
+            # Ensure event_json is a string
+            if not isinstance(event_json, str):
+                event_json = str(event_json)
+            
+            # Encode to UTF-8 bytes
             try:
-                event_json = event_json.decode('utf-8')
-            except UnicodeDecodeError:
-                # Try with error handling
-                event_json = event_json.decode('utf-8', errors='replace')
-        elif not isinstance(event_json, str):
-            event_json = str(event_json)
-        
-        # Encode to UTF-8 bytes
-        try:
-            event_bytes = event_json.encode('utf-8')
-        except (UnicodeEncodeError, AttributeError) as e:
-            debug_print(f"Error encoding event_json: {e}")
-            return
+                event_bytes = event_json.encode('utf-8')
+            except (UnicodeEncodeError, AttributeError) as e:
+                debug_print(f"Error encoding event_json: {e}")
+                return
         
         event = InvokeModelWithBidirectionalStreamInputChunk(
             value=BidirectionalInputPayloadPart(bytes_=event_bytes)
@@ -610,11 +655,11 @@ class BedrockStreamManager:
             await self.stream_response.input_stream.send(event)
             # For debugging large events, you might want to log just the type
             if DEBUG:
-                if len(event_json) > 200:
-                    event_type = json.loads(event_json).get("event", {}).keys()
+                if len(event_bytes) > 200:
+                    event_type = json.loads(event_bytes).get("event", {}).keys()
                     debug_print(f"Sent event type: {list(event_type)}")
                 else:
-                    debug_print(f"Sent event: {event_json}")
+                    debug_print(f"Sent event: {event_bytes.decode('utf-8', errors='replace')}")
         except Exception as e:
             debug_print(f"Error sending event: {str(e)}")
             if DEBUG:
@@ -686,9 +731,8 @@ class BedrockStreamManager:
             # Ensure the audio is properly formatted
             debug_print(f"Processing audio chunk of size {len(audio_bytes)} bytes")
             
-            # Base64 encode the audio data
-            blob = base64.b64encode(audio_bytes)
-            audio_event = self.AUDIO_EVENT_TEMPLATE % (self.prompt_name, self.audio_content_name, blob.decode('utf-8'))
+            # Base64 encode the audio data into the precompiled audioInput event
+            audio_event = event_encoder.audio_input(self.prompt_name, self.audio_content_name, audio_bytes)
             
             # Send the event directly
             await self.send_raw_event(audio_event)
@@ -698,6 +742,10 @@ class BedrockStreamManager:
                 import traceback
                 traceback.print_exc()
     
+    async def send_silent_audio_chunk(self, num_bytes):
+        """Send num_bytes of silence using the pre-encoded silent audio event."""
+        await self.send_raw_event(event_encoder.silent_audio_input(self.prompt_name, self.audio_content_name, num_bytes))
+
     def add_audio_chunk(self, audio_bytes):
         """Add an audio chunk to the stream."""
         self.audio_subject.on_next({
@@ -814,70 +862,69 @@ class BedrockStreamManager:
 
                     if result.value and result.value.bytes_:
                         try:
-                            response_data = result.value.bytes_.decode('utf-8')
-                            json_data = json.loads(response_data)
+                            if event_decoder.EVENT_RECORDING:
+                                event_decoder.record(result.value.bytes_)
+                            event_type, event = event_decoder.decode_event(result.value.bytes_)
                             # Handle different response types
-                            if 'event' in json_data:
-                                if 'contentStart' in json_data['event']:
-                                    debug_print("Content start detected")
-                                    content_start = json_data['event']['contentStart']
-                                    # set role
-                                    self.role = content_start['role']
-                                    # Check for speculative content
-                                    if 'additionalModelFields' in content_start:
-                                        try:
-                                            additional_fields = json.loads(content_start['additionalModelFields'])
-                                            if additional_fields.get('generationStage') == 'SPECULATIVE':
-                                                debug_print("Speculative content detected")
-                                                self.display_assistant_text = True
-                                            else:
-                                                self.display_assistant_text = False
-                                        except json.JSONDecodeError:
-                                            debug_print("Error parsing additionalModelFields")
-
-                                elif 'contentEnd' in json_data['event'] and json_data['event'].get('contentEnd', {}).get('type') == 'TOOL':
-                                    debug_print("Tool use content ended - processing tool")
-                                    self.handle_tool_request(self.toolName, self.toolUseContent, self.toolUseId)
-                                    debug_print("Tool processing started asynchronously")
-
-                                elif 'textOutput' in json_data['event']:
-                                    text_content = json_data['event']['textOutput']['content']
-                                    # Check if there is a barge-in
-                                    if '{ "interrupted" : true }' in text_content:
-                                        if DEBUG:
-                                            print("Barge-in detected. Stopping audio output.")
-                                        self.barge_in = True
-
-                                    if (self.role == "ASSISTANT" and self.display_assistant_text):
-                                        print(f"Assistant: {text_content}")
-                                    elif (self.role == "USER"):
-                                        print(f"User: {text_content}")
-
-                                elif 'toolUse' in json_data['event']:
-                                    self.toolUseContent = json_data['event']['toolUse']
-                                    self.toolName = json_data['event']['toolUse']['toolName']
-                                    self.toolUseId = json_data['event']['toolUse']['toolUseId']
-                                    print(f"Tool use detected: {self.toolName} (ID: {self.toolUseId})")
-
-                                elif 'contentEnd' in json_data['event']:
-                                    debug_print(f"Content end event: {json_data}")
-
-                                elif 'promptEnd' in json_data['event']:
-                                    debug_print("Prompt end event received")
-
-                                elif 'completionEnd' in json_data['event']:
-                                    debug_print("Completion end event received - model has finished final response")
-                                    # Signal that we've received the completion event
-                                    self.completion_event.set()
-
-                                elif 'audioOutput' in json_data['event']:
-                                    audio_content = json_data['event']['audioOutput']['content']
-                                    audio_bytes = base64.b64decode(audio_content)
-                                    await self.audio_output_queue.put(audio_bytes)
-
-                            self.output_subject.on_next(json_data)
-                        except json.JSONDecodeError:
-                            self.output_subject.on_next({"raw_data": response_data})
+                            if event_type == 'audioOutput':
+                                # content is already decoded to PCM
+                                audio_bytes = event['content']
+                                await self.audio_output_queue.put(audio_bytes)
+                                self.audio_output_subject.on_next(audio_bytes)
+                                # Subscribers of output_subject get the base64 content of the protocol
+                                event['content'] = base64.b64encode(audio_bytes).decode('ascii')
+
+                            elif event_type == 'contentStart':
+                                debug_print("Content start detected")
+                                # set role
+                                self.role = event['role']
+                                # Check for speculative content
+                                if 'additionalModelFields' in event:
+                                    if event_decoder.generation_stage(event) == 'SPECULATIVE':
+                                        debug_print("Speculative content detected")
+                                        self.display_assistant_text = True
+                                    else:
+                                        self.display_assistant_text = False
+
+                            elif event_type == 'contentEnd' and event.get('type') == 'TOOL':
+                                debug_print("Tool use content ended - processing tool")
+                                self.handle_tool_request(self.toolName, self.toolUseContent, self.toolUseId)
+                                debug_print("Tool processing started asynchronously")
+
+                            elif event_type == 'textOutput':
+                                text_content = event['content']
+                                # Check if there is a barge-in
+                                if '{ "interrupted" : true }' in text_content:
+                                    if DEBUG:
+                                        print("Barge-in detected. Stopping audio output.")
+                                    self.barge_in = True
+
+                                if (self.role == "ASSISTANT" and self.display_assistant_text):
+                                    print(f"Assistant: {text_content}")
+                                elif (self.role == "USER"):
+                                    print(f"User: {text_content}")
+
+                            elif event_type == 'toolUse':
+                                self.toolUseContent = event
+                                self.toolName = event['toolName']
+                                self.toolUseId = event['toolUseId']
+                                print(f"Tool use detected: {self.toolName} (ID: {self.toolUseId})")
+
+                            elif event_type == 'contentEnd':
+                                debug_print(f"Content end event: {event}")
+
+                            elif event_type == 'promptEnd':
+                                debug_print("Prompt end event received")
+
+                            elif event_type == 'completionEnd':
+                                debug_print("Completion end event received - model has finished final response")
+                                # Signal that we've received the completion event
+                                self.completion_event.set()
+
+                            # Subscribers get the event document as the stream sent it
+                            self.output_subject.on_next({"event": {event_type: event}} if event_type else event)
+                        except ValueError:
+                            self.output_subject.on_next({"raw_data": result.value.bytes_.decode('utf-8', errors='replace')})
                 except StopAsyncIteration:
                     # Stream has ended
                     debug_print("Stream ended (StopAsyncIteration)")
@@ -892,6 +939,7 @@ class BedrockStreamManager:
         finally:
             debug_print("Response processing loop exited")
             self.output_subject.on_completed()
+            self.audio_output_subject.on_completed()
 
     def handle_tool_request(self, tool_name, tool_content, tool_use_id):
         """Handle a tool request asynchronously"""
@@ -953,6 +1001,7 @@ class BedrockStreamManager:
             return
 
         debug_print("Starting graceful shutdown sequence...")
+        debug_print(f"Audio output queue: {self.audio_output_queue.stats()}")
 
         # Complete the subjects (stop sending new data)
         self.input_subject.on_completed()
@@ -1057,58 +1106,7 @@ class AudioStreamer:
     
     async def play_output_audio(self):
         """Play audio responses from Nova Sonic"""
-        while self.is_streaming:
-            try:
-                # Check for barge-in flag
-                if self.stream_manager.barge_in:
-                    # Clear the audio queue
-                    while not self.stream_manager.audio_output_queue.empty():
-                        try:
-                            self.stream_manager.audio_output_queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
-                    self.stream_manager.barge_in = False
-                    # Small sleep after clearing
-                    await asyncio.sleep(0.05)
-                    continue
-                
-                # Get audio data from the stream manager's queue
-                audio_data = await asyncio.wait_for(
-                    self.stream_manager.audio_output_queue.get(),
-                    timeout=0.1
-                )
-                
-                if audio_data and self.is_streaming:
-                    # Write directly to the output stream in smaller chunks
-                    chunk_size = CHUNK_SIZE  # Use the same chunk size as the stream
-                    
-                    # Write the audio data in chunks to avoid blocking too long
-                    for i in range(0, len(audio_data), chunk_size):
-                        if not self.is_streaming:
-                            break
-                        
-                        end = min(i + chunk_size, len(audio_data))
-                        chunk = audio_data[i:end]
-                        
-                        # Create a new function that captures the chunk by value
-                        def write_chunk(data):
-                            return self.output_stream.write(data)
-                        
-                        # Pass the chunk to the function
-                        await asyncio.get_event_loop().run_in_executor(None, write_chunk, chunk)
-                        
-                        # Brief yield to allow other tasks to run
-                        await asyncio.sleep(0.001)
-                    
-            except asyncio.TimeoutError:
-                # No data available within timeout, just continue
-                continue
-            except Exception as e:
-                if self.is_streaming:
-                    print(f"Error playing output audio: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                await asyncio.sleep(0.05)
+        await play_responses(self, lambda: self.is_streaming)
     
     async def start_streaming(self):
         """Start streaming audio."""
@@ -1218,23 +1216,20 @@ class SilentAudioStreamer(AudioStreamer):
         await asyncio.sleep(0.1)
     
     async def _send_silent_audio(self):
-        """Send continuous silent audio chunks."""
-        # Create silent audio chunk (16-bit PCM, 16kHz, mono)
+        """Send silent audio chunks at real time."""
+        # Silent audio chunk (16-bit PCM, 16kHz, mono)
         silent_chunk_size = CHUNK_SIZE * 2  # 2 bytes per sample for 16-bit
-        silent_chunk = b'\x00' * silent_chunk_size
+        interval = CHUNK_SIZE / INPUT_SAMPLE_RATE  # 64ms of audio per chunk
         
-        while self.is_streaming:
-            try:
-                # Send silent audio chunk
-                self.stream_manager.add_audio_chunk(silent_chunk)
-                
-                # Wait for next chunk (maintain ~16kHz sample rate) - reduced delay for better responsiveness
-                await asyncio.sleep(0.01)  # 10ms instead of calculated delay
-                
-            except Exception as e:
-                if self.is_streaming:
-                    debug_print(f"Error sending silent audio: {e}")
-                break
+        try:
+            async for _ in pacing.paced(interval):
+                if not self.is_streaming:
+                    break
+                # Send the pre-encoded silent audio event
+                await self.stream_manager.send_silent_audio_chunk(silent_chunk_size)
+        except Exception as e:
+            if self.is_streaming:
+                debug_print(f"Error sending silent audio: {e}")
 
     async def stop_streaming(self):
         """Stop streaming silent audio."""
@@ -1335,61 +1330,6 @@ class MixedModeHandler:
             if self.is_active:
                 print(f"Error processing input audio: {e}")
     
-    async def play_output_audio(self):
-        """Play audio responses from Nova Sonic"""
-        while self.is_active:
-            try:
-                # Check for barge-in flag
-                if self.stream_manager.barge_in:
-                    # Clear the audio queue
-                    while not self.stream_manager.audio_output_queue.empty():
-                        try:
-                            self.stream_manager.audio_output_queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
-                    self.stream_manager.barge_in = False
-                    # Small sleep after clearing
-                    await asyncio.sleep(0.05)
-                    continue
-                
-                # Get audio data from the stream manager's queue
-                audio_data = await asyncio.wait_for(
-                    self.stream_manager.audio_output_queue.get(),
-                    timeout=0.1
-                )
-                
-                if audio_data and self.is_active:
-                    # Write directly to the output stream in smaller chunks
-                    chunk_size = CHUNK_SIZE  # Use the same chunk size as the stream
-                    
-                    # Write the audio data in chunks to avoid blocking too long
-                    for i in range(0, len(audio_data), chunk_size):
-                        if not self.is_active:
-                            break
-                        
-                        end = min(i + chunk_size, len(audio_data))
-                        chunk = audio_data[i:end]
-                        
-                        # Create a new function that captures the chunk by value
-                        def write_chunk(data):
-                            return self.output_stream.write(data)
-                        
-                        # Pass the chunk to the function
-                        await asyncio.get_event_loop().run_in_executor(None, write_chunk, chunk)
-                        
-                        # Brief yield to allow other tasks to run
-                        await asyncio.sleep(0.001)
-                    
-            except asyncio.TimeoutError:
-                # No data available within timeout, just continue
-                continue
-            except Exception as e:
-                if self.is_active:
-                    print(f"Error playing output audio: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                await asyncio.sleep(0.05)
-    
     async def handle_text_input(self):
         """Handle text input in mixed mode."""
         print("\n=== Mixed Mode Active ===")
@@ -1519,58 +1459,7 @@ class MixedModeHandler:
     
     async def play_output_audio(self):
         """Play audio responses from Nova Sonic"""
-        while self.is_active:
-            try:
-                # Check for barge-in flag
-                if self.stream_manager.barge_in:
-                    # Clear the audio queue
-                    while not self.stream_manager.audio_output_queue.empty():
-                        try:
-                            self.stream_manager.audio_output_queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
-                    self.stream_manager.barge_in = False
-                    # Small sleep after clearing
-                    await asyncio.sleep(0.05)
-                    continue
-                
-                # Get audio data from the stream manager's queue
-                audio_data = await asyncio.wait_for(
-                    self.stream_manager.audio_output_queue.get(),
-                    timeout=0.1
-                )
-                
-                if audio_data and self.is_active:
-                    # Write directly to the output stream in smaller chunks
-                    chunk_size = CHUNK_SIZE  # Use the same chunk size as the stream
-                    
-                    # Write the audio data in chunks to avoid blocking too long
-                    for i in range(0, len(audio_data), chunk_size):
-                        if not self.is_active:
-                            break
-                        
-                        end = min(i + chunk_size, len(audio_data))
-                        chunk = audio_data[i:end]
-                        
-                        # Create a new function that captures the chunk by value
-                        def write_chunk(data):
-                            return self.output_stream.write(data)
-                        
-                        # Pass the chunk to the function
-                        await asyncio.get_event_loop().run_in_executor(None, write_chunk, chunk)
-                        
-                        # Brief yield to allow other tasks to run
-                        await asyncio.sleep(0.001)
-                    
-            except asyncio.TimeoutError:
-                # No data available within timeout, just continue
-                continue
-            except Exception as e:
-                if self.is_active:
-                    print(f"Error playing output audio: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                await asyncio.sleep(0.05)
+        await play_responses(self, lambda: self.is_active)
     
     async def start_mixed_mode(self):
         """Start mixed mode with both audio streaming and text input."""
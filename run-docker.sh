@@ -53,6 +53,8 @@ sudo docker run -d \
     --platform linux/amd64 \
     --name ${DOCKER_NAME}-container \
     -p 8501:8501 \
+    -p 8502:8502 \
+    -p 8503:8503 \
     ${DOCKER_NAME}:latest
    
 if [ $? -eq 0 ]; then
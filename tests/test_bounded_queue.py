@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from bounded_queue import BoundedQueue
+
+def run(coro):
+    return asyncio.run(coro)
+
+def is_silent(item):
+    return item == b"s"
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedQueue("q", 1, "drop_newest")
+
+def test_drop_silence_needs_is_silent():
+    with pytest.raises(ValueError):
+        BoundedQueue("q", 1, "drop_silence")
+
+def test_block_raises_when_full_without_waiting():
+    q = BoundedQueue("q", 2, "block")
+    q.put_nowait(1)
+    q.put_nowait(2)
+    with pytest.raises(asyncio.QueueFull):
+        q.put_nowait(3)
+    assert q.drain() == [1, 2]
+
+def test_block_put_waits_for_space():
+    async def scenario():
+        q = BoundedQueue("q", 1, "block")
+        await q.put(1)
+        waiting = asyncio.create_task(q.put(2))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        assert await q.get() == 1
+        await asyncio.wait_for(waiting, 1.0)
+        return q
+    q = run(scenario())
+    assert q.drain() == [2]
+    assert q.stats()["blocked"] == 1
+
+def test_drop_oldest_keeps_the_newest_items():
+    async def scenario():
+        q = BoundedQueue("q", 3, "drop_oldest")
+        for i in range(6):
+            await q.put(i)
+        return q
+    q = run(scenario())
+    assert q.drain() == [3, 4, 5]
+    stats = q.stats()
+    assert (stats["puts"], stats["dropped"], stats["high_water"]) == (6, 3, 3)
+
+def test_drop_silence_drops_new_silence():
+    q = BoundedQueue("q", 2, "drop_silence", is_silent=is_silent)
+    for item in (b"a", b"b", b"s"):
+        q.put_nowait(item)
+    assert q.drain() == [b"a", b"b"]
+    assert q.stats()["dropped"] == 1
+
+def test_drop_silence_drops_oldest_for_sound_instead_of_waiting():
+    async def scenario():
+        q = BoundedQueue("q", 2, "drop_silence", is_silent=is_silent)
+        for item in (b"a", b"b", b"c"):
+            await asyncio.wait_for(q.put(item), 1.0)
+        return q
+    q = run(scenario())
+    assert q.drain() == [b"b", b"c"]
+
+def test_unget_returns_the_item_first():
+    async def scenario():
+        q = BoundedQueue("q", 3, "block")
+        for i in range(3):
+            await q.put(i)
+        first = await q.get()
+        second = await q.get()
+        q.unget(second)
+        q.unget(first)
+        return [await q.get() for _ in range(3)]
+    assert run(scenario()) == [0, 1, 2]
+
+def test_unget_into_a_full_queue():
+    async def scenario():
+        q = BoundedQueue("q", 1, "block")
+        await q.put(1)
+        item = await q.get()
+        await q.put(2)
+        q.unget(item)
+        assert q.qsize() == 2 and q.full() and not q.empty()
+        return q
+    q = run(scenario())
+    assert q.get_nowait() == 1
+    assert q.get_nowait() == 2
+    assert q.empty()
+
+def test_unget_keeps_the_item_unfinished():
+    async def scenario():
+        q = BoundedQueue("q", 2, "block")
+        await q.put(1)
+        q.unget(await q.get())
+        joined = asyncio.create_task(q.join())
+        await asyncio.sleep(0)
+        assert not joined.done()
+        assert await q.get() == 1
+        q.task_done()
+        await asyncio.wait_for(joined, 1.0)
+    run(scenario())
@@ -0,0 +1,56 @@
+import base64
+import json
+
+import event_decoder
+import event_encoder
+
+def test_audio_input_is_the_protocol_event():
+    audio = bytes(range(256)) * 3
+    event = json.loads(event_encoder.audio_input("prompt", "audio", audio))
+    body = event["event"]["audioInput"]
+    assert (body["promptName"], body["contentName"]) == ("prompt", "audio")
+    assert base64.b64decode(body["content"]) == audio
+
+def test_encoded_and_silent_audio_match_direct_encoding():
+    audio = b"\x01\x02" * 100
+    content = event_encoder.base64_audio(audio)
+    assert event_encoder.encoded_audio_input("p", "c", content) == event_encoder.audio_input("p", "c", audio)
+    assert event_encoder.silent_audio_input("p", "c", 64) == event_encoder.audio_input("p", "c", bytes(64))
+
+def test_names_and_text_are_json_escaped():
+    name = 'quote " and \\ backslash'
+    text = '줄바꿈\n과 "따옴표"'
+    event = json.loads(event_encoder.text_input(name, name, text))
+    assert event["event"]["textInput"] == {"promptName": name, "contentName": name, "content": text}
+    assert json.loads(event_encoder.content_end(name, "c"))["event"]["contentEnd"]["promptName"] == name
+
+def test_session_events():
+    assert json.loads(event_encoder.session_end()) == {"event": {"sessionEnd": {}}}
+    start = json.loads(event_encoder.prompt_start("p", "tiffany"))["event"]["promptStart"]
+    assert start["audioOutputConfiguration"]["voiceId"] == "tiffany"
+    audio = json.loads(event_encoder.audio_content_start("p", "a", 1200000))["event"]["contentStart"]
+    assert audio["audioInputConfiguration"]["maxLengthMilliseconds"] == 1200000
+    system = json.loads(event_encoder.text_content_start("p", "s", role="SYSTEM", interactive=False))["event"]["contentStart"]
+    assert (system["role"], system["interactive"]) == ("SYSTEM", False)
+
+def test_decoder_reads_audio_output_as_pcm():
+    audio = bytes(range(256)) * 2
+    raw = json.dumps({"event": {"audioOutput": {
+        "content": base64.b64encode(audio).decode(), "contentId": "c1", "role": "ASSISTANT"
+    }}}).encode()
+    event_type, body = event_decoder.decode_event(raw)
+    assert event_type == "audioOutput"
+    assert body["content"] == audio
+    assert body["contentId"] == "c1"
+
+def test_decoder_handles_escaped_slashes_and_whitespace():
+    audio = b"\xff\xfe\xfd" * 50
+    encoded = base64.b64encode(audio).decode().replace("/", "\\/")
+    raw = ('{ "event" : { "audioOutput" : { "role": "ASSISTANT", "content" : "%s" } } }' % encoded).encode()
+    event_type, body = event_decoder.decode_event(raw)
+    assert (event_type, body["content"], body["role"]) == ("audioOutput", audio, "ASSISTANT")
+
+def test_decoder_other_events_and_non_events():
+    raw = json.dumps({"event": {"textOutput": {"content": "안녕", "role": "USER"}}}, ensure_ascii=False).encode()
+    assert event_decoder.decode_event(raw) == ("textOutput", {"content": "안녕", "role": "USER"})
+    assert event_decoder.decode_event(b'{"message": "x"}') == (None, {"message": "x"})
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import g711
+from telephony import FRAME_BYTES, TelephonyEgress, TelephonyIngress
+
+CODECS = {
+    "mulaw": (g711.pcm16_to_mulaw, g711.mulaw_to_pcm16, g711.MULAW_SILENCE),
+    "alaw": (g711.pcm16_to_alaw, g711.alaw_to_pcm16, g711.ALAW_SILENCE),
+}
+
+ALL_SAMPLES = np.arange(-32768, 32768, dtype='<i2').tobytes()
+ALL_CODES = bytes(range(256))
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_codes_round_trip(codec):
+    encode, decode, _ = CODECS[codec]
+    decoded = decode(ALL_CODES)
+    assert decode(encode(decoded)) == decoded
+    if codec == "alaw":
+        assert encode(decoded) == ALL_CODES
+    else:
+        # 0x7F is the second code for zero (negative zero) and encodes back as 0xFF
+        expected = bytearray(ALL_CODES)
+        expected[0x7F] = 0xFF
+        assert encode(decoded) == bytes(expected)
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_samples_round_trip_within_one_step(codec):
+    encode, decode, _ = CODECS[codec]
+    samples = np.frombuffer(ALL_SAMPLES, dtype='<i2').astype(np.int32)
+    decoded = np.frombuffer(decode(encode(ALL_SAMPLES)), dtype='<i2').astype(np.int32)
+    error = np.abs(decoded - samples)
+    # Steps double per segment; the error stays within half a step of the largest segment plus clipping
+    assert error[np.abs(samples) < 32000].max() <= 1024
+    relative = error[np.abs(samples) > 256] / np.abs(samples[np.abs(samples) > 256])
+    assert relative.max() < 0.07
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_matches_audioop(codec):
+    audioop = pytest.importorskip("audioop")
+    encode, decode, _ = CODECS[codec]
+    if codec == "mulaw":
+        reference_encode, reference_decode = audioop.lin2ulaw, audioop.ulaw2lin
+    else:
+        reference_encode, reference_decode = audioop.lin2alaw, audioop.alaw2lin
+    assert encode(ALL_SAMPLES) == reference_encode(ALL_SAMPLES, 2)
+    assert decode(ALL_CODES) == reference_decode(ALL_CODES, 2)
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_silence_byte_decodes_to_zero(codec):
+    _, decode, silence = CODECS[codec]
+    assert np.abs(np.frombuffer(decode(bytes([silence])), dtype='<i2')).max() <= 8
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_ingress_releases_even_chunks(codec):
+    ingress = TelephonyIngress(codec, out_rate=8000, frames_per_chunk=2)
+    payload = CODECS[codec][0](np.full(FRAME_BYTES * 5, 1000, dtype='<i2').tobytes())
+    out = [ingress.feed(payload[i:i + 70]) for i in range(0, len(payload), 70)]
+    sizes = [len(chunk) for chunk in out if chunk]
+    assert sizes == [FRAME_BYTES * 2 * 2] * 2
+    assert len(ingress.flush()) == FRAME_BYTES * 2
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_egress_frames_and_pads_with_silence(codec):
+    egress = TelephonyEgress(codec, in_rate=8000)
+    pcm = np.full(FRAME_BYTES * 2 + 50, 1000, dtype='<i2').tobytes()
+    frames = egress.feed(pcm[:101]) + egress.feed(pcm[101:])
+    assert [len(frame) for frame in frames] == [FRAME_BYTES, FRAME_BYTES]
+    last = egress.flush()
+    assert len(last) == 1 and len(last[0]) == FRAME_BYTES
+    assert last[0][50:] == bytes([CODECS[codec][2]]) * (FRAME_BYTES - 50)
+    assert egress.flush() == []
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        TelephonyIngress("g722")
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from resampler import AudioConditioner, Resampler, pcm_to_float
+
+RATES = [(44100, 16000), (48000, 16000), (8000, 16000), (24000, 8000), (22050, 16000)]
+
+def tone(rate, seconds, frequency=440.0, amplitude=8000.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+@pytest.mark.parametrize("in_rate,out_rate", RATES)
+def test_chunking_does_not_change_the_output(in_rate, out_rate):
+    signal = tone(in_rate, 1.0)
+    whole = Resampler(in_rate, out_rate).process(signal)
+
+    resampler = Resampler(in_rate, out_rate)
+    rng = np.random.default_rng(1)
+    pieces = []
+    start = 0
+    while start < len(signal):
+        size = int(rng.integers(1, 700))
+        pieces.append(resampler.process(signal[start:start + size]))
+        start += size
+    chunked = np.concatenate(pieces)
+
+    assert len(chunked) == len(whole)
+    np.testing.assert_allclose(chunked, whole, atol=0.05)
+
+@pytest.mark.parametrize("in_rate,out_rate", RATES)
+def test_output_length_follows_the_rate(in_rate, out_rate):
+    out = Resampler(in_rate, out_rate).process(np.zeros(in_rate, dtype=np.float32))
+    assert abs(len(out) - out_rate) <= 1
+
+@pytest.mark.parametrize("in_rate,out_rate", RATES)
+def test_unity_gain_in_the_passband(in_rate, out_rate):
+    resampler = Resampler(in_rate, out_rate)
+    dc = resampler.process(np.full(in_rate, 1000.0, dtype=np.float32))
+    settled = dc[int(resampler.latency()) * 2 + 10:]
+    np.testing.assert_allclose(settled, 1000.0, rtol=1e-3)
+
+    out = Resampler(in_rate, out_rate).process(tone(in_rate, 1.0, frequency=300.0))
+    peak = np.abs(out[len(out) // 4:]).max()
+    assert peak == pytest.approx(8000.0, rel=0.01)
+
+def test_reset_restarts_the_stream():
+    resampler = Resampler(44100, 16000)
+    first = resampler.process(tone(44100, 0.1))
+    resampler.reset()
+    np.testing.assert_array_equal(resampler.process(tone(44100, 0.1)), first)
+
+def test_pcm_to_float_widths():
+    assert pcm_to_float(np.array([-32768, 0, 32767], dtype='<i2').tobytes(), 2).tolist() == [-32768.0, 0.0, 32767.0]
+    assert pcm_to_float(bytes([0, 128, 255]), 1).tolist() == [-32768.0, 0.0, 32512.0]
+    assert pcm_to_float(b'\x00\x00\x80\xff\xff\x7f', 3).tolist() == [-32768.0, 32767.99609375]
+    assert pcm_to_float(np.array([-2**31], dtype='<i4').tobytes(), 4).tolist() == [-32768.0]
+
+def test_conditioner_passthrough():
+    pcm = np.arange(100, dtype='<i2').tobytes()
+    conditioner = AudioConditioner(16000)
+    assert conditioner.process(pcm[:51]) + conditioner.process(pcm[51:]) == pcm
+
+def test_conditioner_averages_channels():
+    left = np.full(320, 1000, dtype='<i2')
+    right = np.full(320, 3000, dtype='<i2')
+    stereo = np.column_stack((left, right)).ravel().tobytes()
+    out = np.frombuffer(AudioConditioner(16000, channels=2).process(stereo), dtype='<i2')
+    assert out.tolist() == [2000] * 320
+
+def test_conditioner_keeps_partial_frames():
+    stereo = np.column_stack((tone(44100, 0.2), tone(44100, 0.2))).astype('<i2').ravel().tobytes()
+    whole = AudioConditioner(44100, channels=2)
+    expected = whole.process(stereo) + whole.flush()
+
+    conditioner = AudioConditioner(44100, channels=2)
+    out = b''.join(conditioner.process(stereo[i:i + 333]) for i in range(0, len(stereo), 333)) + conditioner.flush()
+    assert len(out) == len(expected)
+    assert np.abs(np.frombuffer(out, '<i2').astype(int) - np.frombuffer(expected, '<i2')).max() <= 1
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from ring_buffer import RingBuffer
+
+def test_read_returns_what_was_written():
+    ring = RingBuffer(16)
+    assert ring.write(b"abcdef")
+    assert ring.available() == 6
+    assert ring.read() == b"abcdef"
+    assert ring.read() == b""
+
+def test_wraparound_keeps_the_byte_order():
+    ring = RingBuffer(10)
+    stream = bytes(range(256)) * 4
+    out = bytearray()
+    position = 0
+    for size in (7, 3, 9, 1, 10, 6, 8):
+        while position < len(stream):
+            chunk = stream[position:position + size]
+            if not ring.write(chunk):
+                break
+            position += len(chunk)
+            out += ring.read(max_bytes=size - 1)
+        out += ring.read()
+    assert bytes(out) == stream[:position]
+    assert ring.write_pos > ring.capacity  # the positions went around several times
+
+def test_full_write_is_dropped_whole():
+    ring = RingBuffer(8)
+    assert ring.write(b"12345")
+    assert not ring.write(b"6789")
+    assert ring.write(b"678")
+    assert (ring.overruns, ring.dropped_bytes, ring.high_water) == (1, 4, 8)
+    assert ring.read() == b"12345678"
+
+def test_read_rounds_down_to_a_multiple():
+    ring = RingBuffer(16)
+    ring.write(b"abcdefg")
+    assert ring.read(multiple=2) == b"abcdef"
+    assert ring.read(multiple=2) == b""
+    ring.write(b"h")
+    assert ring.read(max_bytes=5, multiple=2) == b"gh"
+
+def test_clear_drops_buffered_data():
+    ring = RingBuffer(8)
+    ring.write(b"abc")
+    ring.clear()
+    assert ring.available() == 0
+    assert ring.write(b"12345678")
+
+def test_one_producer_one_consumer_thread():
+    ring = RingBuffer(1024)
+    stream = bytes(i % 251 for i in range(100_000))
+    done = threading.Event()
+
+    def produce():
+        position = 0
+        while position < len(stream):
+            chunk = stream[position:position + 37]
+            if ring.write(chunk):
+                position += len(chunk)
+            else:
+                time.sleep(0)  # let the consumer catch up
+        done.set()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    out = bytearray()
+    while not done.is_set() or ring.available():
+        out += ring.read()
+        time.sleep(0)
+    producer.join()
+    assert bytes(out) == stream
@@ -0,0 +1,75 @@
+import sqlite3
+
+from translation_cache import TranslationCache, cache_key, normalize_text
+
+def put(cache, text, size=100):
+    cache.put(text, "Japanese", "text2speech", "tiffany", "x" * size)
+
+def get(cache, text):
+    return cache.get(text, "Japanese", "text2speech", "tiffany")
+
+def test_normalized_inputs_share_a_key():
+    assert normalize_text("  안녕\t하세요 \n") == "안녕 하세요"
+    assert cache_key("a  b", "Japanese", "text2speech", "tiffany") == cache_key(" a b ", "Japanese", "text2speech", "tiffany")
+    assert cache_key("a b", "Japanese", "text2speech", "tiffany") != cache_key("a b", "English", "text2speech", "tiffany")
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TranslationCache(path=None, memory_bytes=500)
+    for text in ("a", "b", "c"):
+        put(cache, text)
+    assert get(cache, "a")["translation"] == "x" * 100  # a is now the most recently used
+    put(cache, "d")
+    put(cache, "e")
+
+    assert cache.memory_used <= 500
+    assert get(cache, "b") is None
+    assert get(cache, "a") is not None
+    assert get(cache, "e") is not None
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["memory_hits"] == 3
+
+def test_replacing_an_entry_does_not_leak_memory_budget():
+    cache = TranslationCache(path=None, memory_bytes=10_000)
+    put(cache, "a", size=100)
+    used = cache.memory_used
+    put(cache, "a", size=100)
+    assert cache.memory_used == used
+    assert len(cache.memory) == 1
+
+def test_disk_tier_serves_memory_misses_and_restarts(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = TranslationCache(path=path, memory_bytes=150)
+    put(cache, "a")
+    put(cache, "b")  # evicts a from memory
+    assert len(cache.memory) == 1
+    assert get(cache, "a")["translation"] == "x" * 100
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+    reopened = TranslationCache(path=path)
+    entry = get(reopened, "b")
+    assert entry["translation"] == "x" * 100
+    assert reopened.stats()["disk_hits"] == 1
+    reopened.close()
+
+def test_disk_tier_keeps_max_rows_most_recently_used(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = TranslationCache(path=path, memory_bytes=0, max_rows=10)
+    put(cache, "keep")
+    for i in range(98):
+        put(cache, f"old {i}")
+    # Reading a row refreshes it; the 100th put trims the table
+    assert get(cache, "keep") is not None
+    put(cache, "new")
+    cache.close()
+
+    rows = {row[0] for row in sqlite3.connect(path).execute("SELECT text FROM translations")}
+    assert len(rows) == 10
+    assert {"keep", "new"} <= rows
+    assert "old 0" not in rows
+
+def test_unusable_database_falls_back_to_memory(tmp_path):
+    cache = TranslationCache(path=str(tmp_path / "missing" / "cache.db"))
+    put(cache, "a")
+    assert get(cache, "a") is not None
+    assert cache.path is None
@@ -0,0 +1,52 @@
+import numpy as np
+
+from vad import VoiceActivityDetector
+
+FRAME = 1024
+RATE = 16000
+
+def signal():
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 30, RATE * 2)
+    t = np.arange(RATE) / RATE
+    speech = np.sin(2 * np.pi * 200 * t) * 8000
+    return np.concatenate((noise, speech, noise)).astype('<i2').tobytes()
+
+def decisions(data, step):
+    vad = VoiceActivityDetector(frame_size=FRAME, sample_rate=RATE)
+    flags = []
+    for i in range(0, len(data), step):
+        flags += [voiced for _, voiced in vad.process(data[i:i + step])]
+    flags += [voiced for _, voiced in vad.flush()]
+    return flags, vad
+
+def test_every_frame_is_returned_once_in_order():
+    data = signal()
+    vad = VoiceActivityDetector(frame_size=FRAME, sample_rate=RATE)
+    frames = [bytes(frame) for step in range(0, len(data), 3000) for frame, _ in vad.process(data[step:step + 3000])]
+    frames += [bytes(frame) for frame, _ in vad.flush()]
+    whole = len(data) // (FRAME * 2) * FRAME * 2
+    assert b"".join(frames) == data[:whole]
+    assert vad.stats()["frames_total"] == len(frames)
+
+def test_speech_is_voiced_with_preroll_and_hangover():
+    flags, vad = decisions(signal(), FRAME * 2)
+    first, last = flags.index(True), len(flags) - 1 - flags[::-1].index(True)
+    speech_start, speech_end = RATE * 2 // FRAME, RATE * 3 // FRAME
+    assert speech_start - vad.preroll <= first <= speech_start
+    assert speech_end <= last <= speech_end + vad.hangover + 1
+    assert all(flags[first:last + 1])
+
+def test_batch_size_does_not_change_the_decisions():
+    data = signal()
+    small, _ = decisions(data, FRAME * 2)
+    large, _ = decisions(data, FRAME * 2 * 50)
+    assert small == large
+
+def test_flush_releases_the_held_frames():
+    vad = VoiceActivityDetector(frame_size=FRAME, sample_rate=RATE)
+    released = vad.process(bytes(FRAME * 2 * 10))
+    held = vad.flush()
+    assert len(released) + len(held) == 10
+    assert len(held) == vad.preroll
+    assert vad.flush() == []